@@ -33,8 +33,118 @@ CHART_HEIGHT = {
 
 # Default values
 DEFAULT_COGS_PERCENTAGE = 0.35  # 35% COGS
-DEFAULT_CLV_MULTIPLIERS = {
-    'Facebook': 3.2,
-    'Google': 4.1,
-    'TikTok': 2.8
-}
\ No newline at end of file
+CLV_RETENTION_WINDOW_DAYS = 28  # Trailing days of a platform's acquisitions its repeat orders are measured against
+
+# Streaming quantile sketches
+SKETCH_K = 200  # KLL accuracy parameter (higher = more accurate, more memory)
+SKETCH_SEED = 0  # Compaction RNG seed, so a rebuild from the same data gives the same quantiles
+INGEST_CHUNK_SIZE = 100000  # Rows per CSV chunk during ingestion
+SKETCH_METRICS = ['cpc', 'cpa', 'roas', 'ctr']
+SKETCH_QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+# Anomaly detection (rolling robust z-scores)
+ANOMALY_WINDOW = 14  # Trailing days in each median/MAD baseline
+ANOMALY_Z_THRESHOLD = 3.5
+ANOMALY_METRICS = ['spend', 'cpc', 'cpa', 'roas']
+
+# Spend-response curves and budget reallocation
+RESPONSE_ELASTICITY_RANGE = (0.05, 0.95)  # Clip fitted elasticities to diminishing returns
+BUDGET_MIN_RATIO = 0.5  # Each campaign keeps at least this share of its current daily spend
+BUDGET_MAX_RATIO = 2.0  # ...and at most this multiple of it
+
+# Bootstrap confidence intervals
+BOOTSTRAP_RESAMPLES = 2000
+BOOTSTRAP_CONFIDENCE = 0.95
+BOOTSTRAP_PARALLEL_MIN_CELLS = 200_000_000  # Resamples x rows before using a process pool
+
+# Tenants
+DATA_ROOT = 'data'  # Data root of the default tenant
+TENANTS_ROOT = 'tenants'  # Each subdirectory is another tenant's data root, opened with ?tenant=<name>
+
+# Cache tiers: byte budget, time to live and eviction policy ('lru' or 'fifo') per tier and tenant
+CACHE_TIERS = {
+    'raw': {'max_bytes': 512 * 1024 * 1024, 'ttl_seconds': 24 * 3600, 'policy': 'lru'},  # Loaded and merged frames
+    'cube': {'max_bytes': 256 * 1024 * 1024, 'ttl_seconds': 6 * 3600, 'policy': 'lru'},  # Rollup cube and sketches
+    'query': {'max_bytes': 128 * 1024 * 1024, 'ttl_seconds': 3600, 'policy': 'lru'},  # Derived models and intervals
+    'figures': {'max_bytes': 32 * 1024 * 1024, 'ttl_seconds': 3600, 'policy': 'lru'}  # Serialized figure JSON
+}
+# All tenants together; least recently used tenants are cleared first. Keep it above twice the
+# per-tenant total above (928 MB) so a tenant at its own limits cannot crowd out everyone else.
+CACHE_GLOBAL_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+# Data refresh
+DATA_REFRESH_ENABLED = True  # Watch each tenant's data root and rebuild changed snapshots in the background
+DATA_REFRESH_DEBOUNCE_SECONDS = 2.0  # Quiet period after the last file event before rebuilding
+
+# On-disk snapshots of loaded frames, aggregates and chart figures
+SNAPSHOTS_ENABLED = True
+SNAPSHOT_DIR = '.snapshots'  # Relative to the project root
+SNAPSHOT_KEEP = 3  # Most recent code version / data fingerprint snapshots kept on disk per tenant
+SNAPSHOT_MAX_FIGURES = 200  # Most recently used figures kept per snapshot, across all filter states
+
+# Cache warming
+WARM_CACHES_ON_START = True  # Warm in the background on the first run after a server start
+WARM_FILTER_PRESETS = [  # Control values warmed besides the default view
+    {'show_anomalies': False},
+    {'distribution_metric': 'cpa'},
+    {'distribution_metric': 'roas'},
+    {'distribution_dimension': 'tactic'}
+]
+
+# Batch reports
+REPORT_OUTPUT_DIR = 'reports'
+REPORT_WORKERS = None  # Worker processes; None uses every CPU
+
+# Metrics API
+METRICS_API_ENABLED = False  # Serve KPIs and chart datasets as JSON alongside the dashboard
+METRICS_API_ADDRESS = '127.0.0.1'  # Interface to bind; requests also need the admin token (PROFILE_TOKEN_ENV_VAR)
+METRICS_API_PORT = 8600
+METRICS_API_MAX_AGE_SECONDS = 60  # Cache-Control max-age; clients revalidate with If-None-Match after that
+
+# Benchmarks
+BENCHMARK_DIR = 'benchmarks'  # Generated datasets under data/ and the stored baseline.json
+BENCHMARK_SCALES = {  # Synthetic dataset per scale; campaign rows are days x campaigns
+    'small': {'days': 120, 'campaigns': 30},
+    'medium': {'days': 365, 'campaigns': 300, 'tactics': 4, 'states': 10},
+    'large': {'days': 730, 'campaigns': 3000, 'tactics': 6, 'states': 20},
+    'xlarge': {'days': 730, 'campaigns': 15000, 'tactics': 8, 'states': 30}
+}
+BENCHMARK_DEFAULT_SCALES = ['small', 'medium', 'large']  # xlarge (11M rows) only when asked for
+BENCHMARK_REPEATS = 3  # Best of this many runs per stage
+BENCHMARK_REGRESSION_TOLERANCE = 0.25  # Flag stages more than 25% slower than the baseline
+BENCHMARK_MIN_REGRESSION_SECONDS = 0.02  # ...and slower by more than this, so millisecond stages don't flap
+
+# Load testing
+LOAD_TEST_LEVELS = [1, 2, 4, 8]  # Concurrent simulated sessions per level
+LOAD_TEST_ROUNDS = 3  # Times each session repeats its scripted interactions
+LOAD_TEST_TIMEOUT_SECONDS = 120  # Per rerun, before a session records a timeout
+
+# Memory profiling
+MEMORY_TRACE_FRAMES = 25  # tracemalloc frames kept per allocation, enough to reach the project line behind it
+MEMORY_RSS_SAMPLE_SECONDS = 0.01  # RSS sampling interval while a stage runs
+MEMORY_TOP_ALLOCATIONS = 5  # Allocation sites listed per stage
+MEMORY_TOP_FRAMES = 10  # Largest stage-result frames listed in the report
+MEMORY_TOP_COLUMNS = 5  # Columns listed per frame
+
+# Rerun profiling
+PROFILE_TOKEN_ENV_VAR = 'DASHBOARD_PROFILE_TOKEN'  # Admin token for ?profile=<token> runs, the cache admin page and the metrics API
+PROFILE_NEXT_RUN_ENV_VAR = 'DASHBOARD_PROFILE_NEXT_RUN'  # Set to 1 to profile the first run after a server start
+PROFILE_DIR = 'profiles'  # .prof files and their per-module summaries
+PROFILE_TOP_MODULES = 15  # Modules listed by own time
+PROFILE_TOP_FUNCTIONS = 5  # Hottest functions listed per module
+
+# Instrumentation
+INSTRUMENTATION_ENABLED = False  # Timing spans around loaders, merges, metrics and chart builders
+INSTRUMENTATION_MAX_SPANS = 5000  # Most recent spans kept in memory for the debug panel
+INSTRUMENTATION_LOG_FILE = None  # JSON lines file for span logs; None logs to stderr
+
+# Render scheduler
+RENDER_WORKERS = 4  # Threads building chart figures concurrently
+SHOW_BUILD_TIMINGS = True  # Per-chart build timings below the dashboard
+
+# Long time series
+TIMESERIES_MAX_POINTS = 1000  # Days of history before daily points, and points per trace before LTTB and WebGL
+
+# Figure payload
+COMPACT_FIGURES = True  # float32 arrays, rounded list values and date-only timestamps in chart JSON
+PAYLOAD_DECIMALS = 4  # Charts display at most four decimals
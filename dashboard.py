@@ -1,11 +1,18 @@
+import contextlib
+import os
+import threading
+import time
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import pandas as pd
-from utils.data_loader import load_campaign_data, load_business_data, merge_campaign_business_data
-from utils.chart_functions import (create_revenue_by_platform_chart, create_efficiency_trends_chart, 
-                                  create_roas_comparison_chart, create_cac_clv_scatter_chart, 
-                                  create_gross_profit_waterfall_chart, create_campaign_tactic_heatmap,
-                                  create_conversion_funnel_chart, create_platform_revenue_pie_chart,
-                                  create_engagement_metrics_chart)
+from utils.data_loader import get_snapshot_fingerprint, get_tenant_roots
+from utils.chart_functions import efficiency_history_days
+from utils.panel_graph import (PANEL_NODES, get_panel_graph, get_panel_params, get_default_daily_budget,
+                               warm_dashboard_caches)
+from utils.figure_payload import figure_payload_bytes
+from utils.metrics_api import start_api_server
+from utils.instrumentation import get_spans, session_scope
+from utils.rerun_profiler import start_rerun_profile, finish_rerun_profile, token_matches, claim_next_run
 import config
 
 # Page configuration
@@ -172,40 +179,121 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def calculate_kpis(merged_df):
-    """Calculate KPI values cleanly"""
-    total_revenue = merged_df['total_revenue'].sum()
-    total_orders = merged_df['total_orders'].sum()
-    avg_cogs = merged_df['cogs_percentage'].mean()
-    total_spend = merged_df['spend'].sum()
-    overall_roas = total_revenue / total_spend if total_spend > 0 else 0
-    
-    return total_revenue, total_orders, avg_cogs, overall_roas
+@st.cache_resource
+def get_metrics_api():
+    """Start the JSON metrics API once per server process, sharing the dashboard's caches"""
+    try:
+        start_api_server(config.METRICS_API_PORT)
+        return config.METRICS_API_PORT
+    except OSError as e:
+        st.warning(f"Metrics API not started on port {config.METRICS_API_PORT}: {e}")
+        return None
 
-def main():
-    # Dashboard Title - Ultra-compact
-    st.markdown('<h1 class="dashboard-title">Marketing Intelligence Dashboard</h1>', unsafe_allow_html=True)
-    
-    # Load and merge data
-    with st.spinner("Loading data..."):
-        campaign_df = load_campaign_data()
-        business_df = load_business_data()
-    
-    if campaign_df is None or business_df is None:
-        st.error("❌ Could not load data. Please check your CSV files.")
+def resolve_nodes(targets, data_root, data_fingerprint):
+    """Resolve graph nodes for this session's controls, returning their values and timings
+    
+    Nodes that failed are reported on the page and resolve to None.
+    """
+    # Pooled worker threads serve every session, so they never join this script run;
+    # their spans are tagged with this session instead, and failures come back as timings
+    ctx = get_script_run_ctx()
+    session_id = ctx.session_id if ctx is not None else None
+    profiler = st.session_state.get('rerun_profiler')
+    
+    @contextlib.contextmanager
+    def node_context():
+        with session_scope(session_id):
+            with profiler.profile_thread() if profiler is not None else contextlib.nullcontext():
+                yield
+    
+    params = get_panel_params(data_root, data_fingerprint, st.session_state)
+    results, timings = get_panel_graph().resolve(targets, params, node_context=node_context)
+    for timing in timings:
+        if timing['error']:
+            st.error(f"❌ Error building {timing['node']}: {timing['error']}")
+    return results, timings
+
+def resolve_panel(panel, data_root, data_fingerprint):
+    """Values of the nodes a panel declares in PANEL_NODES
+    
+    A full run resolves every visible panel up front and leaves each panel its
+    values; the panel's own fragment reruns resolve afresh.
+    """
+    prefetched = st.session_state.get('prefetched_panels', {}).pop(panel, None)
+    if prefetched is not None:
+        return prefetched
+    results, _ = resolve_nodes(PANEL_NODES[panel], data_root, data_fingerprint)
+    return results
+
+@st.cache_resource
+def start_cache_warming():
+    """Warm the caches once per server process, in the background so the first session is not held up"""
+    thread = threading.Thread(target=warm_dashboard_caches, name='cache-warming', daemon=True)
+    thread.start()
+    return thread
+
+def render_build_timings():
+    """Per-node build times from the last full run, slowest first, with chart payload sizes"""
+    timings = st.session_state.get('panel_graph_timings')
+    if not timings:
         return
     
-    merged_df = merge_campaign_business_data(campaign_df, business_df)
-    
-    if merged_df is None:
-        st.error("❌ Could not merge data.")
+    with st.expander("⏱️ Build timings"):
+        timing_df = pd.DataFrame(timings).sort_values('seconds', ascending=False).drop_duplicates('node')
+        timing_df['ms'] = (timing_df['seconds'] * 1000).round(1)
+        
+        # Serialized size of each chart as last sent to the browser
+        payload_bytes = st.session_state.get('chart_payload_bytes', {})
+        timing_df['payload_kb'] = (timing_df['node'].map(payload_bytes) / 1024).round(1)
+        st.caption(f"Chart payload: {sum(payload_bytes.values()) / 1024:,.1f} KB across {len(payload_bytes)} charts")
+        st.dataframe(timing_df[['node', 'ms', 'reused', 'payload_kb']], hide_index=True, use_container_width=True)
+
+def render_performance_spans():
+    """Instrumentation spans recorded for this session since the last full run, per stage and slowest first"""
+    ctx = get_script_run_ctx()
+    spans = get_spans(ctx.session_id if ctx else None, st.session_state.get('run_started_at'))
+    if not spans:
         return
     
-    # Calculate KPIs
-    total_revenue, total_orders, avg_cogs, overall_roas = calculate_kpis(merged_df)
-    
-    # ROW 1: MINIMAL KPI Cards
-    st.markdown('<div class="section-header">Key Performance Indicators</div>', unsafe_allow_html=True)
+    with st.expander("🔬 Performance spans"):
+        span_df = pd.DataFrame(spans)
+        stage_df = span_df.groupby('stage').agg(
+            spans=('ms', 'size'),
+            total_ms=('ms', 'sum'),
+            max_ms=('ms', 'max'),
+            hits=('cache', lambda cache: int((cache == 'hit').sum())),
+            misses=('cache', lambda cache: int((cache == 'miss').sum()))
+        ).sort_values('total_ms', ascending=False).reset_index()
+        st.dataframe(stage_df.round(1), hide_index=True, use_container_width=True)
+        
+        span_columns = [column for column in ['stage', 'name', 'ms', 'cache', 'rows', 'tier', 'thread'] if column in span_df]
+        st.dataframe(span_df.sort_values('ms', ascending=False)[span_columns], hide_index=True, use_container_width=True)
+
+def render_insight(html):
+    """Ultra-minimal hover insight shown over a chart"""
+    st.markdown(f"""
+    <div class="chart-container">
+        <div class="hover-insight">
+            {html}
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+def render_chart(results, chart_id):
+    """Show a chart node's figure if it was built, noting its payload size when timings are shown"""
+    chart = results[chart_id]
+    if chart:
+        if config.SHOW_BUILD_TIMINGS:
+            st.session_state.setdefault('chart_payload_bytes', {})[chart_id] = figure_payload_bytes(chart)
+        st.plotly_chart(chart, use_container_width=True)
+
+# Each panel below is a fragment: a control inside one panel reruns only that
+# panel, resolving just the graph nodes it declares in PANEL_NODES.
+
+@st.fragment
+def render_kpi_row(data_root, data_fingerprint):
+    """ROW 1: MINIMAL KPI Cards"""
+    total_revenue, total_orders, avg_cogs, overall_roas = resolve_panel('kpi_row', data_root, data_fingerprint)['kpis']
     
     kpi_col1, kpi_col2, kpi_col3, kpi_col4 = st.columns(4, gap="small")
     
@@ -220,111 +308,265 @@ def main():
     
     with kpi_col4:
         st.metric(label="📈 ROAS", value=f"{overall_roas:.2f}x")
+
+@st.fragment
+def render_revenue_panel(data_root, data_fingerprint):
+    """Chart 1: Revenue by Platform"""
+    st.markdown('<div class="chart-title-compact">📊 Revenue by Platform</div>', unsafe_allow_html=True)
+    
+    results = resolve_panel('revenue', data_root, data_fingerprint)
+    platform_revenue = results['platform_revenue']
+    if platform_revenue is not None and len(platform_revenue) > 0:
+        highest_platform = platform_revenue.iloc[0]['platform']
+        highest_revenue = platform_revenue.iloc[0]['total_revenue']
+        render_insight(f"<strong>Top:</strong> {highest_platform}<br>${highest_revenue:,.0f}")
+    
+    render_chart(results, 'revenue_by_platform')
+
+@st.fragment
+def render_customer_acquisition_panel(data_root, data_fingerprint):
+    """Chart 2: Customer Acquisition Analysis"""
+    st.markdown('<div class="chart-title-compact">💰 Customer Acquisition</div>', unsafe_allow_html=True)
+    
+    render_chart(resolve_panel('customer_acquisition', data_root, data_fingerprint), 'cac_clv_scatter')
+
+@st.fragment
+def render_roas_panel(data_root, data_fingerprint):
+    """Chart 3: ROAS Comparison"""
+    st.markdown('<div class="chart-title-compact">📈 ROAS by Platform</div>', unsafe_allow_html=True)
+    
+    results = resolve_panel('roas', data_root, data_fingerprint)
+    roas_data = results['roas_data']
+    bootstrap_intervals = results['bootstrap_intervals']
+    if roas_data is not None and len(roas_data) > 0:
+        best_roas_platform = roas_data.iloc[0]['platform']
+        best_roas_value = roas_data.iloc[0]['roas']
+        
+        # Only call a winner when its interval clears the runner-up's
+        roas_confidence = ""
+        if bootstrap_intervals is not None and len(roas_data) > 1:
+            allocated_intervals = bootstrap_intervals[bootstrap_intervals['metric'] == 'allocated_roas'].set_index('group')
+            runner_up = roas_data.iloc[1]['platform']
+            if best_roas_platform in allocated_intervals.index and runner_up in allocated_intervals.index:
+                best_interval = allocated_intervals.loc[best_roas_platform]
+                if best_interval['lower'] > allocated_intervals.loc[runner_up, 'upper']:
+                    roas_confidence = f"<br>{config.BOOTSTRAP_CONFIDENCE:.0%} CI {best_interval['lower']:.2f}-{best_interval['upper']:.2f}x"
+                else:
+                    roas_confidence = f"<br>Not separable from {runner_up}"
+        
+        render_insight(f"<strong>Best:</strong> {best_roas_platform}<br>{best_roas_value:.2f}x{roas_confidence}")
+    
+    render_chart(results, 'roas_comparison')
+
+@st.fragment
+def render_efficiency_panel(data_root, data_fingerprint):
+    """Chart 4: Weekly Campaign Efficiency Trends"""
+    st.markdown('<div class="chart-title-compact">📈 Weekly Campaign Efficiency</div>', unsafe_allow_html=True)
+    
+    # Widget values reach session state before a rerun, so the nodes resolve with the current toggle
+    results = resolve_panel('efficiency', data_root, data_fingerprint)
+    
+    # Median campaign-day CPC is robust to outlier days
+    cpc_quantiles = results['cpc_quantiles']
+    if cpc_quantiles is not None and len(cpc_quantiles) > 0:
+        best_platform = cpc_quantiles.iloc[0]['platform']
+        best_cpc = cpc_quantiles.iloc[0]['median']
+        render_insight(f"<strong>Best:</strong> {best_platform}<br>${best_cpc:.2f} median CPC")
+    
+    st.toggle("Flag anomalies", value=True, key="show_anomalies")
+    
+    # Long histories are plotted daily and downsampled; narrowing the range restores full resolution
+    efficiency_data = results['efficiency_data']
+    if efficiency_data is not None and len(efficiency_data) > 0 and \
+            efficiency_history_days(efficiency_data) > config.TIMESERIES_MAX_POINTS:
+        first_date = efficiency_data['date'].min().date()
+        last_date = (efficiency_data['date'].max() + pd.Timedelta(days=6)).date()
+        st.slider("Date range", min_value=first_date, max_value=last_date,
+                  value=(first_date, last_date), key="efficiency_range")
+    
+    render_chart(results, 'efficiency_trends')
+
+@st.fragment
+def render_waterfall_panel(data_root, data_fingerprint):
+    """Chart 5: Gross Profit Impact Analysis"""
+    st.markdown('<div class="chart-title-compact">📊 Gross Profit Impact</div>', unsafe_allow_html=True)
+    
+    render_chart(resolve_panel('waterfall', data_root, data_fingerprint), 'gross_profit_waterfall')
+
+@st.fragment
+def render_distribution_panel(data_root, data_fingerprint):
+    """ROW 4: Campaign-day distributions from the ingestion-time quantile sketches"""
+    dist_col1, dist_col2 = st.columns([0.25, 0.75], gap="small")
+    
+    with dist_col1:
+        st.selectbox(
+            "Metric",
+            options=['cpc', 'cpa', 'roas', 'ctr'],
+            format_func=lambda metric: {'cpc': 'CPC', 'cpa': 'CPA', 'roas': 'ROAS', 'ctr': 'CTR'}[metric],
+            key="distribution_metric"
+        )
+        st.radio(
+            "Group by",
+            options=['platform', 'tactic'],
+            format_func=str.title,
+            horizontal=True,
+            key="distribution_dimension"
+        )
+    
+    with dist_col2:
+        render_chart(resolve_panel('distribution', data_root, data_fingerprint), 'metric_distribution')
+
+@st.fragment
+def render_budget_panel(data_root, data_fingerprint):
+    """ROW 5: Budget reallocation from the fitted spend-response curves"""
+    results = resolve_panel('budget', data_root, data_fingerprint)
+    response_curves = results['response_curves']
+    budget_col1, budget_col2 = st.columns([0.25, 0.75], gap="small")
+    
+    with budget_col1:
+        current_budget = float(response_curves['avg_daily_spend'].sum())
+        st.number_input(
+            "Daily budget ($)",
+            min_value=0.0,
+            value=get_default_daily_budget(response_curves),
+            step=1000.0,
+            key="daily_budget"
+        )
+        st.markdown(f'<div class="info-box-compact">Current: ${current_budget:,.0f}/day across {len(response_curves)} campaigns</div>',
+                    unsafe_allow_html=True)
+    
+    with budget_col2:
+        render_chart(results, 'budget_reallocation')
+
+def render_advanced_chart_panel(title, results, chart_id):
+    """One Advanced Campaign Analysis chart in its subsection card"""
+    st.markdown('<div class="chart-subsection">', unsafe_allow_html=True)
+    st.markdown(f'<div class="subsection-title">{title}</div>', unsafe_allow_html=True)
+    
+    render_chart(results, chart_id)
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
+@st.fragment
+def render_advanced_section(data_root, data_fingerprint):
+    """Advanced Campaign Analysis, built only once the toggle is switched on"""
+    show_advanced = st.toggle("Show advanced charts", key="advanced_expanded")
+    
+    # The toggle lives in this fragment, so switching it reruns just this section;
+    # until then nothing is computed
+    if not show_advanced:
+        return
+    
+    with st.container():
+        results = resolve_panel('advanced', data_root, data_fingerprint)
+        
+        # Row 1: Pie Chart and Engagement Metrics (New Charts)
+        advanced_row1_col1, advanced_row1_col2 = st.columns([0.45, 0.55], gap="small")
+        
+        with advanced_row1_col1:
+            render_advanced_chart_panel("🥧 Platform Revenue Distribution", results, 'platform_revenue_pie')
+        
+        with advanced_row1_col2:
+            render_advanced_chart_panel("📊 Reach and Engagement Performance", results, 'engagement_metrics')
+        
+        # Row 2: Heatmap and Funnel (Existing Charts)
+        advanced_row2_col1, advanced_row2_col2 = st.columns([0.45, 0.55], gap="small")
+        
+        with advanced_row2_col1:
+            render_advanced_chart_panel("🎯 Campaign Tactic Analysis", results, 'campaign_tactic_heatmap')
+        
+        with advanced_row2_col2:
+            render_advanced_chart_panel("📈 Conversion Funnel Analysis", results, 'conversion_funnel')
+
+def main():
+    # Dashboard Title - Ultra-compact
+    st.markdown('<h1 class="dashboard-title">Marketing Intelligence Dashboard</h1>', unsafe_allow_html=True)
+    st.session_state['run_started_at'] = time.time()
+    
+    tenant = st.query_params.get('tenant', 'default')
+    data_root = get_tenant_roots().get(tenant)
+    if data_root is None:
+        st.error(f"❌ Unknown tenant '{tenant}'.")
+        return
+    
+    # Read once so the whole run renders one snapshot even if a refresh swaps in mid-run
+    data_fingerprint = get_snapshot_fingerprint(data_root)
+    
+    if config.METRICS_API_ENABLED:
+        get_metrics_api()
+    if config.WARM_CACHES_ON_START:
+        start_cache_warming()
+    
+    # Load and merge data
+    with st.spinner("Loading data..."):
+        data, load_timings = resolve_nodes(['campaign_df', 'business_df'], data_root, data_fingerprint)
+    
+    if data['campaign_df'] is None or data['business_df'] is None:
+        st.error("❌ Could not load data. Please check your CSV files.")
+        return
+    
+    with st.spinner("Preparing dashboard..."):
+        data, merge_timings = resolve_nodes(['merged_df', 'metric_sketches', 'response_curves'], data_root, data_fingerprint)
+    
+    if data['merged_df'] is None:
+        st.error("❌ Could not merge data.")
+        return
+    
+    show_distribution = bool(data['metric_sketches'])
+    show_budget = data['response_curves'] is not None and len(data['response_curves']) > 0
+    
+    # Resolve every visible panel in one parallel pass; each panel below takes its values once
+    panels = ['kpi_row', 'revenue', 'customer_acquisition', 'roas', 'efficiency', 'waterfall']
+    if show_distribution:
+        panels.append('distribution')
+    if show_budget:
+        panels.append('budget')
+    if st.session_state.get('advanced_expanded', False):
+        panels.append('advanced')
+    targets = list(dict.fromkeys(node for panel in panels for node in PANEL_NODES[panel]))
+    panel_results, panel_timings = resolve_nodes(targets, data_root, data_fingerprint)
+    st.session_state['panel_graph_timings'] = load_timings + merge_timings + panel_timings
+    st.session_state['prefetched_panels'] = {panel: {node: panel_results[node] for node in PANEL_NODES[panel]}
+                                             for panel in panels}
+    
+    # ROW 1: MINIMAL KPI Cards
+    st.markdown('<div class="section-header">Key Performance Indicators</div>', unsafe_allow_html=True)
+    render_kpi_row(data_root, data_fingerprint)
     
     # ROW 2: Three Charts - ULTRA-MINIMAL SPACING
     st.markdown('<div class="section-header">Platform Performance Overview</div>', unsafe_allow_html=True)
     
     chart_col1, chart_col2, chart_col3 = st.columns([1, 1, 1], gap="small")
     
-    # Chart 1: Revenue by Platform
     with chart_col1:
-        st.markdown('<div class="chart-title-compact">📊 Revenue by Platform</div>', unsafe_allow_html=True)
-        
-        # Ultra-minimal hover insight
-        from utils.data_loader import get_revenue_by_platform_data
-        platform_revenue = get_revenue_by_platform_data(merged_df)
-        if platform_revenue is not None and len(platform_revenue) > 0:
-            highest_platform = platform_revenue.iloc[0]['platform']
-            highest_revenue = platform_revenue.iloc[0]['total_revenue']
-            
-            st.markdown(f"""
-            <div class="chart-container">
-                <div class="hover-insight">
-                    <strong>Top:</strong> {highest_platform}<br>
-                    ${highest_revenue:,.0f}
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        revenue_chart = create_revenue_by_platform_chart(merged_df)
-        if revenue_chart:
-            revenue_chart.update_layout(height=260, margin=dict(t=20, b=20, l=20, r=20))
-            st.plotly_chart(revenue_chart, use_container_width=True)
+        render_revenue_panel(data_root, data_fingerprint)
     
-    # Chart 2: Customer Acquisition Analysis
     with chart_col2:
-        st.markdown('<div class="chart-title-compact">💰 Customer Acquisition</div>', unsafe_allow_html=True)
-        
-        cac_chart = create_cac_clv_scatter_chart(merged_df)
-        if cac_chart:
-            cac_chart.update_layout(height=260, margin=dict(t=20, b=20, l=20, r=40))
-            st.plotly_chart(cac_chart, use_container_width=True)
+        render_customer_acquisition_panel(data_root, data_fingerprint)
     
-    # Chart 3: ROAS Comparison
     with chart_col3:
-        st.markdown('<div class="chart-title-compact">📈 ROAS by Platform</div>', unsafe_allow_html=True)
-        
-        # Ultra-minimal ROAS insight
-        from utils.data_loader import get_roas_by_platform_data
-        roas_data = get_roas_by_platform_data(merged_df)
-        if roas_data is not None and len(roas_data) > 0:
-            best_roas_platform = roas_data.iloc[0]['platform']
-            best_roas_value = roas_data.iloc[0]['roas']
-            
-            st.markdown(f"""
-            <div class="chart-container">
-                <div class="hover-insight">
-                    <strong>Best:</strong> {best_roas_platform}<br>
-                    {best_roas_value:.2f}x
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        roas_chart = create_roas_comparison_chart(merged_df)
-        if roas_chart:
-            roas_chart.update_layout(height=260, margin=dict(t=20, b=20, l=50, r=20))
-            st.plotly_chart(roas_chart, use_container_width=True)
+        render_roas_panel(data_root, data_fingerprint)
     
     # ROW 3: Two Charts - ULTRA-MINIMAL SPACING
     st.markdown('<div class="section-header">Performance Trends & Profitability</div>', unsafe_allow_html=True)
     
     trend_col1, trend_col2 = st.columns([0.6, 0.4], gap="small")
     
-    # Chart 4: Weekly Campaign Efficiency Trends
     with trend_col1:
-        st.markdown('<div class="chart-title-compact">📈 Weekly Campaign Efficiency</div>', unsafe_allow_html=True)
-        
-        # Ultra-minimal efficiency insight
-        from utils.data_loader import get_efficiency_metrics_data
-        efficiency_data = get_efficiency_metrics_data(merged_df)
-        
-        if efficiency_data is not None and len(efficiency_data) > 0:
-            avg_cpc_by_platform = efficiency_data.groupby('platform')['cpc'].mean().sort_values()
-            best_platform = avg_cpc_by_platform.index[0]
-            best_cpc = avg_cpc_by_platform.iloc[0]
-            
-            st.markdown(f"""
-            <div class="chart-container">
-                <div class="hover-insight">
-                    <strong>Best:</strong> {best_platform}<br>
-                    ${best_cpc:.2f} CPC
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        efficiency_chart = create_efficiency_trends_chart(merged_df)
-        if efficiency_chart:
-            efficiency_chart.update_layout(height=280, margin=dict(t=20, b=20, l=20, r=60))
-            st.plotly_chart(efficiency_chart, use_container_width=True)
+        render_efficiency_panel(data_root, data_fingerprint)
     
-    # Chart 5: Gross Profit Impact Analysis
     with trend_col2:
-        st.markdown('<div class="chart-title-compact">📊 Gross Profit Impact</div>', unsafe_allow_html=True)
-        
-        waterfall_chart = create_gross_profit_waterfall_chart(merged_df)
-        if waterfall_chart:
-            waterfall_chart.update_layout(height=280, margin=dict(t=20, b=20, l=20, r=20))
-            st.plotly_chart(waterfall_chart, use_container_width=True)
+        render_waterfall_panel(data_root, data_fingerprint)
+    
+    # ROW 4: Campaign-day distributions
+    if show_distribution:
+        st.markdown('<div class="section-header">Campaign-Day Distributions</div>', unsafe_allow_html=True)
+        render_distribution_panel(data_root, data_fingerprint)
+    
+    # ROW 5: Budget reallocation
+    if show_budget:
+        st.markdown('<div class="section-header">Budget Reallocation</div>', unsafe_allow_html=True)
+        render_budget_panel(data_root, data_fingerprint)
     
     # ULTRA-MINIMAL Info Boxes - Single Row
     info_col1, info_col2, info_col3 = st.columns(3, gap="small")
@@ -342,55 +584,9 @@ def main():
     st.markdown('<div class="advanced-section-divider"></div>', unsafe_allow_html=True)
     st.markdown('<div class="section-header">Advanced Campaign Analysis</div>', unsafe_allow_html=True)
     
-    # Row 1: Pie Chart and Engagement Metrics (New Charts)
-    advanced_row1_col1, advanced_row1_col2 = st.columns([0.45, 0.55], gap="small")
-    
-    with advanced_row1_col1:
-        st.markdown('<div class="chart-subsection">', unsafe_allow_html=True)
-        st.markdown('<div class="subsection-title">🥧 Platform Revenue Distribution</div>', unsafe_allow_html=True)
-        
-        pie_chart = create_platform_revenue_pie_chart(merged_df)
-        if pie_chart:
-            pie_chart.update_layout(height=320, margin=dict(t=50, b=15, l=15, r=60))
-            st.plotly_chart(pie_chart, use_container_width=True)
-        
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    with advanced_row1_col2:
-        st.markdown('<div class="chart-subsection">', unsafe_allow_html=True)
-        st.markdown('<div class="subsection-title">📊 Reach and Engagement Performance</div>', unsafe_allow_html=True)
-        
-        engagement_chart = create_engagement_metrics_chart(merged_df)
-        if engagement_chart:
-            engagement_chart.update_layout(height=320, margin=dict(t=50, b=15, l=15, r=15))
-            st.plotly_chart(engagement_chart, use_container_width=True)
-        
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    # Row 2: Heatmap and Funnel (Existing Charts)  
-    advanced_row2_col1, advanced_row2_col2 = st.columns([0.45, 0.55], gap="small")
-    
-    with advanced_row2_col1:
-        st.markdown('<div class="chart-subsection">', unsafe_allow_html=True)
-        st.markdown('<div class="subsection-title">🎯 Campaign Tactic Analysis</div>', unsafe_allow_html=True)
-        
-        tactic_chart = create_campaign_tactic_heatmap(merged_df)
-        if tactic_chart:
-            tactic_chart.update_layout(height=320, margin=dict(t=50, b=15, l=15, r=60))
-            st.plotly_chart(tactic_chart, use_container_width=True)
-        
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    with advanced_row2_col2:
-        st.markdown('<div class="chart-subsection">', unsafe_allow_html=True)
-        st.markdown('<div class="subsection-title">📈 Conversion Funnel Analysis</div>', unsafe_allow_html=True)
-        
-        funnel_chart = create_conversion_funnel_chart(merged_df)
-        if funnel_chart:
-            funnel_chart.update_layout(height=320, margin=dict(t=50, b=15, l=15, r=15))
-            st.plotly_chart(funnel_chart, use_container_width=True)
-        
-        st.markdown('</div>', unsafe_allow_html=True)
+    render_advanced_section(data_root, data_fingerprint)
+    # Values a panel did not take must not reach a later fragment rerun
+    st.session_state.pop('prefetched_panels', None)
 
     # Ultra-compact final message with enhanced styling
     st.markdown("""
@@ -411,6 +607,65 @@ def main():
         </span>
     </div>
     """, unsafe_allow_html=True)
+    
+    if config.SHOW_BUILD_TIMINGS:
+        render_build_timings()
+    if config.INSTRUMENTATION_ENABLED:
+        render_performance_spans()
+
+def should_profile_run():
+    """Profile this run when ?profile= carries the admin token, or once after a start when the environment asks"""
+    return token_matches(st.query_params.get('profile')) or claim_next_run()
+
+def run_profiled_main():
+    """Run main() under cProfile for this session only, then store the profile"""
+    profiler = start_rerun_profile()
+    if profiler is None:
+        st.warning("⚠️ Another run is being profiled; this one ran without the profiler.")
+        main()
+        return
+    
+    st.session_state['rerun_profiler'] = profiler
+    try:
+        main()
+    finally:
+        st.session_state.pop('rerun_profiler', None)
+        label = f"{st.query_params.get('tenant', 'default')}-{get_script_run_ctx().session_id[:8]}"
+        st.session_state['rerun_profile'] = finish_rerun_profile(profiler, label)
+        # One run only; this session's later reruns go unprofiled
+        if 'profile' in st.query_params:
+            del st.query_params['profile']
+
+def render_rerun_profile(summary):
+    """Hottest modules and functions of a profiled run, with the .prof file to download"""
+    with st.expander("🧪 Rerun profile", expanded=True):
+        if summary.get('process_wide'):
+            st.caption(f"{summary['seconds']:.2f}s, saved to {summary['path']}. On Python 3.12+ the profile covers "
+                       "every thread in the server process, including other sessions active during the run.")
+        else:
+            st.caption(f"{summary['seconds']:.2f}s across {summary['threads']} threads, saved to {summary['path']}")
+        try:
+            with open(summary['path'], 'rb') as f:
+                st.download_button("Download .prof", f.read(), file_name=os.path.basename(summary['path']),
+                                   mime='application/octet-stream', on_click='ignore')
+        except OSError as e:
+            st.error(f"Error reading profile: {e}")
+        
+        module_df = pd.DataFrame([{'module': module['module'], 'own_ms': round(module['own_seconds'] * 1000, 1)}
+                                  for module in summary['modules']])
+        function_df = pd.DataFrame([
+            {'module': module['module'], 'function': function['function'], 'line': function['line'],
+             'calls': function['calls'], 'own_ms': round(function['own_seconds'] * 1000, 1),
+             'cumulative_ms': round(function['cumulative_seconds'] * 1000, 1)}
+            for module in summary['modules'] for function in module['functions']
+        ])
+        st.dataframe(module_df, hide_index=True, use_container_width=True)
+        st.dataframe(function_df, hide_index=True, use_container_width=True)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if should_profile_run():
+        run_profiled_main()
+    else:
+        main()
+    if 'rerun_profile' in st.session_state:
+        render_rerun_profile(st.session_state['rerun_profile'])
\ No newline at end of file
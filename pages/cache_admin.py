@@ -0,0 +1,64 @@
+import streamlit as st
+import pandas as pd
+import utils.cache_tiers as cache_tiers
+from utils.cache_tiers import get_cache_tiers, get_namespace_usage
+from utils.rerun_profiler import profile_token, token_matches
+import config
+
+st.set_page_config(
+    page_title="Cache Admin",
+    page_icon="🗄️",
+    layout="wide"
+)
+
+def main():
+    st.title("🗄️ Cache Tiers")
+    
+    # Every tenant's namespaces and caches are visible and clearable here, so the page needs the admin token
+    if profile_token() is None:
+        st.info(f"Set {config.PROFILE_TOKEN_ENV_VAR} on the server to use this page.")
+        return
+    if not token_matches(st.text_input("Admin token", type="password", key="admin_token")):
+        return
+    
+    tiers = get_cache_tiers()
+    if not tiers:
+        st.info("No cache tiers are in use yet. Open the dashboard first.")
+        return
+    
+    # Memory per tenant against the global budget, most recently used first
+    usage_df = pd.DataFrame(get_namespace_usage())
+    usage_df['memory_mb'] = (usage_df['bytes'] / 1024 / 1024).round(2)
+    usage_df['idle_min'] = (usage_df['idle_seconds'] / 60).round(1)
+    st.caption(f"{usage_df['memory_mb'].sum():,.1f} MB of {config.CACHE_GLOBAL_MAX_BYTES / 1024 / 1024:,.0f} MB "
+               f"global budget; {cache_tiers.tenant_evictions} tenant evictions")
+    st.dataframe(usage_df[['namespace', 'memory_mb', 'idle_min']], hide_index=True, use_container_width=True)
+    
+    # One row per tenant and tier: budget, TTL, policy, memory and hit rate
+    stats_df = pd.DataFrame([tier.stats() for tier in tiers])
+    stats_df['memory_mb'] = (stats_df['bytes'] / 1024 / 1024).round(2)
+    stats_df['budget_mb'] = (stats_df['max_bytes'] / 1024 / 1024).round(0)
+    stats_df['used_pct'] = (stats_df['bytes'] / stats_df['max_bytes'] * 100).round(1)
+    stats_df['hit_rate'] = (stats_df['hit_rate'] * 100).round(1)
+    st.dataframe(
+        stats_df[['namespace', 'tier', 'policy', 'ttl_seconds', 'entries', 'memory_mb', 'budget_mb', 'used_pct',
+                  'hits', 'misses', 'hit_rate', 'evictions', 'expirations']],
+        hide_index=True,
+        use_container_width=True
+    )
+    
+    for tier in tiers:
+        with st.expander(f"{tier.namespace} / {tier.name} entries"):
+            entries = tier.entries()
+            if entries:
+                entries_df = pd.DataFrame(entries)
+                entries_df['key'] = entries_df['key'].astype(str)
+                entries_df['kb'] = (entries_df['bytes'] / 1024).round(1)
+                entries_df['age_min'] = (entries_df['age_seconds'] / 60).round(1)
+                st.dataframe(entries_df[['key', 'kb', 'age_min']], hide_index=True, use_container_width=True)
+            if st.button(f"Clear {tier.name}", key=f"clear_{tier.namespace}_{tier.name}"):
+                tier.clear()
+                st.rerun()
+
+if __name__ == "__main__":
+    main()
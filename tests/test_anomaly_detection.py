@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.anomaly_detection import MAD_SCALE, rolling_nanmedian, robust_zscores, detect_anomalies
+
+def reference_median(values, window, min_periods):
+    return pd.DataFrame(values).rolling(window, min_periods=min_periods).median().to_numpy()
+
+@pytest.mark.parametrize('window, min_periods', [(7, 3), (14, 7), (4, 4)])
+def test_rolling_median_matches_pandas_with_gaps(window, min_periods):
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(90, 6))
+    values[rng.random(values.shape) < 0.2] = np.nan
+    values[10:30, 2] = np.nan
+
+    np.testing.assert_allclose(rolling_nanmedian(values, window, min_periods),
+                               reference_median(values, window, min_periods), equal_nan=True)
+
+def test_rolling_median_is_blockwise_invariant(monkeypatch):
+    values = np.random.default_rng(1).normal(size=(40, 9))
+    whole = rolling_nanmedian(values, 7, 3)
+    monkeypatch.setattr('utils.anomaly_detection.MEDIAN_BLOCK_CELLS', 1)
+    np.testing.assert_array_equal(rolling_nanmedian(values, 7, 3), whole)
+
+def test_robust_zscores_match_reference():
+    values = np.random.default_rng(2).lognormal(size=(60, 3))
+    window = 14
+    zscores, baseline = robust_zscores(values, window)
+
+    previous = pd.DataFrame(values).shift(1)
+    expected_baseline = previous.rolling(window, min_periods=7).median()
+    expected_mad = (previous - expected_baseline).abs().rolling(window, min_periods=7).median()
+    expected = MAD_SCALE * (pd.DataFrame(values) - expected_baseline) / expected_mad
+
+    np.testing.assert_allclose(baseline, expected_baseline.to_numpy(), equal_nan=True)
+    np.testing.assert_allclose(zscores, expected.to_numpy(), equal_nan=True)
+
+# A weekly CPC cycle: steady enough that only a planted spike stands out
+WEEKLY_CPC = np.array([1.00, 1.02, 0.98, 1.01, 0.99, 1.03, 0.97])
+
+def planted_cube(days=90, spikes=()):
+    """Daily cube rows for two platforms with a weekly CPC cycle and the given (day, platform, factor) spikes"""
+    dates = pd.date_range('2025-01-01', periods=days, freq='D')
+    clicks = np.full(days, 1000.0)
+    rows = []
+    for offset, platform in enumerate(['Facebook', 'Google']):
+        spend = clicks * np.roll(np.resize(WEEKLY_CPC, days), offset)
+        for day, spike_platform, factor in spikes:
+            if spike_platform == platform:
+                spend[day] *= factor
+        rows.append(pd.DataFrame({'date': dates, 'platform': platform, 'spend': spend, 'clicks': clicks,
+                                  'attributed_revenue': spend * 3, 'attributed_orders': clicks / 20}))
+    return pd.concat(rows, ignore_index=True)
+
+def test_planted_spikes_are_the_only_flags():
+    spikes = [(20, 'Facebook', 1.6), (45, 'Google', 0.5), (70, 'Facebook', 2.0)]
+    cube = planted_cube(spikes=spikes)
+    flagged = detect_anomalies(cube, ['platform'], ['cpc'])
+
+    dates = pd.date_range('2025-01-01', periods=90, freq='D')
+    expected = {(dates[day], platform) for day, platform, _ in spikes}
+    assert set(zip(flagged['date'], flagged['platform'])) == expected
+    assert (flagged['robust_z'].abs() > 3.5).all()
+    # Direction follows the spike
+    by_day = flagged.set_index('date')['robust_z']
+    assert by_day[dates[20]] > 0 and by_day[dates[45]] < 0
+
+def test_clean_series_flags_nothing():
+    flagged = detect_anomalies(planted_cube(), ['platform'], ['cpc', 'cpa', 'roas'])
+    assert flagged.empty
+    assert list(flagged.columns) == ['date', 'platform', 'metric', 'value', 'baseline', 'robust_z']
+
+def test_spike_does_not_mask_itself_or_the_next_day():
+    # Two consecutive spikes: the first must not enter the baseline the second is judged against
+    cube = planted_cube(spikes=[(50, 'Google', 1.8), (51, 'Google', 1.8)])
+    flagged = detect_anomalies(cube, ['platform'], ['cpc'])
+    dates = pd.date_range('2025-01-01', periods=90, freq='D')
+    assert set(flagged['date']) == {dates[50], dates[51]}
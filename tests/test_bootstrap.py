@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.bootstrap import (group_sums, resample_group_sums, bootstrap_group_sums, percentile_interval,
+                             group_rows)
+
+def test_group_sums_match_pandas_across_dimensions():
+    rng = np.random.default_rng(0)
+    values = rng.uniform(0, 10, size=(500, 2))
+    platform = rng.integers(0, 3, size=500)
+    tactic = rng.integers(3, 7, size=500)
+    sums = group_sums(values, np.column_stack([platform, tactic]), 7)
+
+    frame = pd.DataFrame(values)
+    np.testing.assert_allclose(sums[:3], frame.groupby(platform).sum().to_numpy())
+    np.testing.assert_allclose(sums[3:], frame.groupby(tactic).sum().to_numpy())
+
+def test_group_rows_partition_every_dimension():
+    group_idx = np.column_stack([[0, 1, 0, 1, 0], [2, 2, 3, 3, 3]])
+    platform, tactic = group_rows(group_idx, 5)
+    assert [(group, list(rows)) for group, rows in platform] == [(0, [0, 2, 4]), (1, [1, 3])]
+    assert [(group, list(rows)) for group, rows in tactic] == [(2, [0, 1]), (3, [2, 3, 4])]
+
+def test_resamples_are_reproducible_and_block_size_invariant(monkeypatch):
+    rng = np.random.default_rng(1)
+    values = rng.uniform(size=(300, 2))
+    group_idx = rng.integers(0, 4, size=300)
+    first = resample_group_sums(values, group_idx, 4, 50, seed=9)
+    np.testing.assert_array_equal(resample_group_sums(values, group_idx, 4, 50, seed=9), first)
+
+    # Blocks draw weights in resample order, so splitting them changes nothing
+    monkeypatch.setattr('utils.bootstrap.MAX_WEIGHT_CELLS', 300 * 7)
+    np.testing.assert_allclose(resample_group_sums(values, group_idx, 4, 50, seed=9), first)
+
+def test_resample_sums_center_on_full_sample_sums():
+    rng = np.random.default_rng(2)
+    values = rng.uniform(1, 5, size=(1_000, 2))
+    group_idx = rng.integers(0, 2, size=1_000)
+    replicates = resample_group_sums(values, group_idx, 2, 2_000, seed=3)
+    np.testing.assert_allclose(replicates.mean(axis=0), group_sums(values, group_idx, 2), rtol=0.01)
+
+def test_ratio_interval_coverage_is_near_nominal():
+    # 400 independent datasets as 400 groups: each campaign-day has spend ~ Gamma and
+    # revenue = spend x a lognormal return, so the true ROAS is E[revenue] / E[spend]
+    rng = np.random.default_rng(4)
+    n_datasets, rows_per_dataset = 400, 150
+    spend = rng.gamma(2.0, 50.0, size=n_datasets * rows_per_dataset)
+    revenue = spend * rng.lognormal(0.5, 0.6, size=len(spend))
+    true_roas = np.exp(0.5 + 0.6 ** 2 / 2)
+    group_idx = np.repeat(np.arange(n_datasets), rows_per_dataset)
+
+    replicates = resample_group_sums(np.column_stack([revenue, spend]), group_idx, n_datasets, 500, seed=5)
+    lower, upper = percentile_interval(replicates[..., 0] / replicates[..., 1], 0.95)
+    coverage = np.mean((lower <= true_roas) & (true_roas <= upper))
+    assert 0.92 <= coverage <= 0.98
+
+def test_percentile_interval_matches_numpy():
+    replicates = np.random.default_rng(6).normal(size=(1_000, 3))
+    lower, upper = percentile_interval(replicates, 0.9)
+    np.testing.assert_allclose(lower, np.percentile(replicates, 5, axis=0))
+    np.testing.assert_allclose(upper, np.percentile(replicates, 95, axis=0))
+
+def test_process_pool_uses_independent_child_streams():
+    rng = np.random.default_rng(7)
+    values = rng.uniform(size=(200, 1))
+    group_idx = rng.integers(0, 2, size=200)
+    pooled = bootstrap_group_sums(values, group_idx, 2, 40, seed=8, n_workers=2, parallel_min_cells=0)
+
+    first, second = np.random.SeedSequence(8).spawn(2)
+    expected = np.concatenate([resample_group_sums(values, group_idx, 2, 20, first),
+                               resample_group_sums(values, group_idx, 2, 20, second)])
+    np.testing.assert_array_equal(pooled, expected)
+    assert not np.array_equal(pooled[:20], pooled[20:])
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.budget_optimizer import fit_response_curves, predict_revenue, optimize_budget
+
+def power_law_cube(campaigns, days=30, seed=0):
+    """Cube rows whose revenue follows scale * spend**elasticity exactly, per (name, scale, elasticity)"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for name, scale, elasticity in campaigns:
+        spend = rng.uniform(50, 500, size=days)
+        rows.append(pd.DataFrame({'platform': 'Google', 'tactic': 'Search', 'campaign': name, 'spend': spend,
+                                  'attributed_revenue': scale * spend ** elasticity}))
+    return pd.concat(rows, ignore_index=True)
+
+def make_curves(scale, elasticity, avg_daily_spend):
+    return pd.DataFrame({'scale': scale, 'elasticity': elasticity, 'avg_daily_spend': avg_daily_spend})
+
+def test_fit_recovers_exact_power_laws():
+    cube = power_law_cube([('a', 4.0, 0.6), ('b', 10.0, 0.3), ('c', 2.5, 0.85)])
+    curves = fit_response_curves(cube).set_index('campaign')
+
+    np.testing.assert_allclose(curves['elasticity'], [0.6, 0.3, 0.85], rtol=1e-9)
+    np.testing.assert_allclose(curves['scale'], [4.0, 10.0, 2.5], rtol=1e-9)
+    np.testing.assert_allclose(curves['r_squared'], 1.0)
+
+def test_fit_matches_per_campaign_polyfit_on_noisy_data():
+    cube = power_law_cube([('a', 4.0, 0.6), ('b', 10.0, 0.3)], seed=1)
+    cube['attributed_revenue'] *= np.random.default_rng(2).lognormal(0, 0.2, size=len(cube))
+    curves = fit_response_curves(cube).set_index('campaign')
+
+    for name, rows in cube.groupby('campaign'):
+        slope, intercept = np.polyfit(np.log(rows['spend']), np.log(rows['attributed_revenue']), 1)
+        assert curves.loc[name, 'raw_elasticity'] == pytest.approx(slope, rel=1e-9)
+        assert np.log(curves.loc[name, 'scale']) == pytest.approx(intercept, rel=1e-9)
+
+def test_fit_clips_elasticity_and_refits_intercept():
+    cube = power_law_cube([('linear', 3.0, 1.2)])
+    curve = fit_response_curves(cube).iloc[0]
+    assert curve['raw_elasticity'] == pytest.approx(1.2)
+    assert curve['elasticity'] == 0.95
+    x, y = np.log(cube['spend']), np.log(cube['attributed_revenue'])
+    assert np.log(curve['scale']) == pytest.approx((y - 0.95 * x).mean())
+
+def test_fit_drops_campaigns_without_two_usable_days():
+    cube = power_law_cube([('a', 4.0, 0.6), ('b', 4.0, 0.6)], days=3)
+    cube.loc[cube['campaign'] == 'b', 'attributed_revenue'] = [0.0, 0.0, 5.0]
+    assert list(fit_response_curves(cube)['campaign']) == ['a']
+
+def test_budget_is_conserved_within_bounds():
+    rng = np.random.default_rng(4)
+    curves = make_curves(rng.uniform(1, 20, 200), rng.uniform(0.1, 0.9, 200), rng.uniform(20, 400, 200))
+    current = curves['avg_daily_spend'].to_numpy()
+
+    for budget in current.sum() * np.array([0.6, 0.9, 1.0, 1.3, 1.9]):
+        spend = optimize_budget(curves, budget)
+        assert spend.sum() == pytest.approx(budget, rel=1e-9)
+        assert (spend >= current * 0.5 - 1e-9).all()
+        assert (spend <= current * 2.0 + 1e-9).all()
+
+def test_infeasible_budgets_pin_every_campaign_to_a_bound():
+    curves = make_curves([5.0, 8.0], [0.5, 0.7], [100.0, 300.0])
+    np.testing.assert_array_equal(optimize_budget(curves, 10.0), [50.0, 150.0])
+    np.testing.assert_array_equal(optimize_budget(curves, 10_000.0), [200.0, 600.0])
+
+def test_interior_optimum_matches_closed_form():
+    # With a shared elasticity e, equal marginals give spend proportional to scale**(1 / (1 - e))
+    scale = np.array([2.0, 3.0, 5.0])
+    curves = make_curves(scale, 0.5, [100.0, 100.0, 100.0])
+    share = scale ** 2 / (scale ** 2).sum()
+    budget = 250.0
+    expected = budget * share
+    spend = optimize_budget(curves, budget, min_ratio=0.1, max_ratio=3.0)
+    assert ((expected > 10) & (expected < 300)).all()
+    np.testing.assert_allclose(spend, expected, rtol=1e-9)
+
+def test_optimum_beats_feasible_perturbations():
+    rng = np.random.default_rng(5)
+    curves = make_curves(rng.uniform(1, 20, 20), rng.uniform(0.2, 0.8, 20), rng.uniform(50, 300, 20))
+    lower, upper = curves['avg_daily_spend'] * 0.5, curves['avg_daily_spend'] * 2.0
+    budget = curves['avg_daily_spend'].sum() * 1.2
+    spend = optimize_budget(curves, budget)
+    best = predict_revenue(curves['scale'], curves['elasticity'], spend).sum()
+
+    for _ in range(200):
+        i, j = rng.choice(20, size=2, replace=False)
+        shift = min(spend[i] - lower[i], upper[j] - spend[j]) * rng.random()
+        moved = spend.copy()
+        moved[i] -= shift
+        moved[j] += shift
+        assert predict_revenue(curves['scale'], curves['elasticity'], moved).sum() <= best * (1 + 1e-12)
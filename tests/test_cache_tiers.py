@@ -0,0 +1,126 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from utils.cache_tiers import CacheTier, estimate_size
+
+def make_tier(max_bytes=300, **kwargs):
+    return CacheTier('test', max_bytes, **kwargs)
+
+def test_byte_accounting_tracks_puts_replacements_and_clear():
+    tier = make_tier()
+    tier.put('a', 'x', size=100)
+    tier.put('b', 'y', size=50)
+    assert tier.current_bytes == 150
+
+    tier.put('a', 'z', size=30)
+    assert tier.current_bytes == 80
+    assert tier.get('a') == 'z'
+
+    tier.clear()
+    assert tier.current_bytes == 0
+    assert tier.entries() == []
+
+def test_estimated_size_is_used_when_none_given():
+    tier = make_tier(max_bytes=10_000)
+    frame = pd.DataFrame({'value': np.arange(100, dtype='float64')})
+    tier.put('frame', frame)
+    assert tier.current_bytes == estimate_size(frame)
+    assert tier.entries()[0]['bytes'] == estimate_size(frame)
+
+def test_value_larger_than_budget_is_not_stored():
+    tier = make_tier(max_bytes=100)
+    tier.put('big', 'x', size=101)
+    assert tier.get('big') is None
+    assert tier.current_bytes == 0
+
+def test_lru_evicts_least_recently_used():
+    tier = make_tier(policy='lru')
+    for key in 'abc':
+        tier.put(key, key, size=100)
+    assert tier.get('a') == 'a'
+
+    tier.put('d', 'd', size=100)
+    assert tier.get('b') is None
+    assert [entry['key'] for entry in tier.entries()] == ['c', 'a', 'd']
+    assert tier.evictions == 1
+    assert tier.current_bytes == 300
+
+def test_fifo_evicts_oldest_regardless_of_reads():
+    tier = make_tier(policy='fifo')
+    for key in 'abc':
+        tier.put(key, key, size=100)
+    assert tier.get('a') == 'a'
+
+    tier.put('d', 'd', size=200)
+    assert tier.get('a') is None
+    assert tier.get('b') is None
+    assert [entry['key'] for entry in tier.entries()] == ['c', 'd']
+    assert tier.evictions == 2
+    assert tier.current_bytes == 300
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        make_tier(policy='random')
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    tier = make_tier(ttl_seconds=10)
+    tier.put('a', 'x', size=100)
+
+    now[0] += 10
+    assert tier.get('a') == 'x'
+
+    now[0] += 0.5
+    assert tier.get('a') is None
+    assert tier.expirations == 1
+    assert tier.current_bytes == 0
+
+def test_hit_and_miss_counts():
+    tier = make_tier()
+    tier.get('a')
+    tier.put('a', 'x', size=10)
+    tier.get('a')
+    tier.get('a')
+    stats = tier.stats()
+    assert (stats['hits'], stats['misses']) == (2, 1)
+    assert stats['hit_rate'] == pytest.approx(2 / 3)
+
+def test_concurrent_misses_share_one_computation():
+    # The value is too large to store, so waiters can only get it from the shared outcome
+    tier = make_tier(max_bytes=10)
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def compute():
+        calls.append(True)
+        started.set()
+        release.wait(5)
+        return 'x' * 100
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(tier.get_or_compute('k', compute)))
+    first.start()
+    started.wait(5)
+    waiters = [threading.Thread(target=lambda: results.append(tier.get_or_compute('k', compute))) for _ in range(4)]
+    for thread in waiters:
+        thread.start()
+    # Give the waiters time to queue behind the running computation
+    time.sleep(0.1)
+    release.set()
+    for thread in [first] + waiters:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == ['x' * 100] * 5
+    assert tier._in_flight == {}
+
+def test_failed_computation_is_retried_on_next_call():
+    tier = make_tier()
+    outcomes = iter([None, 'x'])
+    assert tier.get_or_compute('k', lambda: next(outcomes)) is None
+    assert tier.get_or_compute('k', lambda: next(outcomes)) == 'x'
+    assert tier.get('k') == 'x'
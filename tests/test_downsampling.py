@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.downsampling import lttb_indices, downsample_series
+
+def reference_lttb(x, y, threshold):
+    """Point-by-point LTTB as originally described (Steinarsson, 2013)"""
+    n = len(x)
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        avg_start = int(np.floor((i + 1) * every)) + 1
+        avg_end = min(int(np.floor((i + 2) * every)) + 1, n)
+        avg_x, avg_y = np.mean(x[avg_start:avg_end]), np.mean(y[avg_start:avg_end])
+
+        range_start = int(np.floor(i * every)) + 1
+        range_end = int(np.floor((i + 1) * every)) + 1
+        best, best_area = range_start, -1.0
+        for j in range(range_start, range_end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a])) / 2
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return np.array(selected)
+
+@pytest.mark.parametrize('n, threshold', [(10, 3), (1_000, 100), (5_000, 1_000), (1_001, 1_000), (7_919, 123)])
+def test_matches_reference_lttb(n, threshold):
+    rng = np.random.default_rng(n)
+    x = np.cumsum(rng.uniform(0.5, 1.5, size=n))
+    y = np.cumsum(rng.normal(size=n))
+    np.testing.assert_array_equal(lttb_indices(x, y, threshold), reference_lttb(x, y, threshold))
+
+@pytest.mark.parametrize('n, threshold', [(100, 3), (100, 99), (10_000, 1_000), (3_653, 1_000)])
+def test_keeps_endpoints_and_exact_point_count(n, threshold):
+    y = np.random.default_rng(0).normal(size=n)
+    keep = lttb_indices(np.arange(n), y, threshold)
+    assert len(keep) == threshold
+    assert keep[0] == 0 and keep[-1] == n - 1
+    assert (np.diff(keep) > 0).all()
+
+def test_short_series_and_degenerate_thresholds_keep_every_point():
+    np.testing.assert_array_equal(lttb_indices(np.arange(50), np.zeros(50), 50), np.arange(50))
+    np.testing.assert_array_equal(lttb_indices(np.arange(50), np.zeros(50), 2), np.arange(50))
+
+def test_isolated_spike_survives():
+    y = np.zeros(10_000)
+    y[6_543] = 25.0
+    keep = lttb_indices(np.arange(len(y)), y, 500)
+    assert 6_543 in keep
+
+def test_downsample_series_returns_aligned_dates_and_values():
+    dates = pd.date_range('2020-01-01', periods=3_000, freq='D')
+    values = np.sin(np.arange(3_000) / 50)
+    kept_dates, kept_values = downsample_series(dates, values, 1_000)
+
+    assert len(kept_dates) == len(kept_values) == 1_000
+    assert kept_dates[0] == dates[0] and kept_dates[-1] == dates[-1]
+    np.testing.assert_array_equal(kept_values, values[dates.get_indexer(kept_dates)])
+
+    same_dates, same_values = downsample_series(dates[:500], values[:500], 1_000)
+    assert same_dates.equals(dates[:500])
+    np.testing.assert_array_equal(same_values, values[:500])
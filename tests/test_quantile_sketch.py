@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.quantile_sketch import KLLSketch, update_grouped_sketches, merge_grouped_sketches
+
+QUANTILES = np.linspace(0.01, 0.99, 99)
+
+def max_rank_error(sketch, values):
+    """Largest gap between a quantile and the true rank of the sketch's estimate for it"""
+    ordered = np.sort(values)
+    estimates = sketch.quantile(QUANTILES)
+    ranks = np.searchsorted(ordered, estimates, side='right') / len(ordered)
+    return np.abs(ranks - QUANTILES).max()
+
+def test_small_stream_is_exact():
+    values = np.random.default_rng(1).normal(size=100)
+    sketch = KLLSketch(k=200, seed=0).update(values)
+    expected = np.sort(values)[np.ceil(QUANTILES * 100).astype(int) - 1]
+    np.testing.assert_array_equal(sketch.quantile(QUANTILES), expected)
+
+@pytest.mark.parametrize('seed', range(5))
+def test_rank_error_stays_within_bound(seed):
+    values = np.random.default_rng(seed).lognormal(0, 1, size=200_000)
+    sketch = KLLSketch(k=200, seed=seed)
+    for batch in np.array_split(values, 50):
+        sketch.update(batch)
+    assert sketch.count == len(values)
+    assert max_rank_error(sketch, values) < 0.02
+
+def test_merged_sketch_keeps_bound_and_extremes():
+    rng = np.random.default_rng(7)
+    parts = [rng.exponential(scale, size=50_000) for scale in [1, 5, 20]]
+    merged = KLLSketch(k=200, seed=0)
+    for part in parts:
+        merged.merge(KLLSketch(k=200, seed=1).update(part))
+    values = np.concatenate(parts)
+
+    assert merged.count == len(values)
+    assert max_rank_error(merged, values) < 0.02
+    assert merged.quantile(0.0) == values.min()
+    assert merged.quantile(1.0) == values.max()
+
+def test_non_finite_values_are_ignored():
+    sketch = KLLSketch().update([1.0, np.nan, np.inf, -np.inf, 3.0])
+    assert sketch.count == 2
+    assert np.isnan(KLLSketch().quantile(0.5))
+
+def test_seeded_sketches_are_reproducible():
+    values = np.random.default_rng(3).normal(size=20_000)
+    first = KLLSketch(k=50, seed=11).update(values)
+    second = KLLSketch(k=50, seed=11).update(values)
+    np.testing.assert_array_equal(first.quantile(QUANTILES), second.quantile(QUANTILES))
+
+def test_grouped_sketches_match_one_pass_over_all_chunks():
+    rng = np.random.default_rng(5)
+    frame = pd.DataFrame({'platform': rng.choice(['Facebook', 'Google'], size=40_000),
+                          'cpc': rng.gamma(2.0, 0.5, size=40_000)})
+    chunked = {}
+    for start in range(0, len(frame), 10_000):
+        chunk = frame.iloc[start:start + 10_000]
+        merge_grouped_sketches(chunked, update_grouped_sketches({}, chunk, ['platform'], ['cpc']))
+
+    for platform, values in frame.groupby('platform')['cpc']:
+        sketch = chunked[('platform', platform, 'cpc')]
+        assert sketch.count == len(values)
+        assert max_rank_error(sketch, values.to_numpy()) < 0.02
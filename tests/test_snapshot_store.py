@@ -0,0 +1,114 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import config
+from utils.snapshot_store import (read_snapshot_entry, write_snapshot_entry, snapshot_dir, tenant_snapshot_root,
+                                  list_snapshot_entries, prune_snapshots, prune_snapshot_entries, persisted)
+
+@pytest.fixture(autouse=True)
+def snapshot_root(tmp_path, monkeypatch):
+    # An absolute SNAPSHOT_DIR replaces the project-relative one
+    monkeypatch.setattr(config, 'SNAPSHOT_DIR', str(tmp_path / 'snapshots'))
+    monkeypatch.setattr(config, 'SNAPSHOTS_ENABLED', True)
+    return tmp_path
+
+def test_frames_round_trip_through_feather():
+    frame = pd.DataFrame({'date': pd.date_range('2025-01-01', periods=5), 'platform': list('abcab'),
+                          'spend': np.linspace(0, 1, 5), 'clicks': np.arange(5)})
+    assert write_snapshot_entry('data', 'fp1', 'frame', frame)
+    assert os.path.exists(os.path.join(snapshot_dir('data', 'fp1'), 'frame.feather'))
+    pd.testing.assert_frame_equal(read_snapshot_entry('data', 'fp1', 'frame'), frame)
+
+def test_frames_arrow_cannot_store_fall_back_to_pickle():
+    frame = pd.DataFrame({'label': [1, 'mixed'], 'value': [3.0, 4.0]})
+    assert write_snapshot_entry('data', 'fp1', 'mixed', frame)
+    assert sorted(os.listdir(snapshot_dir('data', 'fp1'))) == ['mixed.pkl']
+    pd.testing.assert_frame_equal(read_snapshot_entry('data', 'fp1', 'mixed'), frame)
+
+def test_text_and_objects_round_trip():
+    sketches = {('platform', 'Google', 'cpc'): np.arange(3.0)}
+    assert write_snapshot_entry('data', 'fp1', 'figure', '{"data": []}')
+    assert write_snapshot_entry('data', 'fp1', 'sketches', sketches)
+
+    assert read_snapshot_entry('data', 'fp1', 'figure') == '{"data": []}'
+    restored = read_snapshot_entry('data', 'fp1', 'sketches')
+    np.testing.assert_array_equal(restored[('platform', 'Google', 'cpc')], np.arange(3.0))
+    assert {(entry['entry'], entry['format']) for entry in list_snapshot_entries('data', 'fp1')} == \
+        {('figure', 'json'), ('sketches', 'pkl')}
+
+def test_missing_or_damaged_entries_read_as_none():
+    assert read_snapshot_entry('data', 'fp1', 'absent') is None
+    assert list_snapshot_entries('data', 'absent') == []
+
+    write_snapshot_entry('data', 'fp1', 'broken', {'a': 1})
+    with open(os.path.join(snapshot_dir('data', 'fp1'), 'broken.pkl'), 'wb') as f:
+        f.write(b'not a pickle')
+    assert read_snapshot_entry('data', 'fp1', 'broken') is None
+
+def test_tenants_and_fingerprints_are_kept_apart():
+    write_snapshot_entry('data', 'fp1', 'value', 'one')
+    write_snapshot_entry('data', 'fp2', 'value', 'two')
+    write_snapshot_entry('other/data', 'fp1', 'value', 'three')
+    assert read_snapshot_entry('data', 'fp1', 'value') == 'one'
+    assert read_snapshot_entry('data', 'fp2', 'value') == 'two'
+    assert read_snapshot_entry('other/data', 'fp1', 'value') == 'three'
+
+def test_prune_keeps_most_recent_snapshots(monkeypatch):
+    monkeypatch.setattr(config, 'SNAPSHOT_KEEP', 10)
+    for age, fingerprint in enumerate(['fp4', 'fp3', 'fp2', 'fp1']):
+        write_snapshot_entry('data', fingerprint, 'value', fingerprint)
+        os.utime(snapshot_dir('data', fingerprint), (1_000_000 - age, 1_000_000 - age))
+
+    prune_snapshots('data', keep=2)
+    assert sorted(os.listdir(tenant_snapshot_root('data'))) == \
+        sorted(os.path.basename(snapshot_dir('data', fingerprint)) for fingerprint in ['fp4', 'fp3'])
+
+def test_new_snapshot_prunes_to_configured_keep(monkeypatch):
+    monkeypatch.setattr(config, 'SNAPSHOT_KEEP', 2)
+    for age, fingerprint in enumerate(['fp1', 'fp2', 'fp3']):
+        write_snapshot_entry('data', fingerprint, 'value', fingerprint)
+        os.utime(snapshot_dir('data', fingerprint), (1_000_000 + age, 1_000_000 + age))
+    write_snapshot_entry('data', 'fp4', 'value', 'fp4')
+    assert len(os.listdir(tenant_snapshot_root('data'))) == 2
+    assert read_snapshot_entry('data', 'fp1', 'value') is None
+    assert read_snapshot_entry('data', 'fp4', 'value') == 'fp4'
+
+def test_prune_entries_keeps_most_recently_used_with_prefix():
+    directory = snapshot_dir('data', 'fp1')
+    for used, name in enumerate(['figure-a', 'figure-b', 'figure-c', 'model']):
+        write_snapshot_entry('data', 'fp1', name, name)
+        os.utime(os.path.join(directory, name + '.json'), (1_000_000 + used, 1_000_000 + used))
+    # Reading an entry marks it as recently used
+    read_snapshot_entry('data', 'fp1', 'figure-a')
+
+    prune_snapshot_entries('data', 'fp1', 'figure-', keep=2)
+    assert sorted(os.listdir(directory)) == ['figure-a.json', 'figure-c.json', 'model.json']
+
+def test_persisted_loader_computes_once_per_fingerprint():
+    calls = []
+
+    @persisted
+    def load_totals(data_root, data_fingerprint, scale=1):
+        calls.append((data_fingerprint, scale))
+        return pd.DataFrame({'total': [10 * scale]})
+
+    first = load_totals('data', 'fp1')
+    pd.testing.assert_frame_equal(load_totals('data', 'fp1'), first)
+    load_totals('data', 'fp1', scale=2)
+    load_totals('data', 'fp2')
+    assert calls == [('fp1', 1), ('fp1', 2), ('fp2', 1)]
+
+def test_persisted_loader_skips_disk_when_snapshots_are_off(monkeypatch):
+    monkeypatch.setattr(config, 'SNAPSHOTS_ENABLED', False)
+    calls = []
+
+    @persisted
+    def load_value(data_root, data_fingerprint):
+        calls.append(data_fingerprint)
+        return 'value'
+
+    load_value('data', 'fp1')
+    load_value('data', 'fp1')
+    assert calls == ['fp1', 'fp1']
+    assert not os.path.exists(tenant_snapshot_root('data'))
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Scales MAD to the standard deviation of a normal distribution
+MAD_SCALE = 0.6745
+
+# Cells per block when computing window medians, bounds the (series x days x window) buffer
+MEDIAN_BLOCK_CELLS = 4_000_000
+
+def index_cube_series(cube, series_columns):
+    """Map cube rows to (day, series) matrix coordinates"""
+    dates = pd.DatetimeIndex(cube['date'])
+    start = dates.min().normalize()
+    day_idx = ((dates - start) // pd.Timedelta(days=1)).to_numpy()
+    all_dates = pd.date_range(start, periods=int(day_idx.max()) + 1, freq='D')
+
+    grouped = cube.groupby(series_columns, sort=True)
+    series_idx = grouped.ngroup().to_numpy()
+    series_keys = grouped.size().index
+    return day_idx, series_idx, all_dates, series_keys
+
+def scatter_sum(values, day_idx, series_idx, shape):
+    """Sum values into a (days x series) matrix; cells with no rows stay NaN"""
+    flat_idx = day_idx * shape[1] + series_idx
+    size = shape[0] * shape[1]
+    totals = np.bincount(flat_idx, weights=values, minlength=size)
+    counts = np.bincount(flat_idx, minlength=size)
+    totals[counts == 0] = np.nan
+    return totals.reshape(shape)
+
+def compute_metric_matrices(cube, series_columns):
+    """Build wide spend/CPC/CPA/ROAS matrices for every series in one pass"""
+    day_idx, series_idx, all_dates, series_keys = index_cube_series(cube, series_columns)
+    shape = (len(all_dates), len(series_keys))
+
+    spend, clicks, revenue, orders = [
+        scatter_sum(cube[column].to_numpy(dtype=float), day_idx, series_idx, shape)
+        for column in ['spend', 'clicks', 'attributed_revenue', 'attributed_orders']
+    ]
+
+    # Ratios with a zero denominator are undefined, not zero
+    with np.errstate(divide='ignore', invalid='ignore'):
+        matrices = {
+            'spend': spend,
+            'cpc': np.where(clicks > 0, spend / clicks, np.nan),
+            'cpa': np.where(orders > 0, spend / orders, np.nan),
+            'roas': np.where(spend > 0, revenue / spend, np.nan)
+        }
+    return matrices, all_dates, series_keys
+
+def rolling_nanmedian(values, window, min_periods):
+    """Trailing-window median down axis 0 of a (days x series) matrix, ignoring NaN"""
+    # Series-major layout keeps every window contiguous, which makes the sort cheap
+    series_major = np.hstack([np.full((values.shape[1], window - 1), np.nan), values.T])
+    result = np.full(values.shape[::-1], np.nan)
+    block = max(1, MEDIAN_BLOCK_CELLS // max(1, values.shape[0] * window))
+
+    # Valid-value count per window from a running sum, not a per-window reduction
+    present = np.cumsum(~np.isnan(series_major), axis=1)
+    valid = present[:, window - 1:] - np.hstack([np.zeros((values.shape[1], 1), dtype=present.dtype),
+                                                 present[:, :-window]])
+
+    for start in range(0, values.shape[1], block):
+        stop = min(start + block, values.shape[1])
+        # Windows come out as (series, days, window); sorting pushes NaN to the end
+        windows = np.sort(sliding_window_view(series_major[start:stop], window, axis=1), axis=-1)
+        medians = (windows[..., (window - 1) // 2] + windows[..., window // 2]) / 2
+
+        # Windows with gaps take the middle of their valid items instead
+        block_valid = valid[start:stop]
+        gaps = block_valid < window
+        if gaps.any():
+            partial = windows[gaps]
+            partial_valid = block_valid[gaps]
+            lower = np.take_along_axis(partial, np.maximum((partial_valid - 1) // 2, 0)[:, None], axis=-1)[:, 0]
+            upper = np.take_along_axis(partial, np.maximum(partial_valid // 2, 0)[:, None], axis=-1)[:, 0]
+            medians[gaps] = np.where(partial_valid >= min_periods, (lower + upper) / 2, np.nan)
+
+        result[start:stop] = medians
+
+    return result.T
+
+def robust_zscores(wide, window, min_periods=None):
+    """Rolling robust z-scores (median/MAD) against each series' trailing window"""
+    if min_periods is None:
+        min_periods = max(3, window // 2)
+
+    # Shift by one day so a point never masks itself in its own baseline
+    previous = np.vstack([np.full((1, wide.shape[1]), np.nan), wide[:-1]])
+    baseline = rolling_nanmedian(previous, window, min_periods)
+    # MAD over each day's deviation from its own trailing median keeps this a
+    # pair of rolling medians instead of a per-window Python loop
+    mad = rolling_nanmedian(np.abs(previous - baseline), window, min_periods)
+
+    # A flat window (MAD of zero) gives no scale to judge against
+    with np.errstate(divide='ignore', invalid='ignore'):
+        zscores = np.where(mad > 0, MAD_SCALE * (wide - baseline) / mad, np.nan)
+    return zscores, baseline
+
+def detect_anomalies(cube, series_columns, metrics, window=14, threshold=3.5):
+    """Flag points whose robust z-score exceeds the threshold, across all series at once"""
+    matrices, all_dates, series_keys = compute_metric_matrices(cube, series_columns)
+
+    flagged_frames = []
+    for metric in metrics:
+        wide = matrices[metric]
+        zscores, baseline = robust_zscores(wide, window)
+        with np.errstate(invalid='ignore'):
+            row_idx, col_idx = np.nonzero(np.abs(zscores) > threshold)
+
+        if len(row_idx) == 0:
+            continue
+
+        if len(series_columns) == 1:
+            flagged = pd.DataFrame({series_columns[0]: np.asarray(series_keys)[col_idx]})
+        else:
+            flagged = series_keys[col_idx].to_frame(index=False, name=series_columns)
+        flagged.insert(0, 'date', all_dates[row_idx])
+        flagged['metric'] = metric
+        flagged['value'] = wide[row_idx, col_idx]
+        flagged['baseline'] = baseline[row_idx, col_idx]
+        flagged['robust_z'] = zscores[row_idx, col_idx]
+        flagged_frames.append(flagged)
+
+    if not flagged_frames:
+        return pd.DataFrame(columns=['date'] + list(series_columns) +
+                            ['metric', 'value', 'baseline', 'robust_z'])
+
+    return pd.concat(flagged_frames, ignore_index=True).sort_values(['date'] + list(series_columns))
@@ -0,0 +1,217 @@
+import argparse
+import html
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+import config
+from utils.data_loader import (load_campaign_data, load_business_data, load_merged_data, load_anomaly_data,
+                               get_data_fingerprint, get_tenant_roots, warm_data_snapshot, build_rollup_cube,
+                               get_platform_daily_data, calculate_kpis, get_revenue_by_platform_data,
+                               get_roas_by_platform_data, get_engagement_metrics_data,
+                               get_campaign_tactic_heatmap_data, get_conversion_funnel_data)
+from utils.budget_optimizer import fit_response_curves
+from utils.customer_value import build_customer_value_model
+from utils.quantile_sketch import update_grouped_sketches
+from utils.chart_functions import (create_revenue_by_platform_chart, create_efficiency_trends_chart,
+                                   create_roas_comparison_chart, create_cac_clv_scatter_chart,
+                                   create_gross_profit_waterfall_chart, create_campaign_tactic_heatmap,
+                                   create_conversion_funnel_chart, create_platform_revenue_pie_chart,
+                                   create_engagement_metrics_chart, create_metric_distribution_chart,
+                                   create_budget_reallocation_chart)
+
+# Report sections in order: (chart id, title, builder over the window inputs); every dataset
+# comes from the window's rows, so no chart falls back to the full history
+REPORT_CHARTS = [
+    ('revenue_by_platform', "Revenue by Platform",
+     lambda inputs: create_revenue_by_platform_chart(inputs['merged_df'], inputs['platform_revenue'])),
+    ('cac_clv_scatter', "Customer Acquisition",
+     lambda inputs: create_cac_clv_scatter_chart(inputs['merged_df'], inputs['customer_value_model'])),
+    ('roas_comparison', "ROAS by Platform",
+     lambda inputs: create_roas_comparison_chart(inputs['merged_df'], roas_data=inputs['roas_data'])),
+    ('efficiency_trends', "Weekly Campaign Efficiency",
+     lambda inputs: create_efficiency_trends_chart(inputs['merged_df'], inputs['anomalies'])),
+    ('gross_profit_waterfall', "Gross Profit Impact",
+     lambda inputs: create_gross_profit_waterfall_chart(inputs['merged_df'])),
+    ('metric_distribution', "Campaign-Day CPC Distribution",
+     lambda inputs: create_metric_distribution_chart(inputs['sketches'], 'cpc', 'platform')),
+    ('budget_reallocation', "Budget Reallocation",
+     lambda inputs: create_budget_reallocation_chart(inputs['response_curves'])),
+    ('platform_revenue_pie', "Platform Revenue Share",
+     lambda inputs: create_platform_revenue_pie_chart(inputs['merged_df'], inputs['platform_revenue'],
+                                                      inputs['roas_data'])),
+    ('engagement_metrics', "Reach and Engagement",
+     lambda inputs: create_engagement_metrics_chart(inputs['merged_df'], inputs['engagement_data'])),
+    ('campaign_tactic_heatmap', "Campaign Tactic Effectiveness",
+     lambda inputs: create_campaign_tactic_heatmap(inputs['merged_df'], inputs['heatmap_data'])),
+    ('conversion_funnel', "Conversion Funnel",
+     lambda inputs: create_conversion_funnel_chart(inputs['merged_df'], inputs['funnel_data']))
+]
+
+def _in_window(df, start, end):
+    return df[(df['date'] >= start) & (df['date'] <= end)]
+
+def _cube_sketches(cube):
+    """Campaign-day CPC, CPA, ROAS and CTR sketches from a rollup cube, as load_metric_sketches builds from the CSVs"""
+    spend = cube['spend'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        metrics = cube[['platform', 'tactic']].assign(
+            cpc=np.where(cube['clicks'] > 0, spend / cube['clicks'].to_numpy(dtype=float), np.nan),
+            cpa=np.where(cube['attributed_orders'] > 0, spend / cube['attributed_orders'].to_numpy(dtype=float), np.nan),
+            roas=np.where(spend > 0, cube['attributed_revenue'].to_numpy(dtype=float) / spend, np.nan),
+            ctr=np.where(cube['impressions'] > 0,
+                         100 * cube['clicks'].to_numpy(dtype=float) / cube['impressions'].to_numpy(dtype=float), np.nan)
+        )
+    return update_grouped_sketches({}, metrics, ['platform', 'tactic'], config.SKETCH_METRICS,
+                                   k=config.SKETCH_K, seed=config.SKETCH_SEED)
+
+def build_window_inputs(data_root, data_fingerprint, start, end):
+    """Merged rows, the chart datasets over them and the cube-derived models for one tenant and date window"""
+    campaign_df = _in_window(load_campaign_data(data_root, data_fingerprint), start, end)
+    business_df = _in_window(load_business_data(data_root, data_fingerprint), start, end)
+    merged_df = _in_window(load_merged_data(data_root, data_fingerprint), start, end)
+    if merged_df.empty:
+        raise ValueError(f"No data between {start:%Y-%m-%d} and {end:%Y-%m-%d}")
+
+    cube = build_rollup_cube(campaign_df, business_df)
+    anomalies = load_anomaly_data(data_root, data_fingerprint)
+    min_elasticity, max_elasticity = config.RESPONSE_ELASTICITY_RANGE
+    return {
+        'merged_df': merged_df,
+        'platform_revenue': get_revenue_by_platform_data(merged_df),
+        'roas_data': get_roas_by_platform_data(merged_df),
+        'engagement_data': get_engagement_metrics_data(merged_df),
+        'heatmap_data': get_campaign_tactic_heatmap_data(merged_df),
+        'funnel_data': get_conversion_funnel_data(merged_df),
+        # Anomalies are detected over the full history so the rolling baselines are warm at the window start
+        'anomalies': None if anomalies is None else _in_window(anomalies, start, end),
+        'customer_value_model': build_customer_value_model(get_platform_daily_data(merged_df)),
+        'response_curves': fit_response_curves(cube, min_elasticity, max_elasticity),
+        'sketches': _cube_sketches(cube)
+    }
+
+def render_report_html(title, kpis, sections):
+    """Self-contained HTML page: a KPI header and one section per (title, figure); plotly.js is inlined once"""
+    total_revenue, total_orders, avg_cogs, overall_roas = kpis
+    kpi_items = [("Total Revenue", f"${total_revenue:,.0f}"), ("Total Orders", f"{total_orders:,.0f}"),
+                 ("Avg COGS", f"{avg_cogs:.1f}%"), ("ROAS", f"{overall_roas:.2f}x")]
+
+    parts = [
+        "<!DOCTYPE html>",
+        f"<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title>",
+        "<style>body{font-family:Arial,sans-serif;margin:24px}"
+        ".kpis{display:flex;gap:32px}.kpi b{display:block;font-size:22px}</style></head><body>",
+        f"<h1>{html.escape(title)}</h1>",
+        "<div class=\"kpis\">" + "".join(f"<div class=\"kpi\">{label}<b>{value}</b></div>" for label, value in kpi_items) + "</div>"
+    ]
+    for idx, (section_title, fig) in enumerate(sections):
+        parts.append(f"<h2>{html.escape(section_title)}</h2>")
+        parts.append(fig.to_html(full_html=False, include_plotlyjs=idx == 0))
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+def run_report_job(job, output_dir):
+    """Build one report in a worker process; returns the job with its path, timings and any error"""
+    result = dict(job, path=None, seconds=None, error=None, charts={})
+    job_start = time.perf_counter()
+    try:
+        start, end = pd.Timestamp(job['start']), pd.Timestamp(job['end'])
+        stage_start = time.perf_counter()
+        inputs = build_window_inputs(job['data_root'], job['data_fingerprint'], start, end)
+        result['charts']['inputs'] = time.perf_counter() - stage_start
+
+        sections = []
+        for chart_id, title, build in REPORT_CHARTS:
+            stage_start = time.perf_counter()
+            fig = build(inputs)
+            result['charts'][chart_id] = time.perf_counter() - stage_start
+            if fig is not None:
+                sections.append((title, fig))
+
+        title = f"Marketing Report: {job['tenant']}, {job['start']} to {job['end']}"
+        path = os.path.join(output_dir, f"{job['tenant']}_{job['start']}_{job['end']}.html")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(render_report_html(title, calculate_kpis(inputs['merged_df']), sections))
+        result['path'] = path
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = time.perf_counter() - job_start
+    return result
+
+def weekly_windows(dates):
+    """(start, end) date strings for consecutive Monday-to-Sunday weeks covering dates"""
+    first = dates.min() - pd.Timedelta(days=dates.min().weekday())
+    return [(week.strftime('%Y-%m-%d'), (week + pd.Timedelta(days=6)).strftime('%Y-%m-%d'))
+            for week in pd.date_range(first, dates.max(), freq='7D')]
+
+def plan_report_jobs(tenants, windows=None, weekly=False):
+    """One job per tenant and window; the tenant's full date span when no windows are given
+
+    Warms each tenant's on-disk snapshot first so every worker memory-maps the
+    same read-only frames instead of parsing the CSVs again.
+    """
+    tenant_roots = get_tenant_roots()
+    jobs = []
+    for tenant in tenants:
+        data_root = tenant_roots[tenant]
+        data_fingerprint = get_data_fingerprint(data_root)
+        warm_data_snapshot(data_root, data_fingerprint)
+
+        dates = load_merged_data(data_root, data_fingerprint)['date']
+        if weekly:
+            tenant_windows = weekly_windows(dates)
+        else:
+            tenant_windows = windows or [(dates.min().strftime('%Y-%m-%d'), dates.max().strftime('%Y-%m-%d'))]
+        jobs.extend({'tenant': tenant, 'data_root': data_root, 'data_fingerprint': data_fingerprint,
+                     'start': start, 'end': end} for start, end in tenant_windows)
+    return jobs
+
+def run_report_batch(jobs, output_dir=config.REPORT_OUTPUT_DIR, max_workers=config.REPORT_WORKERS):
+    """Run report jobs across a process pool; writes and returns the summary"""
+    os.makedirs(output_dir, exist_ok=True)
+    batch_start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_report_job, job, output_dir) for job in jobs]
+        for future in as_completed(futures):
+            results.append(future.result())
+
+    results.sort(key=lambda result: (result['tenant'], result['start']))
+    summary = {
+        'jobs': len(results),
+        'failed': sum(result['error'] is not None for result in results),
+        'seconds': time.perf_counter() - batch_start,
+        'results': [{key: value for key, value in result.items() if key != 'data_root'} for result in results]
+    }
+    with open(os.path.join(output_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+def _parse_window(value):
+    start, _, end = value.partition(':')
+    # Validate now rather than inside a worker
+    pd.Timestamp(start), pd.Timestamp(end)
+    return start, end
+
+if __name__ == '__main__':
+    tenant_roots = get_tenant_roots()
+    parser = argparse.ArgumentParser(description="Write static HTML dashboard reports per tenant and date window")
+    parser.add_argument('--tenant', action='append', choices=list(tenant_roots),
+                        help="Tenant to report on (repeatable); every tenant by default")
+    parser.add_argument('--window', action='append', type=_parse_window, metavar='START:END',
+                        help="Date window, e.g. 2025-06-01:2025-06-30 (repeatable); the full span by default")
+    parser.add_argument('--weekly', action='store_true', help="One report per Monday-to-Sunday week")
+    parser.add_argument('--output-dir', default=config.REPORT_OUTPUT_DIR)
+    parser.add_argument('--workers', type=int, default=config.REPORT_WORKERS)
+    args = parser.parse_args()
+
+    jobs = plan_report_jobs(args.tenant or list(tenant_roots), args.window, args.weekly)
+    summary = run_report_batch(jobs, args.output_dir, args.workers)
+
+    for result in summary['results']:
+        status = result['path'] if result['error'] is None else f"FAILED {result['error']}"
+        print(f"{result['tenant']:<12} {result['start']} to {result['end']}  {result['seconds']:6.2f}s  {status}")
+    print(f"{summary['jobs']} reports, {summary['failed']} failed, {summary['seconds']:.1f}s; "
+          f"summary in {os.path.join(args.output_dir, 'summary.json')}")
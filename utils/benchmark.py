@@ -0,0 +1,228 @@
+import argparse
+import inspect
+import json
+import os
+import platform
+import sys
+import time
+import pandas as pd
+import config
+from utils.cache_tiers import get_cache_tiers
+from utils.synthetic_data import generate_dataset
+from utils.data_loader import (load_campaign_data, load_business_data, merge_campaign_business_data,
+                               load_merged_data, load_rollup_cube, load_metric_sketches, load_anomaly_data, load_response_curves,
+                               load_customer_value_model, get_data_fingerprint, calculate_kpis,
+                               get_revenue_by_platform_data, get_roas_by_platform_data,
+                               get_campaign_tactic_heatmap_data, get_conversion_funnel_data,
+                               get_engagement_metrics_data, get_cac_clv_data, get_gross_profit_attribution_data,
+                               get_efficiency_metrics_data, get_platform_daily_data, get_metric_quantile_data,
+                               get_budget_allocation_data)
+from utils.chart_functions import (create_revenue_by_platform_chart, create_efficiency_trends_chart,
+                                   create_roas_comparison_chart, create_cac_clv_scatter_chart,
+                                   create_gross_profit_waterfall_chart, create_campaign_tactic_heatmap,
+                                   create_conversion_funnel_chart, create_platform_revenue_pie_chart,
+                                   create_engagement_metrics_chart, create_metric_distribution_chart,
+                                   create_budget_reallocation_chart)
+
+# Stages in pipeline order, as (name, function of the context of earlier stage results)
+LOAD_STAGES = [
+    ('load_campaign_data', lambda ctx: load_campaign_data(ctx['data_root'], ctx['data_fingerprint'])),
+    ('load_business_data', lambda ctx: load_business_data(ctx['data_root'], ctx['data_fingerprint'])),
+    ('merge_campaign_business_data', lambda ctx: merge_campaign_business_data(
+        ctx['load_campaign_data'], ctx['load_business_data']))
+]
+
+# Models the metrics and charts take as inputs, built from the loaded data. Each stage calls the
+# loader past its cache and snapshot wrappers, so it times the model itself; the merged frame and
+# rollup cube it reads are loaded beforehand, outside the timed region
+MODEL_STAGES = [
+    ('load_metric_sketches', lambda ctx: inspect.unwrap(load_metric_sketches)(ctx['data_root'], ctx['data_fingerprint'])),
+    ('load_anomaly_data', lambda ctx: inspect.unwrap(load_anomaly_data)(ctx['data_root'], ctx['data_fingerprint'])),
+    ('load_response_curves', lambda ctx: inspect.unwrap(load_response_curves)(ctx['data_root'], ctx['data_fingerprint'])),
+    ('load_customer_value_model', lambda ctx: inspect.unwrap(load_customer_value_model)(
+        ctx['data_root'], ctx['data_fingerprint']))
+]
+
+METRIC_STAGES = [
+    ('calculate_kpis', lambda ctx: calculate_kpis(ctx['merged_df'])),
+    ('get_revenue_by_platform_data', lambda ctx: get_revenue_by_platform_data(ctx['merged_df'])),
+    ('get_roas_by_platform_data', lambda ctx: get_roas_by_platform_data(ctx['merged_df'])),
+    ('get_campaign_tactic_heatmap_data', lambda ctx: get_campaign_tactic_heatmap_data(ctx['merged_df'])),
+    ('get_conversion_funnel_data', lambda ctx: get_conversion_funnel_data(ctx['merged_df'])),
+    ('get_engagement_metrics_data', lambda ctx: get_engagement_metrics_data(ctx['merged_df'])),
+    ('get_cac_clv_data', lambda ctx: get_cac_clv_data(ctx['merged_df'], ctx['load_customer_value_model'])),
+    ('get_gross_profit_attribution_data', lambda ctx: get_gross_profit_attribution_data(ctx['merged_df'])),
+    ('get_efficiency_metrics_data', lambda ctx: get_efficiency_metrics_data(ctx['merged_df'])),
+    ('get_platform_daily_data', lambda ctx: get_platform_daily_data(ctx['merged_df'])),
+    ('get_metric_quantile_data', lambda ctx: get_metric_quantile_data(ctx['load_metric_sketches'])),
+    ('get_budget_allocation_data', lambda ctx: get_budget_allocation_data(ctx['load_response_curves']))
+]
+
+# Charts get their datasets from the metric stages, so these time figure building alone
+CHART_STAGES = [
+    ('create_revenue_by_platform_chart', lambda ctx: create_revenue_by_platform_chart(
+        ctx['merged_df'], ctx['get_revenue_by_platform_data'])),
+    ('create_cac_clv_scatter_chart', lambda ctx: create_cac_clv_scatter_chart(
+        ctx['merged_df'], ctx['load_customer_value_model'])),
+    ('create_roas_comparison_chart', lambda ctx: create_roas_comparison_chart(
+        ctx['merged_df'], roas_data=ctx['get_roas_by_platform_data'])),
+    ('create_efficiency_trends_chart', lambda ctx: create_efficiency_trends_chart(
+        ctx['merged_df'], ctx['load_anomaly_data'], ctx['get_efficiency_metrics_data'])),
+    ('create_gross_profit_waterfall_chart', lambda ctx: create_gross_profit_waterfall_chart(ctx['merged_df'])),
+    ('create_metric_distribution_chart', lambda ctx: create_metric_distribution_chart(ctx['load_metric_sketches'])),
+    ('create_budget_reallocation_chart', lambda ctx: create_budget_reallocation_chart(ctx['load_response_curves'])),
+    ('create_platform_revenue_pie_chart', lambda ctx: create_platform_revenue_pie_chart(
+        ctx['merged_df'], ctx['get_revenue_by_platform_data'], ctx['get_roas_by_platform_data'])),
+    ('create_engagement_metrics_chart', lambda ctx: create_engagement_metrics_chart(
+        ctx['merged_df'], ctx['get_engagement_metrics_data'])),
+    ('create_campaign_tactic_heatmap', lambda ctx: create_campaign_tactic_heatmap(
+        ctx['merged_df'], ctx['get_campaign_tactic_heatmap_data'])),
+    ('create_conversion_funnel_chart', lambda ctx: create_conversion_funnel_chart(
+        ctx['merged_df'], ctx['get_conversion_funnel_data']))
+]
+
+def dataset_root(scale):
+    return os.path.join(config.BENCHMARK_DIR, 'data', scale)
+
+def ensure_dataset(scale):
+    """Data root for a benchmark scale, generated on first use or when its parameters change"""
+    params = config.BENCHMARK_SCALES[scale]
+    data_root = dataset_root(scale)
+    params_path = os.path.join(data_root, 'params.json')
+    if os.path.exists(params_path):
+        with open(params_path, encoding='utf-8') as f:
+            if json.load(f) == params:
+                return data_root
+
+    generate_dataset(data_root, **params)
+    with open(params_path, 'w', encoding='utf-8') as f:
+        json.dump(params, f)
+    return data_root
+
+def _clear_namespace(data_root):
+    for tier in get_cache_tiers():
+        if tier.namespace == data_root:
+            tier.clear()
+
+def run_pipeline(data_root, measure):
+    """Run every stage in order on one data root with snapshots off
+
+    measure(name, call) runs a stage via call() and returns its value. The
+    tenant's caches are cleared before each load stage so every load reads
+    the CSVs; the model stages' shared inputs are then loaded untimed.
+    """
+    snapshots_enabled = config.SNAPSHOTS_ENABLED
+    config.SNAPSHOTS_ENABLED = False
+    ctx = {'data_root': data_root, 'data_fingerprint': get_data_fingerprint(data_root)}
+
+    def call_cold(func):
+        _clear_namespace(data_root)
+        return func(ctx)
+
+    try:
+        for name, func in LOAD_STAGES:
+            ctx[name] = measure(name, lambda: call_cold(func))
+        ctx['merged_df'] = ctx['merge_campaign_business_data']
+
+        _clear_namespace(data_root)
+        load_merged_data(data_root, ctx['data_fingerprint'])
+        load_rollup_cube(data_root, ctx['data_fingerprint'])
+        for name, func in MODEL_STAGES + METRIC_STAGES + CHART_STAGES:
+            ctx[name] = measure(name, lambda: func(ctx))
+    finally:
+        _clear_namespace(data_root)
+        config.SNAPSHOTS_ENABLED = snapshots_enabled
+    return ctx
+
+def run_stages(data_root, repeats=1):
+    """Best-of-repeats seconds per stage on one data root, from cold caches and without snapshots"""
+    seconds = {}
+
+    def measure(name, call):
+        for _ in range(repeats):
+            start = time.perf_counter()
+            value = call()
+            elapsed = time.perf_counter() - start
+            seconds[name] = min(seconds.get(name, elapsed), elapsed)
+        return value
+
+    run_pipeline(data_root, measure)
+    return seconds
+
+def run_benchmark(scales, repeats=1):
+    """Stage timings for each scale, with the rows benchmarked and the environment"""
+    results = {
+        'created': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'scales': {}
+    }
+    for scale in scales:
+        data_root = ensure_dataset(scale)
+        params = config.BENCHMARK_SCALES[scale]
+        results['scales'][scale] = {
+            'campaign_rows': params['days'] * params['campaigns'],
+            'stages': run_stages(data_root, repeats)
+        }
+    return results
+
+def compare_to_baseline(results, baseline, tolerance=None, min_seconds=None):
+    """One row per stage timed in both runs; regressions are slower by more than the tolerance and min_seconds"""
+    tolerance = config.BENCHMARK_REGRESSION_TOLERANCE if tolerance is None else tolerance
+    min_seconds = config.BENCHMARK_MIN_REGRESSION_SECONDS if min_seconds is None else min_seconds
+    rows = []
+    for scale, scale_results in results['scales'].items():
+        baseline_stages = baseline.get('scales', {}).get(scale, {}).get('stages', {})
+        for stage, seconds in scale_results['stages'].items():
+            if stage not in baseline_stages:
+                continue
+            baseline_seconds = baseline_stages[stage]
+            rows.append({
+                'scale': scale,
+                'stage': stage,
+                'seconds': seconds,
+                'baseline_seconds': baseline_seconds,
+                'ratio': seconds / baseline_seconds if baseline_seconds else float('inf'),
+                'regression': seconds > baseline_seconds * (1 + tolerance) and seconds - baseline_seconds > min_seconds
+            })
+    return rows
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Time every pipeline stage across data scales and flag regressions")
+    parser.add_argument('--scale', action='append', choices=list(config.BENCHMARK_SCALES),
+                        help="Scale to run (repeatable); BENCHMARK_DEFAULT_SCALES by default")
+    parser.add_argument('--repeats', type=int, default=config.BENCHMARK_REPEATS)
+    parser.add_argument('--baseline', default=os.path.join(config.BENCHMARK_DIR, 'baseline.json'))
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+    parser.add_argument('--output', help="Also write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.scale or config.BENCHMARK_DEFAULT_SCALES, args.repeats)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    flags = {(row['scale'], row['stage']): row for row in compare_to_baseline(results, baseline)} if baseline else {}
+
+    for scale, scale_results in results['scales'].items():
+        print(f"\n{scale} ({scale_results['campaign_rows']:,} campaign rows)")
+        for stage, seconds in scale_results['stages'].items():
+            row = flags.get((scale, stage))
+            versus = f"  {row['ratio']:5.2f}x baseline{'  REGRESSION' if row['regression'] else ''}" if row else ""
+            print(f"  {stage:<38} {seconds * 1000:10.1f} ms{versus}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+    elif baseline:
+        regressions = [row for row in flags.values() if row['regression']]
+        print(f"\n{len(regressions)} regressions against {args.baseline}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,77 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# Upper bound on (resamples x rows) weight cells generated at once
+MAX_WEIGHT_CELLS = 20_000_000
+
+def group_rows(group_idx, n_rows):
+    """Row indices of every group, one list per dimension
+
+    group_idx may be (rows,) or (rows x dimensions) when each row belongs to one
+    group per dimension (e.g. its platform and its tactic); group numbers must
+    then be distinct across dimensions.
+    """
+    rows_by_group = []
+    for dimension_idx in np.asarray(group_idx).reshape(n_rows, -1).T:
+        order = np.argsort(dimension_idx, kind='stable')
+        groups, starts = np.unique(dimension_idx[order], return_index=True)
+        rows_by_group.append(list(zip(groups, np.split(order, starts[1:]))))
+    return rows_by_group
+
+def group_sums(values, group_idx, n_groups):
+    """Full-sample group sums, shaped (groups, values)"""
+    values = np.asarray(values, dtype=float)
+    sums = np.zeros((n_groups, values.shape[1]))
+    for dimension_idx in np.asarray(group_idx).reshape(len(values), -1).T:
+        for value_idx in range(values.shape[1]):
+            sums[:, value_idx] += np.bincount(dimension_idx, weights=values[:, value_idx], minlength=n_groups)
+    return sums
+
+def resample_group_sums(values, group_idx, n_groups, n_resamples, seed=None):
+    """Poisson-bootstrap group sums, shaped (resamples, groups, values)
+
+    Each campaign-day gets an independent Poisson(1) weight per resample, the
+    standard streaming-friendly stand-in for multinomial resampling. A block
+    of resamples is summed one group at a time as a (resamples x group rows)
+    @ (group rows x values) product, so memory stays at the weight block
+    rather than growing with rows x groups.
+    """
+    values = np.asarray(values, dtype=float)
+    rng = np.random.default_rng(seed)
+    rows_by_group = group_rows(group_idx, len(values))
+    sums = np.zeros((n_resamples, n_groups, values.shape[1]))
+
+    block = max(1, MAX_WEIGHT_CELLS // max(1, len(values)))
+    for start in range(0, n_resamples, block):
+        stop = min(start + block, n_resamples)
+        weights = rng.poisson(1.0, size=(stop - start, len(values))).astype(float)
+        for dimension in rows_by_group:
+            for group, rows in dimension:
+                sums[start:stop, group] += weights[:, rows] @ values[rows]
+
+    return sums
+
+def bootstrap_group_sums(values, group_idx, n_groups, n_resamples, seed=0,
+                         n_workers=None, parallel_min_cells=200_000_000):
+    """Bootstrap group sums, spreading large resample counts across a process pool"""
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_workers == 1 or n_resamples * len(values) < parallel_min_cells:
+        return resample_group_sums(values, group_idx, n_groups, n_resamples, seed)
+
+    # Independent child seeds keep worker streams from overlapping
+    child_seeds = np.random.SeedSequence(seed).spawn(n_workers)
+    resample_counts = [len(chunk) for chunk in np.array_split(np.arange(n_resamples), n_workers)]
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [
+            executor.submit(resample_group_sums, values, group_idx, n_groups, count, child_seed)
+            for count, child_seed in zip(resample_counts, child_seeds) if count > 0
+        ]
+        return np.concatenate([future.result() for future in futures], axis=0)
+
+def percentile_interval(replicates, confidence=0.95):
+    """Percentile confidence interval along the resample axis"""
+    tail = (1 - confidence) / 2 * 100
+    lower, upper = np.nanpercentile(replicates, [tail, 100 - tail], axis=0)
+    return lower, upper
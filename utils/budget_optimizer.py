@@ -0,0 +1,92 @@
+import numpy as np
+
+def fit_response_curves(cube, min_elasticity=0.05, max_elasticity=0.95):
+    """Fit revenue = scale * spend**elasticity per campaign in one batched least-squares pass"""
+    grouped = cube.groupby(['platform', 'tactic', 'campaign'], sort=True)
+    campaign_idx = grouped.ngroup().to_numpy()
+    campaign_keys = grouped.size().index
+    n_campaigns = len(campaign_keys)
+
+    spend = cube['spend'].to_numpy(dtype=float)
+    revenue = cube['attributed_revenue'].to_numpy(dtype=float)
+    usable = (spend > 0) & (revenue > 0)
+
+    # Log-log OLS per campaign from grouped sufficient statistics
+    idx = campaign_idx[usable]
+    x = np.log(spend[usable])
+    y = np.log(revenue[usable])
+    n = np.bincount(idx, minlength=n_campaigns).astype(float)
+    sum_x = np.bincount(idx, weights=x, minlength=n_campaigns)
+    sum_y = np.bincount(idx, weights=y, minlength=n_campaigns)
+    sum_xx = np.bincount(idx, weights=x * x, minlength=n_campaigns)
+    sum_xy = np.bincount(idx, weights=x * y, minlength=n_campaigns)
+    sum_yy = np.bincount(idx, weights=y * y, minlength=n_campaigns)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var_x = n * sum_xx - sum_x ** 2
+        var_y = n * sum_yy - sum_y ** 2
+        cov_xy = n * sum_xy - sum_x * sum_y
+        raw_elasticity = np.where(var_x > 0, cov_xy / var_x, 1.0)
+        r_squared = np.where((var_x > 0) & (var_y > 0), cov_xy ** 2 / (var_x * var_y), np.nan)
+
+        # Clip to a diminishing-returns curve and refit the intercept for the clipped slope
+        elasticity = np.clip(raw_elasticity, min_elasticity, max_elasticity)
+        log_scale = (sum_y - elasticity * sum_x) / n
+
+    # Average daily spend and revenue per campaign anchor the reallocation bounds
+    days = np.bincount(campaign_idx, minlength=n_campaigns).astype(float)
+    avg_daily_spend = np.bincount(campaign_idx, weights=spend, minlength=n_campaigns) / days
+    avg_daily_revenue = np.bincount(campaign_idx, weights=revenue, minlength=n_campaigns) / days
+
+    curves = campaign_keys.to_frame(index=False)
+    curves['scale'] = np.exp(log_scale)
+    curves['elasticity'] = elasticity
+    curves['raw_elasticity'] = raw_elasticity
+    curves['r_squared'] = r_squared
+    curves['days'] = n
+    curves['avg_daily_spend'] = avg_daily_spend
+    curves['avg_daily_revenue'] = avg_daily_revenue
+
+    # Campaigns with fewer than two usable days cannot be fitted
+    return curves[n >= 2].reset_index(drop=True)
+
+def predict_revenue(scale, elasticity, spend):
+    """Predicted daily revenue on each campaign's response curve"""
+    return scale * np.power(np.maximum(spend, 0), elasticity)
+
+def optimize_budget(curves, total_budget, min_ratio=0.5, max_ratio=2.0, iterations=100):
+    """Split a daily budget across campaigns to maximize predicted revenue
+
+    Each campaign stays within [min_ratio, max_ratio] of its current average
+    daily spend. The optimum equalizes marginal revenue across campaigns, so we
+    bisect on that shared marginal value for all campaigns at once.
+    """
+    scale = curves['scale'].to_numpy(dtype=float)
+    elasticity = curves['elasticity'].to_numpy(dtype=float)
+    lower = curves['avg_daily_spend'].to_numpy(dtype=float) * min_ratio
+    upper = curves['avg_daily_spend'].to_numpy(dtype=float) * max_ratio
+
+    # An infeasible budget pins every campaign to its bound
+    if total_budget <= lower.sum():
+        return lower
+    if total_budget >= upper.sum():
+        return upper
+
+    def spend_at(log_marginal):
+        # Solve scale * elasticity * s**(elasticity - 1) = marginal for s
+        log_spend = (log_marginal - np.log(scale * elasticity)) / (elasticity - 1)
+        return np.clip(np.exp(log_spend), lower, upper)
+
+    # Spend falls as the marginal value rises; bracket it by the marginals at the bounds
+    marginal_at_lower = np.log(scale * elasticity) + (elasticity - 1) * np.log(lower)
+    marginal_at_upper = np.log(scale * elasticity) + (elasticity - 1) * np.log(upper)
+    low, high = marginal_at_upper.min(), marginal_at_lower.max()
+
+    for _ in range(iterations):
+        mid = (low + high) / 2
+        if spend_at(mid).sum() > total_budget:
+            low = mid
+        else:
+            high = mid
+
+    return spend_at((low + high) / 2)
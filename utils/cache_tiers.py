@@ -0,0 +1,253 @@
+import functools
+import sys
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import config
+from utils.shared_frames import shared_view
+from utils.instrumentation import record_span, row_count
+
+EVICTION_POLICIES = ['lru', 'fifo']
+
+def estimate_size(value):
+    """Approximate bytes held by a cached value"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(estimate_size(key) + estimate_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sum(estimate_size(item) for item in value)
+    if hasattr(value, '__dict__'):
+        return estimate_size(vars(value))
+    return sys.getsizeof(value)
+
+class CacheTier:
+    """Named cache with a byte budget, optional TTL and LRU or FIFO eviction
+
+    Registered tiers belong to a namespace (a tenant's data root) and count
+    towards the global budget across all tenants.
+    """
+
+    def __init__(self, name, max_bytes, ttl_seconds=None, policy='lru', namespace=None):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy '{policy}'")
+        self.name = name
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.policy = policy
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def _expired(self, entry):
+        return self.ttl_seconds is not None and time.monotonic() - entry['created'] > self.ttl_seconds
+
+    def _lookup(self, key, record=True):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry):
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += record
+                return None
+            if self.policy == 'lru':
+                self._entries.move_to_end(key)
+            self.hits += record
+            return entry['value']
+
+    def get(self, key):
+        """Return the stored value for key, or None on a miss or expiry"""
+        return self._lookup(key)
+
+    def put(self, key, value, size=None):
+        """Store a value, evicting entries in policy order until it fits"""
+        size = estimate_size(value) if size is None else size
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while self._entries and self.current_bytes + size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            self._entries[key] = {'value': value, 'size': size, 'created': time.monotonic()}
+            self.current_bytes += size
+        if self.namespace is not None:
+            enforce_memory_budget(self.namespace)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value, computing it once even when several threads miss together
+
+        Threads that miss while a computation is running wait for it and share
+        its outcome, including a value too large to store or a failed load.
+        """
+        value = self._lookup(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            flight = self._in_flight.setdefault(key, {'lock': threading.Lock(), 'waiters': 0, 'done': False, 'value': None})
+            flight['waiters'] += 1
+        try:
+            with flight['lock']:
+                if not flight['done']:
+                    # An earlier computation may have filled the entry since our miss
+                    value = self._lookup(key, record=False)
+                    if value is None:
+                        value = compute()
+                        # Failed loads return None and are retried on the next call
+                        if value is not None:
+                            self.put(key, value)
+                    flight['value'] = value
+                    flight['done'] = True
+                return flight['value']
+        finally:
+            # The last waiter retires the computation, so later misses start a new one
+            with self._lock:
+                flight['waiters'] -= 1
+                if flight['waiters'] == 0:
+                    self._in_flight.pop(key, None)
+
+    def _remove(self, key):
+        self.current_bytes -= self._entries.pop(key)['size']
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def entries(self):
+        """Key, size and age of every entry, most recently used last"""
+        now = time.monotonic()
+        with self._lock:
+            return [{'key': key, 'bytes': entry['size'], 'age_seconds': now - entry['created']}
+                    for key, entry in self._entries.items()]
+
+    def stats(self):
+        """Hit/miss counts and memory use"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'namespace': self.namespace,
+                'tier': self.name,
+                'policy': self.policy,
+                'ttl_seconds': self.ttl_seconds,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+# Tiers by (namespace, name), and when each namespace was last used
+_tiers = {}
+_namespace_last_used = {}
+_tiers_lock = threading.Lock()
+tenant_evictions = 0
+
+def register_tier(tier):
+    """Make a tier visible to get_cache_tier and the admin page; an existing tier of that name wins"""
+    if tier.namespace is None:
+        tier.namespace = config.DATA_ROOT
+    with _tiers_lock:
+        _namespace_last_used[tier.namespace] = time.monotonic()
+        return _tiers.setdefault((tier.namespace, tier.name), tier)
+
+def get_cache_tier(name, namespace=None, tier_class=CacheTier):
+    """Process-wide tier by name within a namespace, created from config.CACHE_TIERS on first use"""
+    namespace = config.DATA_ROOT if namespace is None else namespace
+    with _tiers_lock:
+        _namespace_last_used[namespace] = time.monotonic()
+        if (namespace, name) not in _tiers:
+            _tiers[(namespace, name)] = tier_class(name, namespace=namespace, **config.CACHE_TIERS[name])
+        return _tiers[(namespace, name)]
+
+def get_cache_tiers():
+    with _tiers_lock:
+        return list(_tiers.values())
+
+def get_namespace_usage():
+    """Bytes held and seconds since last use per namespace, most recently used first"""
+    now = time.monotonic()
+    with _tiers_lock:
+        usage = {namespace: 0 for namespace in _namespace_last_used}
+        for (namespace, _), tier in _tiers.items():
+            usage[namespace] += tier.current_bytes
+        return [{'namespace': namespace, 'bytes': usage[namespace], 'idle_seconds': now - last_used}
+                for namespace, last_used in sorted(_namespace_last_used.items(), key=lambda item: -item[1])]
+
+def enforce_memory_budget(active_namespace):
+    """Clear the least recently used namespaces until all tiers fit config.CACHE_GLOBAL_MAX_BYTES
+
+    The active namespace is never cleared; its own tier budgets bound it, so
+    one large tenant cannot push out every other tenant.
+    """
+    global tenant_evictions
+    with _tiers_lock:
+        namespace_tiers = {}
+        for (namespace, _), tier in _tiers.items():
+            namespace_tiers.setdefault(namespace, []).append(tier)
+        total_bytes = sum(tier.current_bytes for tiers in namespace_tiers.values() for tier in tiers)
+        if total_bytes <= config.CACHE_GLOBAL_MAX_BYTES:
+            return
+
+        for namespace in sorted(namespace_tiers, key=lambda name: _namespace_last_used.get(name, 0)):
+            if total_bytes <= config.CACHE_GLOBAL_MAX_BYTES:
+                break
+            namespace_bytes = sum(tier.current_bytes for tier in namespace_tiers[namespace])
+            if namespace == active_namespace or namespace_bytes == 0:
+                continue
+            for tier in namespace_tiers[namespace]:
+                tier.clear()
+            total_bytes -= namespace_bytes
+            tenant_evictions += 1
+
+def cached(tier_name):
+    """Memoize a function in a named tier, keyed by its arguments
+
+    The first argument is the tenant data root and selects the cache
+    namespace. Every caller of a DataFrame result gets a shallow view; with
+    copy-on-write, sessions share one copy without being able to modify it.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+
+            computed = []
+
+            def compute():
+                computed.append(True)
+                return func(*args, **kwargs)
+
+            if not config.INSTRUMENTATION_ENABLED:
+                value = get_cache_tier(tier_name, args[0]).get_or_compute(key, compute)
+                return shared_view(value) if isinstance(value, pd.DataFrame) else value
+
+            start = time.perf_counter()
+            value = get_cache_tier(tier_name, args[0]).get_or_compute(key, compute)
+            record_span('cache', func.__name__, time.perf_counter() - start, cache='miss' if computed else 'hit',
+                        rows=row_count(value), tier=tier_name, namespace=args[0])
+            return shared_view(value) if isinstance(value, pd.DataFrame) else value
+        return wrapper
+    return decorator
@@ -1,13 +1,23 @@
+import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
+from utils.figure_payload import build_dashboard_template
+from utils.instrumentation import timed
 import config
 
-def create_revenue_by_platform_chart(merged_df):
+# Shared look for every chart, including the white hover label
+pio.templates['dashboard'] = build_dashboard_template()
+pio.templates.default = 'dashboard'
+
+@timed('chart')
+def create_revenue_by_platform_chart(merged_df, revenue_data=None):
     """Create Revenue by Platform Bar Chart"""
     from utils.data_loader import get_revenue_by_platform_data
     
-    revenue_data = get_revenue_by_platform_data(merged_df)
+    if revenue_data is None:
+        revenue_data = get_revenue_by_platform_data(merged_df)
     
     if revenue_data is None or len(revenue_data) == 0:
         return None
@@ -48,24 +58,18 @@ def create_revenue_by_platform_chart(merged_df):
             gridcolor='rgba(128,128,128,0.2)',
             tickfont=dict(size=10)
         ),
-        title_font=dict(size=12),
-        # White background hover
-        hoverlabel=dict(
-            bgcolor="white",
-            bordercolor="black",
-            font_size=12,
-            font_family="Arial",
-            font_color="black"
-        )
+        title_font=dict(size=12)
     )
     
     return fig
 
-def create_campaign_tactic_heatmap(merged_df):
+@timed('chart')
+def create_campaign_tactic_heatmap(merged_df, heatmap_data=None):
     """Create Campaign Tactic Effectiveness Matrix Heatmap - FIXED TITLE SPACING"""
     from utils.data_loader import get_campaign_tactic_heatmap_data
     
-    heatmap_data = get_campaign_tactic_heatmap_data(merged_df)
+    if heatmap_data is None:
+        heatmap_data = get_campaign_tactic_heatmap_data(merged_df)
     
     if heatmap_data is None or len(heatmap_data) == 0:
         return None
@@ -108,23 +112,18 @@ def create_campaign_tactic_heatmap(merged_df):
             tickfont=dict(size=10),
             title_standoff=20  # FIXED: Add space between axis and title
         ),
-        title_font=dict(size=14),  # FIXED: Smaller title font
-        hoverlabel=dict(
-            bgcolor="white",
-            bordercolor="black",
-            font_size=12,
-            font_family="Arial",
-            font_color="black"
-        )
+        title_font=dict(size=14)  # FIXED: Smaller title font
     )
     
     return fig
 
-def create_conversion_funnel_chart(merged_df):
+@timed('chart')
+def create_conversion_funnel_chart(merged_df, funnel_data=None):
     """Create Marketing Funnel Performance by Platform - NEW IMPROVED VERSION"""
     from utils.data_loader import get_conversion_funnel_data
     
-    funnel_data = get_conversion_funnel_data(merged_df)
+    if funnel_data is None:
+        funnel_data = get_conversion_funnel_data(merged_df)
     
     if funnel_data is None or len(funnel_data) == 0:
         return None
@@ -159,7 +158,7 @@ def create_conversion_funnel_chart(merged_df):
         # Prepare funnel data
         funnel_values = []
         funnel_labels = []
-        hover_data = []
+        hover_rows = []
         conversion_rates = []
         
         # Calculate conversion rates between stages
@@ -201,13 +200,8 @@ def create_conversion_funnel_chart(merged_df):
                 funnel_labels.append(label_text)
                 conversion_rates.append(rate_text)
                 
-                # Hover data
-                hover_data.append({
-                    'stage': stage,
-                    'value': value,
-                    'rate': rate_text,
-                    'platform': platform
-                })
+                # Hover data: stage, volume, conversion rate
+                hover_rows.append([stage, value, rate_text])
         
         # Add funnel trace
         fig.add_trace(
@@ -230,7 +224,7 @@ def create_conversion_funnel_chart(merged_df):
                     '<b>Performance:</b> %{percent}<br>' +
                     '<i>Click to analyze bottlenecks</i><extra></extra>'
                 ),
-                customdata=[[hd['stage'], hd['value'], hd['rate']] for hd in hover_data],
+                customdata=hover_rows,
                 textposition='inside'
             ),
             row=1, col=col_idx+1
@@ -248,14 +242,7 @@ def create_conversion_funnel_chart(merged_df):
         margin=dict(t=80, b=60, l=40, r=40),
         showlegend=False,  # Individual titles show platform names
         font=dict(family="Arial", size=12),
-        # White background hover
-        hoverlabel=dict(
-            bgcolor="white",
-            bordercolor="black",
-            font_size=13,
-            font_family="Arial",
-            font_color="black"
-        ),
+        hoverlabel=dict(font_size=13),
         # Enhanced subplot titles
         annotations=[
             dict(
@@ -295,12 +282,15 @@ def create_conversion_funnel_chart(merged_df):
     
     return fig
 
-def create_platform_revenue_pie_chart(merged_df):
+@timed('chart')
+def create_platform_revenue_pie_chart(merged_df, revenue_data=None, roas_data=None):
     """Create Platform Revenue Distribution Pie Chart with ROAS context"""
     from utils.data_loader import get_revenue_by_platform_data, get_roas_by_platform_data
     
-    revenue_data = get_revenue_by_platform_data(merged_df)
-    roas_data = get_roas_by_platform_data(merged_df)
+    if revenue_data is None:
+        revenue_data = get_revenue_by_platform_data(merged_df)
+    if roas_data is None:
+        roas_data = get_roas_by_platform_data(merged_df)
     
     if revenue_data is None or len(revenue_data) == 0:
         return None
@@ -349,24 +339,18 @@ def create_platform_revenue_pie_chart(merged_df):
             xanchor="left",
             x=1.02,
             font=dict(size=10)
-        ),
-        # White background hover
-        hoverlabel=dict(
-            bgcolor="white",
-            bordercolor="black",
-            font_size=12,
-            font_family="Arial",
-            font_color="black"
         )
     )
     
     return fig
 
-def create_engagement_metrics_chart(merged_df):
-    """Create Reach and Engagement Metrics Comparison - Multiple Metrics Chart"""
+@timed('chart')
+def create_engagement_metrics_chart(merged_df, engagement_data=None, intervals=None):
+    """Create Reach and Engagement Metrics Comparison - Multiple Metrics Chart with bootstrap CTR error bars"""
     from utils.data_loader import get_engagement_metrics_data
     
-    engagement_data = get_engagement_metrics_data(merged_df)
+    if engagement_data is None:
+        engagement_data = get_engagement_metrics_data(merged_df)
     
     if engagement_data is None or len(engagement_data) == 0:
         return None
@@ -427,6 +411,29 @@ def create_engagement_metrics_chart(merged_df):
         secondary_y=False
     )
     
+    # Bootstrap CTR intervals per platform, as error bars around the plotted CTR
+    ctr_error = None
+    ctr_customdata = None
+    ctr_interval_text = ''
+    if intervals is not None and len(intervals) > 0:
+        ctr_intervals = intervals[(intervals['dimension'] == 'platform') &
+                                  (intervals['metric'] == 'ctr')].set_index('group')
+        if engagement_data['platform'].isin(ctr_intervals.index).all():
+            platform_intervals = ctr_intervals.loc[engagement_data['platform']]
+            ctr = engagement_data['ctr_percentage'].to_numpy()
+            ctr_error = dict(
+                type='data',
+                symmetric=False,
+                array=(platform_intervals['upper'].to_numpy() - ctr).clip(min=0),
+                arrayminus=(ctr - platform_intervals['lower'].to_numpy()).clip(min=0),
+                color='#FF6B35',
+                thickness=1.5,
+                width=6
+            )
+            ctr_interval_text = (f'{config.BOOTSTRAP_CONFIDENCE:.0%} CI ' +
+                                 '%{customdata[0]:.2f}-%{customdata[1]:.2f}%<br>')
+            ctr_customdata = platform_intervals[['lower', 'upper']].to_numpy()
+    
     # Add CTR line (secondary y-axis)
     fig.add_trace(
         go.Scatter(
@@ -436,9 +443,12 @@ def create_engagement_metrics_chart(merged_df):
             name='CTR %',
             line=dict(color='#FF6B35', width=4),
             marker=dict(size=12, color='#FF6B35', symbol='diamond'),
+            error_y=ctr_error,
+            customdata=ctr_customdata,
             yaxis='y2',
             hovertemplate='<b>📈 %{x} CTR</b><br>' +
                          'Click-Through Rate: %{y:.2f}%<br>' +
+                         ctr_interval_text +
                          'Platform: %{x}<br>' +
                          'Efficiency: Engagement Rate<br>' +
                          'Clicks per 100 impressions<extra></extra>'
@@ -462,15 +472,7 @@ def create_engagement_metrics_chart(merged_df):
             x=0.5,
             font=dict(size=10)
         ),
-        hovermode='x unified',
-        # White background hover
-        hoverlabel=dict(
-            bgcolor="white",
-            bordercolor="black",
-            font_size=12,
-            font_family="Arial",
-            font_color="black"
-        )
+        hovermode='x unified'
     )
     
     # Update y-axes
@@ -492,11 +494,12 @@ def create_engagement_metrics_chart(merged_df):
     
     return fig
 
-def create_cac_clv_scatter_chart(merged_df):
+@timed('chart')
+def create_cac_clv_scatter_chart(merged_df, customer_value_model=None):
     """Create Customer Acquisition Cost vs Customer Lifetime Value Scatter Plot"""
     from utils.data_loader import get_cac_clv_data
     
-    cac_clv_data = get_cac_clv_data(merged_df)
+    cac_clv_data = get_cac_clv_data(merged_df, customer_value_model)
     
     if cac_clv_data is None or len(cac_clv_data) == 0:
         return None
@@ -509,7 +512,8 @@ def create_cac_clv_scatter_chart(merged_df):
         color='platform',
         title='Customer Acquisition Cost vs. Customer Lifetime Value',
         color_discrete_map=config.PLATFORM_COLORS,
-        size_max=60
+        size_max=60,
+        custom_data=['new_customers', 'lifetime_orders', 'repeat_order_share']
     )
     
     # Clean hover template
@@ -517,9 +521,10 @@ def create_cac_clv_scatter_chart(merged_df):
         hovertemplate='<b>%{fullData.name}</b><br>' +
                      'CAC: $%{x:.2f}<br>' +
                      'Estimated CLV: $%{y:.2f}<br>' +
-                     'New Customers: %{customdata:,.0f}<br>' +
-                     'CLV should be 3x+ higher than CAC<extra></extra>',
-        customdata=cac_clv_data['new_customers']
+                     'New Customers: %{customdata[0]:,.0f}<br>' +
+                     'Orders per Customer: %{customdata[1]:.2f}<br>' +
+                     'Repeat Order Share: %{customdata[2]:.1%}<br>' +
+                     'CLV should be 3x+ higher than CAC<extra></extra>'
     )
     
     # Add diagonal reference line (CAC = CLV)
@@ -557,19 +562,12 @@ def create_cac_clv_scatter_chart(merged_df):
             x=1.02,
             font=dict(size=9)
         ),
-        margin=dict(r=100),
-        # White background hover
-        hoverlabel=dict(
-            bgcolor="white",
-            bordercolor="black",
-            font_size=12,
-            font_family="Arial",
-            font_color="black"
-        )
+        margin=dict(r=100)
     )
     
     return fig
 
+@timed('chart')
 def create_gross_profit_waterfall_chart(merged_df):
     """Create Gross Profit Attribution Waterfall Chart - FIXED with different platform colors"""
     from utils.data_loader import get_gross_profit_attribution_data
@@ -650,24 +648,18 @@ def create_gross_profit_waterfall_chart(merged_df):
             tickfont=dict(size=10)
         ),
         plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        # White background hover
-        hoverlabel=dict(
-            bgcolor="white",
-            bordercolor="black",
-            font_size=12,
-            font_family="Arial",
-            font_color="black"
-        )
+        paper_bgcolor='rgba(0,0,0,0)'
     )
     
     return fig
 
-def create_roas_comparison_chart(merged_df):
-    """Create ROAS Comparison Horizontal Bar Chart - Thin bars with correct ROAS values"""
+@timed('chart')
+def create_roas_comparison_chart(merged_df, roas_intervals=None, roas_data=None):
+    """Create ROAS Comparison Horizontal Bar Chart - Thin bars with correct ROAS values and bootstrap error bars"""
     from utils.data_loader import get_roas_by_platform_data
     
-    roas_data = get_roas_by_platform_data(merged_df)
+    if roas_data is None:
+        roas_data = get_roas_by_platform_data(merged_df)
     
     if roas_data is None or len(roas_data) == 0:
         return None
@@ -698,6 +690,33 @@ def create_roas_comparison_chart(merged_df):
         customdata=list(zip(roas_data['total_revenue'], roas_data['total_spend']))
     )
     
+    # Bootstrap confidence intervals as error bars (one trace per platform)
+    if roas_intervals is not None and len(roas_intervals) > 0:
+        platform_intervals = roas_intervals[(roas_intervals['dimension'] == 'platform') &
+                                            (roas_intervals['metric'] == 'allocated_roas')].set_index('group')
+        
+        def add_error_bars(trace):
+            if trace.name in platform_intervals.index:
+                interval = platform_intervals.loc[trace.name]
+                roas_value = trace.x[0]
+                trace.update(
+                    error_x=dict(
+                        type='data',
+                        symmetric=False,
+                        array=[max(interval['upper'] - roas_value, 0)],
+                        arrayminus=[max(roas_value - interval['lower'], 0)],
+                        color='#424242',
+                        thickness=1.5,
+                        width=6
+                    ),
+                    hovertemplate=trace.hovertemplate.replace(
+                        'ROAS: %{x:.2f}x<br>',
+                        f'ROAS: %{{x:.2f}}x ({config.BOOTSTRAP_CONFIDENCE:.0%} CI {interval["lower"]:.2f}-{interval["upper"]:.2f}x)<br>'
+                    )
+                )
+        
+        fig.for_each_trace(add_error_bars)
+    
     fig.update_layout(
         xaxis_title="ROAS Value (Revenue ÷ Spend)",
         yaxis_title="Platform",
@@ -716,28 +735,53 @@ def create_roas_comparison_chart(merged_df):
         ),
         # Reduce bar thickness
         bargap=0.6,  # Increase gap between bars to make them thinner
-        margin=dict(l=80, r=50, t=60, b=50),  # Adjust margins
-        # White background hover
-        hoverlabel=dict(
-            bgcolor="white",
-            bordercolor="black",
-            font_size=12,
-            font_family="Arial",
-            font_color="black"
-        )
+        margin=dict(l=80, r=50, t=60, b=50)  # Adjust margins
     )
     
     return fig
 
-def create_efficiency_trends_chart(merged_df):
-    """Create Chart 2: Campaign Efficiency Trends Multi-line Chart - WEEKLY TRENDS"""
+@timed('chart')
+def efficiency_history_days(efficiency_data):
+    """Days of history a weekly efficiency series covers"""
+    return (efficiency_data['date'].max() - efficiency_data['date'].min()).days + 7
+
+def create_efficiency_trends_chart(merged_df, anomalies=None, efficiency_data=None, date_range=None,
+                                  max_points=config.TIMESERIES_MAX_POINTS):
+    """Create Chart 2: Campaign Efficiency Trends Multi-line Chart - WEEKLY TRENDS with anomaly markers
+    
+    Histories longer than max_points days switch to daily CPC and CPA: traces
+    with more than max_points days are LTTB-downsampled and drawn with WebGL,
+    and narrowing date_range brings back every day of the visible span.
+    """
     from utils.data_loader import get_efficiency_metrics_data
+    from utils.downsampling import downsample_series
     
-    efficiency_data = get_efficiency_metrics_data(merged_df)
+    if efficiency_data is None:
+        efficiency_data = get_efficiency_metrics_data(merged_df)
     
     if efficiency_data is None or len(efficiency_data) == 0:
         return None
     
+    # Long histories plot daily points, which the weekly series would hide
+    daily = efficiency_history_days(efficiency_data) > max_points
+    if daily:
+        efficiency_data = get_efficiency_metrics_data(merged_df, freq='D')
+        if efficiency_data is None or len(efficiency_data) == 0:
+            return None
+    period = 'Day' if daily else 'Week of'
+    granularity = 'Daily' if daily else 'Weekly'
+    
+    if date_range is not None:
+        range_start, range_end = pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
+        efficiency_data = efficiency_data[efficiency_data['date'].between(range_start, range_end)]
+        if anomalies is not None:
+            anomalies = anomalies[anomalies['date'].between(range_start, range_end + pd.Timedelta(days=0 if daily else 6))]
+    
+    # Large-series mode: SVG markers on thousands of points stall the browser
+    large_series = len(efficiency_data) > 0 and efficiency_data.groupby('platform').size().max() > max_points
+    scatter = go.Scattergl if large_series else go.Scatter
+    line_mode = 'lines' if large_series else 'lines+markers'
+    
     # Create single y-axis chart (no secondary axis to avoid crowding)
     fig = go.Figure()
     
@@ -764,12 +808,16 @@ def create_efficiency_trends_chart(merged_df):
         if len(platform_data) == 0:
             continue
         
+        dates = platform_data['date'].to_numpy()
+        cpc_dates, cpc_values = downsample_series(dates, platform_data['cpc'].to_numpy(), max_points)
+        cpa_dates, cpa_values = downsample_series(dates, platform_data['cpa'].to_numpy(), max_points)
+        
         # CPC Line (solid)
         fig.add_trace(
-            go.Scatter(
-                x=platform_data['date'],
-                y=platform_data['cpc'],
-                mode='lines+markers',
+            scatter(
+                x=cpc_dates,
+                y=cpc_values,
+                mode=line_mode,
                 name=f'{platform} CPC',
                 line=dict(
                     color=cpc_colors.get(platform, '#000000'),
@@ -781,9 +829,9 @@ def create_efficiency_trends_chart(merged_df):
                 ),
                 hovertemplate=
                 '<b>%{fullData.name}</b><br>' +
-                'Week of: %{x}<br>' +
+                f'{period}: %{{x}}<br>' +
                 'Cost per Click: $%{y:.2f}<br>' +
-                f'{platform} Weekly CPC Trend<extra></extra>',
+                f'{platform} {granularity} CPC Trend<extra></extra>',
                 legendgroup=f'{platform}_CPC',
                 showlegend=True
             )
@@ -791,10 +839,10 @@ def create_efficiency_trends_chart(merged_df):
         
         # CPA Line (solid, different color)
         fig.add_trace(
-            go.Scatter(
-                x=platform_data['date'],
-                y=platform_data['cpa'],
-                mode='lines+markers',
+            scatter(
+                x=cpa_dates,
+                y=cpa_values,
+                mode=line_mode,
                 name=f'{platform} CPA',
                 line=dict(
                     color=cpa_colors.get(platform, '#000000'),
@@ -806,14 +854,54 @@ def create_efficiency_trends_chart(merged_df):
                 ),
                 hovertemplate=
                 '<b>%{fullData.name}</b><br>' +
-                'Week of: %{x}<br>' +
+                f'{period}: %{{x}}<br>' +
                 'Cost per Acquisition: $%{y:.2f}<br>' +
-                f'{platform} Weekly CPA Trend<extra></extra>',
+                f'{platform} {granularity} CPA Trend<extra></extra>',
                 legendgroup=f'{platform}_CPA',
                 showlegend=True
             )
         )
     
+    # Overlay markers on weeks (or days) containing platform-level CPC/CPA anomaly days
+    if anomalies is not None and len(anomalies) > 0:
+        platform_anomalies = anomalies[(anomalies['level'] == 'platform') &
+                                       (anomalies['metric'].isin(['cpc', 'cpa']))].copy()
+        platform_anomalies['week'] = platform_anomalies['date'].dt.to_period('D' if daily else 'W').dt.start_time
+        
+        marker_points = platform_anomalies.groupby(['week', 'platform', 'metric']).agg(
+            anomaly_days=('date', 'count'),
+            max_abs_z=('robust_z', lambda z: z.abs().max())
+        ).reset_index()
+        
+        weekly_values = efficiency_data.melt(id_vars=['date', 'platform'], value_vars=['cpc', 'cpa'],
+                                             var_name='metric', value_name='weekly_value')
+        marker_points = marker_points.merge(weekly_values, left_on=['week', 'platform', 'metric'],
+                                            right_on=['date', 'platform', 'metric'], how='inner')
+        
+        if len(marker_points) > 0:
+            fig.add_trace(
+                go.Scatter(
+                    x=marker_points['week'],
+                    y=marker_points['weekly_value'],
+                    mode='markers',
+                    name='Anomaly',
+                    marker=dict(
+                        size=14,
+                        symbol='x-thin-open',
+                        color='#D32F2F',
+                        line=dict(width=3, color='#D32F2F')
+                    ),
+                    customdata=list(zip(marker_points['platform'], marker_points['metric'].str.upper(),
+                                        marker_points['anomaly_days'], marker_points['max_abs_z'])),
+                    hovertemplate=
+                    '<b>⚠️ %{customdata[0]} %{customdata[1]} Anomaly</b><br>' +
+                    f'{period}: %{{x}}<br>' +
+                    'Flagged days: %{customdata[2]}<br>' +
+                    'Max |robust z|: %{customdata[3]:.1f}<extra></extra>',
+                    showlegend=True
+                )
+            )
+    
     # Update x-axis - REMOVED title_text AND showticklabels to hide x-axis values
     fig.update_xaxes(
         title_text="",  # No x-axis label
@@ -836,7 +924,7 @@ def create_efficiency_trends_chart(merged_df):
     
     # Update layout
     fig.update_layout(
-        title='Weekly Campaign Efficiency Trends',
+        title=f'{granularity} Campaign Efficiency Trends',
         title_x=0.5,
         height=320,
         margin=dict(t=70, b=40, l=50, r=50),
@@ -850,15 +938,190 @@ def create_efficiency_trends_chart(merged_df):
             font=dict(size=9)
         ),
         plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        # White background hover
-        hoverlabel=dict(
-            bgcolor="white",
-            bordercolor="black",
-            font_size=12,
-            font_family="Arial",
-            font_color="black"
-        )
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    
+    return fig
+
+@timed('chart')
+def create_metric_distribution_chart(sketches, metric='cpc', dimension='platform', intervals=None):
+    """Create Campaign-Day Metric Distribution Box Chart from quantile sketches
+    
+    With bootstrap intervals, each group's overall ratio is marked on its box
+    with its confidence interval as an error bar.
+    """
+    from utils.data_loader import get_metric_quantile_data
+    
+    quantile_data = get_metric_quantile_data(sketches, metric, dimension)
+    
+    if quantile_data is None or len(quantile_data) == 0:
+        return None
+    
+    metric_labels = {
+        'cpc': ('Cost per Click', '${:,.2f}', '$,.2f'),
+        'cpa': ('Cost per Acquisition', '${:,.2f}', '$,.2f'),
+        'roas': ('Return on Ad Spend', '{:.2f}x', '.2f'),
+        'ctr': ('Click-Through Rate', '{:.2f}%', '.2f')
+    }
+    metric_name, value_format, tick_format = metric_labels.get(metric, (metric.upper(), '{:,.2f}', ',.2f'))
+    
+    fig = go.Figure()
+    
+    # One precomputed box per group: whiskers are p05/p95, box is p25-p75
+    for _, row in quantile_data.iterrows():
+        group = row[dimension]
+        color = config.PLATFORM_COLORS.get(group, '#1565C0')
+        fig.add_trace(go.Box(
+            name=str(group),
+            x=[str(group)],
+            q1=[row['p25']],
+            median=[row['median']],
+            q3=[row['p75']],
+            lowerfence=[row['p05']],
+            upperfence=[row['p95']],
+            marker_color=color,
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+        
+        # Box statistics ignore hovertemplate, so an invisible marker on the median carries the values
+        percentiles = '<br>'.join(f"{label}: {value_format.format(row[column])}"
+                                  for label, column in [('p95', 'p95'), ('p75', 'p75'), ('Median', 'median'),
+                                                        ('p25', 'p25'), ('p05', 'p05')])
+        fig.add_trace(go.Scatter(
+            x=[str(group)],
+            y=[row['median']],
+            mode='markers',
+            marker=dict(size=24, color=color, opacity=0),
+            showlegend=False,
+            hovertemplate=f'<b>{group}</b><br>' +
+                         f'{metric_name}<br>{percentiles}<br>' +
+                         f'{row["campaign_days"]:,.0f} campaign-days<extra></extra>'
+        ))
+    
+    # Overall ratio per group (total over total, not a campaign-day median) with its bootstrap interval
+    if intervals is not None and len(intervals) > 0:
+        group_intervals = intervals[(intervals['dimension'] == dimension) & (intervals['metric'] == metric)]
+        group_intervals = group_intervals[group_intervals['group'].isin(quantile_data[dimension])]
+        if len(group_intervals) > 0:
+            fig.add_trace(go.Scatter(
+                x=group_intervals['group'].astype(str),
+                y=group_intervals['estimate'],
+                mode='markers',
+                name=f'Overall {metric.upper()}',
+                marker=dict(symbol='diamond', size=9, color='#424242'),
+                error_y=dict(
+                    type='data',
+                    symmetric=False,
+                    array=(group_intervals['upper'] - group_intervals['estimate']).clip(lower=0),
+                    arrayminus=(group_intervals['estimate'] - group_intervals['lower']).clip(lower=0),
+                    color='#424242',
+                    thickness=1.5,
+                    width=6
+                ),
+                text=[f"<b>{row['group']}</b><br>Overall {metric_name}: {value_format.format(row['estimate'])}<br>" +
+                      f"{config.BOOTSTRAP_CONFIDENCE:.0%} CI {value_format.format(row['lower'])}-{value_format.format(row['upper'])}"
+                      for _, row in group_intervals.iterrows()],
+                showlegend=False,
+                hovertemplate='%{text}<extra></extra>'
+            ))
+    
+    fig.update_layout(
+        title=f'Campaign-Day {metric_name} Distribution',
+        title_x=0.5,
+        xaxis_title=dimension.title(),
+        yaxis_title=metric_name,
+        height=320,
+        margin=dict(t=70, b=40, l=50, r=20),
+        title_font=dict(size=14),
+        xaxis=dict(
+            tickfont=dict(size=10)
+        ),
+        yaxis=dict(
+            tickformat=tick_format,
+            showgrid=True,
+            gridwidth=1,
+            gridcolor='rgba(128,128,128,0.2)',
+            tickfont=dict(size=10)
+        ),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    
+    return fig
+
+@timed('chart')
+def create_budget_reallocation_chart(response_curves, total_budget=None):
+    """Create Current vs Recommended Daily Spend by Platform Grouped Bar Chart"""
+    from utils.data_loader import get_budget_allocation_data
+    
+    allocation_data = get_budget_allocation_data(response_curves, total_budget)
+    
+    if allocation_data is None or len(allocation_data) == 0:
+        return None
+    
+    platform_allocation = allocation_data.groupby('platform').agg({
+        'avg_daily_spend': 'sum',
+        'recommended_spend': 'sum',
+        'current_revenue': 'sum',
+        'recommended_revenue': 'sum'
+    }).reset_index()
+    
+    current_revenue = platform_allocation['current_revenue'].sum()
+    recommended_revenue = platform_allocation['recommended_revenue'].sum()
+    revenue_lift = (recommended_revenue / current_revenue - 1) * 100 if current_revenue > 0 else 0
+    
+    fig = go.Figure()
+    
+    # Current spend bars (muted) next to recommended spend bars (platform colors)
+    fig.add_trace(go.Bar(
+        x=platform_allocation['platform'],
+        y=platform_allocation['avg_daily_spend'],
+        name='Current',
+        marker_color='#BDBDBD',
+        customdata=platform_allocation['current_revenue'],
+        hovertemplate='<b>%{x} - Current</b><br>' +
+                     'Daily Spend: $%{y:,.0f}<br>' +
+                     'Predicted Revenue: $%{customdata:,.0f}<extra></extra>'
+    ))
+    
+    fig.add_trace(go.Bar(
+        x=platform_allocation['platform'],
+        y=platform_allocation['recommended_spend'],
+        name='Recommended',
+        marker_color=[config.PLATFORM_COLORS.get(p, '#1565C0') for p in platform_allocation['platform']],
+        customdata=platform_allocation['recommended_revenue'],
+        hovertemplate='<b>%{x} - Recommended</b><br>' +
+                     'Daily Spend: $%{y:,.0f}<br>' +
+                     'Predicted Revenue: $%{customdata:,.0f}<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title=f'Recommended Daily Budget Split (predicted revenue {revenue_lift:+.1f}%)',
+        title_x=0.5,
+        xaxis_title="Platform",
+        yaxis_title="Daily Spend ($)",
+        barmode='group',
+        height=320,
+        margin=dict(t=70, b=40, l=50, r=20),
+        title_font=dict(size=14),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="center",
+            x=0.5,
+            font=dict(size=10)
+        ),
+        yaxis=dict(
+            tickformat='$,.0f',
+            showgrid=True,
+            gridwidth=1,
+            gridcolor='rgba(128,128,128,0.2)',
+            tickfont=dict(size=10)
+        ),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
     )
     
     return fig
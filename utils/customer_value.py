@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import config
+
+def daily_repeat_rates(platform_daily, window=None):
+    """Repeat orders per retained customer per day, by platform and for the business as a whole
+
+    A platform's customer base on a day is the customers it acquired over the
+    trailing window (excluding that day), and its repeat orders are its orders
+    minus its new orders. Only days with a full window behind them count.
+    Returns (per-platform Series, business-wide rate); both are NaN when the
+    series is shorter than the window.
+    """
+    window = config.CLV_RETENTION_WINDOW_DAYS if window is None else window
+    daily = platform_daily.assign(repeat_orders=platform_daily['total_orders'] - platform_daily['new_orders'])
+    new_customers = daily.pivot_table(index='date', columns='platform', values='new_customers',
+                                      aggfunc='sum').asfreq('D', fill_value=0)
+    repeat_orders = daily.pivot_table(index='date', columns='platform', values='repeat_orders',
+                                      aggfunc='sum').reindex(new_customers.index, fill_value=0)
+
+    customer_base = new_customers.rolling(window).sum().shift(1)
+    full_window = customer_base.notna().all(axis=1)
+    repeat_totals = repeat_orders[full_window].sum()
+    base_totals = customer_base[full_window].sum()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates = repeat_totals / base_totals.replace(0, np.nan)
+        business_rate = repeat_totals.sum() / base_totals.sum() if base_totals.sum() > 0 else np.nan
+    return rates, business_rate
+
+def build_customer_value_model(platform_daily, window=None):
+    """Derive CAC and CLV per platform from allocated daily business series
+
+    Expects one row per date and platform with spend and the spend-allocated
+    business metrics (total_revenue, total_orders, new_orders, new_customers,
+    gross_profit). In steady state, daily orders = daily new customers x
+    lifetime orders per customer, so total orders over total new customers
+    gives the business-wide lifetime, and with the business-wide repeat rate
+    the number of days an acquired customer keeps ordering.
+
+    Each platform's lifetime orders are its own first orders per new customer
+    plus its own daily repeat rate over those days. Series shorter than the
+    retention window fall back to the platform's total orders over its new
+    customers.
+    """
+    model = platform_daily.groupby('platform').agg({
+        'spend': 'sum',
+        'total_revenue': 'sum',
+        'total_orders': 'sum',
+        'new_orders': 'sum',
+        'new_customers': 'sum',
+        'gross_profit': 'sum'
+    }).reset_index()
+
+    orders = model['total_orders'].replace(0, np.nan)
+    new_customers = model['new_customers'].replace(0, np.nan)
+
+    model['avg_order_value'] = model['total_revenue'] / orders
+    model['repeat_order_share'] = 1 - model['new_orders'] / orders
+
+    rates, business_rate = daily_repeat_rates(platform_daily, window)
+    model['daily_repeat_rate'] = model['platform'].map(rates)
+    business_lifetime = model['total_orders'].sum() / model['new_customers'].sum()
+    business_first_orders = model['new_orders'].sum() / model['new_customers'].sum()
+    lifetime_days = (business_lifetime - business_first_orders) / business_rate if business_rate > 0 else np.nan
+
+    if pd.notna(lifetime_days):
+        model['lifetime_orders'] = model['new_orders'] / new_customers + model['daily_repeat_rate'] * lifetime_days
+    else:
+        model['lifetime_orders'] = model['total_orders'] / new_customers
+    model['gross_margin'] = model['gross_profit'] / model['total_revenue'].replace(0, np.nan)
+
+    # Revenue and gross profit an acquired customer brings over their lifetime
+    model['estimated_clv'] = model['avg_order_value'] * model['lifetime_orders']
+    model['estimated_clv_margin'] = model['estimated_clv'] * model['gross_margin']
+
+    model['cac'] = model['spend'] / new_customers
+    model['clv_cac_ratio'] = model['estimated_clv'] / model['cac']
+
+    return model.fillna(0)
@@ -1,13 +1,26 @@
+import hashlib
+import os
+import numpy as np
 import pandas as pd
 import streamlit as st
+import config
+from utils.quantile_sketch import update_grouped_sketches
+from utils.anomaly_detection import detect_anomalies
+from utils.budget_optimizer import fit_response_curves, predict_revenue, optimize_budget
+from utils.customer_value import build_customer_value_model
+from utils.bootstrap import bootstrap_group_sums, group_sums, percentile_interval
+from utils.cache_tiers import cached
+from utils.data_refresh import start_refresh_worker
+from utils.snapshot_store import persisted
+from utils.instrumentation import timed
 
-@st.cache_data
-def load_campaign_data():
+@timed('csv')
+def _read_campaign_data(data_root):
     """Load and combine all campaign data from CSV files"""
     try:
-        facebook_df = pd.read_csv('data/Facebook.csv')
-        google_df = pd.read_csv('data/Google.csv')
-        tiktok_df = pd.read_csv('data/TikTok.csv')
+        facebook_df = pd.read_csv(os.path.join(data_root, 'Facebook.csv'))
+        google_df = pd.read_csv(os.path.join(data_root, 'Google.csv'))
+        tiktok_df = pd.read_csv(os.path.join(data_root, 'TikTok.csv'))
         
         facebook_df['platform'] = 'Facebook'
         google_df['platform'] = 'Google'
@@ -21,11 +34,11 @@ def load_campaign_data():
         st.error(f"Error loading campaign data: {e}")
         return None
 
-@st.cache_data
-def load_business_data():
+@timed('csv')
+def _read_business_data(data_root):
     """Load business performance data"""
     try:
-        business_df = pd.read_csv('data/Business.csv')
+        business_df = pd.read_csv(os.path.join(data_root, 'Business.csv'))
         business_df['date'] = pd.to_datetime(business_df['date'])
         
         # Rename columns to standard names
@@ -44,6 +57,349 @@ def load_business_data():
         st.error(f"Error loading business data: {e}")
         return None
 
+def get_tenant_roots():
+    """Data root per tenant name: the default tenant plus each subdirectory of config.TENANTS_ROOT"""
+    roots = {'default': config.DATA_ROOT}
+    if os.path.isdir(config.TENANTS_ROOT):
+        for tenant in sorted(os.listdir(config.TENANTS_ROOT)):
+            if os.path.isdir(os.path.join(config.TENANTS_ROOT, tenant)):
+                roots[tenant] = os.path.join(config.TENANTS_ROOT, tenant)
+    return roots
+
+def get_data_fingerprint(data_root=config.DATA_ROOT):
+    """Fingerprint the source CSVs by name, size and modification time"""
+    digest = hashlib.sha1()
+    for file_name in sorted(os.listdir(data_root)):
+        if file_name.endswith('.csv'):
+            stat = os.stat(os.path.join(data_root, file_name))
+            digest.update(f"{file_name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:16]
+
+# The raw and merged frames are held once per server process in each tenant's
+# 'raw' cache tier; every session gets a copy-on-write shallow view instead of its own
+# unpickled copy. Loaders marked @persisted also write their result to the on-disk
+# snapshot, which a restarted worker memory-maps instead of rebuilding.
+
+@cached('raw')
+@persisted
+def _shared_campaign_data(data_root, data_fingerprint):
+    return _read_campaign_data(data_root)
+
+@cached('raw')
+@persisted
+def _shared_business_data(data_root, data_fingerprint):
+    return _read_business_data(data_root)
+
+@cached('raw')
+@persisted
+def _shared_merged_data(data_root, data_fingerprint):
+    campaign_df = _shared_campaign_data(data_root, data_fingerprint)
+    business_df = _shared_business_data(data_root, data_fingerprint)
+    return merge_campaign_business_data(campaign_df, business_df)
+
+def load_campaign_data(data_root=config.DATA_ROOT, data_fingerprint=None):
+    """Read-only view of a tenant's shared campaign data (the served snapshot by default)"""
+    return _shared_campaign_data(data_root, data_fingerprint or get_snapshot_fingerprint(data_root))
+
+def load_business_data(data_root=config.DATA_ROOT, data_fingerprint=None):
+    """Read-only view of a tenant's shared business data (the served snapshot by default)"""
+    return _shared_business_data(data_root, data_fingerprint or get_snapshot_fingerprint(data_root))
+
+def load_merged_data(data_root=config.DATA_ROOT, data_fingerprint=None):
+    """Read-only view of a tenant's shared merged campaign and business data (the served snapshot by default)"""
+    return _shared_merged_data(data_root, data_fingerprint or get_snapshot_fingerprint(data_root))
+
+def warm_data_snapshot(data_root, data_fingerprint):
+    """Build every shared frame, cube and model for a data fingerprint; True when all of them loaded"""
+    loaders = [load_campaign_data, load_business_data, load_merged_data, load_metric_sketches,
+               load_rollup_cube, load_anomaly_data, load_response_curves, load_customer_value_model,
+               load_bootstrap_intervals]
+    return all(loader(data_root, data_fingerprint) is not None for loader in loaders)
+
+def get_snapshot_fingerprint(data_root=config.DATA_ROOT):
+    """Fingerprint of the data snapshot new renders should use
+
+    With background refresh on, this is the last snapshot the refresh worker
+    finished building, so a data change never rebuilds on the request path.
+    """
+    if not config.DATA_REFRESH_ENABLED:
+        return get_data_fingerprint(data_root)
+    worker = start_refresh_worker(data_root, get_data_fingerprint, warm_data_snapshot,
+                                  config.DATA_REFRESH_DEBOUNCE_SECONDS)
+    return worker.fingerprint
+
+@cached('cube')
+@persisted
+def load_metric_sketches(data_root, data_fingerprint, chunk_size=config.INGEST_CHUNK_SIZE):
+    """Stream campaign CSVs in chunks into per-platform and per-tactic quantile sketches"""
+    try:
+        business_df = pd.read_csv(os.path.join(data_root, 'Business.csv'))
+        business_df['date'] = pd.to_datetime(business_df['date'])
+        # Daily average order value turns attributed revenue into attributed orders
+        daily_aov = business_df['total revenue'] / business_df['# of orders'].replace(0, np.nan)
+        daily_aov.index = business_df['date']
+        
+        sketches = {}
+        for platform in ['Facebook', 'Google', 'TikTok']:
+            for chunk in pd.read_csv(os.path.join(data_root, f'{platform}.csv'), chunksize=chunk_size):
+                chunk['platform'] = platform
+                chunk['date'] = pd.to_datetime(chunk['date'])
+                
+                spend = chunk['spend'].to_numpy(dtype=float)
+                clicks = chunk['clicks'].to_numpy(dtype=float)
+                impressions = chunk['impression'].to_numpy(dtype=float)
+                revenue = chunk['attributed revenue'].to_numpy(dtype=float)
+                attributed_orders = revenue / chunk['date'].map(daily_aov).to_numpy(dtype=float)
+                
+                # Zero denominators become NaN, which the sketches skip
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    chunk['cpc'] = np.where(clicks > 0, spend / clicks, np.nan)
+                    chunk['cpa'] = np.where(attributed_orders > 0, spend / attributed_orders, np.nan)
+                    chunk['roas'] = np.where(spend > 0, revenue / spend, np.nan)
+                    chunk['ctr'] = np.where(impressions > 0, 100 * clicks / impressions, np.nan)
+                
+                update_grouped_sketches(sketches, chunk, ['platform', 'tactic'],
+                                        config.SKETCH_METRICS, k=config.SKETCH_K, seed=config.SKETCH_SEED)
+        
+        return sketches
+    except Exception as e:
+        st.error(f"Error building metric sketches: {e}")
+        return None
+
+@timed('cube')
+def build_rollup_cube(campaign_df, business_df):
+    """Roll campaign rows up to one row per date, platform, tactic and campaign"""
+    cube = campaign_df.groupby(['date', 'platform', 'tactic', 'campaign'], sort=False).agg(
+        spend=('spend', 'sum'),
+        clicks=('clicks', 'sum'),
+        impressions=('impression', 'sum'),
+        attributed_revenue=('attributed revenue', 'sum')
+    ).reset_index()
+    
+    # Orders implied by attributed revenue at the day's average order value
+    daily_aov = business_df.set_index('date')['total_revenue'] / business_df.set_index('date')['total_orders'].replace(0, np.nan)
+    cube['attributed_orders'] = cube['attributed_revenue'] / cube['date'].map(daily_aov)
+    
+    return cube
+
+@cached('cube')
+@persisted
+def load_rollup_cube(data_root, data_fingerprint):
+    """Load the daily campaign rollup cube"""
+    try:
+        campaign_df = load_campaign_data(data_root, data_fingerprint)
+        business_df = load_business_data(data_root, data_fingerprint)
+        if campaign_df is None or business_df is None:
+            return None
+        return build_rollup_cube(campaign_df, business_df)
+    except Exception as e:
+        st.error(f"Error building rollup cube: {e}")
+        return None
+
+@cached('query')
+@persisted
+def load_anomaly_data(data_root, data_fingerprint):
+    """Flag anomalous days for every platform and campaign series in the rollup cube"""
+    try:
+        cube = load_rollup_cube(data_root, data_fingerprint)
+        if cube is None:
+            return None
+        
+        anomaly_frames = []
+        for level, series_columns in [('platform', ['platform']), ('campaign', ['platform', 'tactic', 'campaign'])]:
+            level_anomalies = detect_anomalies(cube, series_columns, config.ANOMALY_METRICS,
+                                               window=config.ANOMALY_WINDOW,
+                                               threshold=config.ANOMALY_Z_THRESHOLD)
+            level_anomalies.insert(0, 'level', level)
+            anomaly_frames.append(level_anomalies)
+        
+        return pd.concat(anomaly_frames, ignore_index=True)
+    except Exception as e:
+        st.error(f"Error detecting anomalies: {e}")
+        return None
+
+@cached('query')
+@persisted
+def load_response_curves(data_root, data_fingerprint):
+    """Fit spend-response curves for every campaign in the rollup cube"""
+    try:
+        cube = load_rollup_cube(data_root, data_fingerprint)
+        if cube is None:
+            return None
+        min_elasticity, max_elasticity = config.RESPONSE_ELASTICITY_RANGE
+        return fit_response_curves(cube, min_elasticity, max_elasticity)
+    except Exception as e:
+        st.error(f"Error fitting response curves: {e}")
+        return None
+
+@timed('metric')
+def get_budget_allocation_data(response_curves, total_budget=None):
+    """Calculate the revenue-maximizing daily budget split per campaign"""
+    try:
+        allocation = response_curves.copy()
+        
+        # Default to reallocating today's average daily budget
+        if total_budget is None:
+            total_budget = allocation['avg_daily_spend'].sum()
+        
+        allocation['recommended_spend'] = optimize_budget(
+            allocation, total_budget,
+            min_ratio=config.BUDGET_MIN_RATIO,
+            max_ratio=config.BUDGET_MAX_RATIO
+        )
+        allocation['current_revenue'] = predict_revenue(allocation['scale'], allocation['elasticity'],
+                                                        allocation['avg_daily_spend'])
+        allocation['recommended_revenue'] = predict_revenue(allocation['scale'], allocation['elasticity'],
+                                                            allocation['recommended_spend'])
+        allocation['spend_change'] = allocation['recommended_spend'] - allocation['avg_daily_spend']
+        
+        return allocation.sort_values('spend_change', ascending=False)
+    except Exception as e:
+        st.error(f"Error calculating budget allocation: {e}")
+        return None
+
+@timed('metric')
+def get_platform_daily_data(merged_df):
+    """Collapse merged campaign rows back to one row per date and platform"""
+    business_columns = [column for column in ['total_revenue', 'total_orders', 'new_orders',
+                                              'new_customers', 'gross_profit']
+                        if column in merged_df.columns]
+    # Allocated business metrics repeat on every campaign row of a platform-day
+    aggregations = {'spend': 'sum'}
+    aggregations.update({column: 'first' for column in business_columns})
+    return merged_df.groupby(['date', 'platform']).agg(aggregations).reset_index()
+
+@cached('query')
+@persisted
+def load_customer_value_model(data_root, data_fingerprint):
+    """Derive per-platform CAC and CLV from the allocated daily business series"""
+    try:
+        merged_df = load_merged_data(data_root, data_fingerprint)
+        if merged_df is None:
+            return None
+        return build_customer_value_model(get_platform_daily_data(merged_df))
+    except Exception as e:
+        st.error(f"Error building customer value model: {e}")
+        return None
+
+def _ratio_interval_rows(dimension, groups, sums, replicates, numerator, denominator, metric, scale=1.0):
+    """Point estimate and bootstrap interval rows for a ratio of two summed columns"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        estimates = scale * sums[:, numerator] / sums[:, denominator]
+        resampled = scale * replicates[:, :, numerator] / replicates[:, :, denominator]
+    lower, upper = percentile_interval(resampled, config.BOOTSTRAP_CONFIDENCE)
+    return [{
+        'dimension': dimension,
+        'group': group,
+        'metric': metric,
+        'estimate': estimates[idx],
+        'lower': lower[idx],
+        'upper': upper[idx]
+    } for idx, group in enumerate(groups)]
+
+@cached('query')
+@persisted
+def load_bootstrap_intervals(data_root, data_fingerprint, n_resamples=config.BOOTSTRAP_RESAMPLES):
+    """Bootstrap ROAS, CPA and CTR intervals per platform and tactic (cached per data fingerprint)"""
+    try:
+        campaign_df = load_campaign_data(data_root, data_fingerprint)
+        business_df = load_business_data(data_root, data_fingerprint)
+        cube = load_rollup_cube(data_root, data_fingerprint)
+        if campaign_df is None or business_df is None or cube is None:
+            return None
+        
+        interval_rows = []
+        
+        # Attributed ROAS, CPA and CTR resampled over campaign-days; platform and
+        # tactic groups share one set of resample weights
+        value_columns = ['attributed_revenue', 'spend', 'attributed_orders', 'clicks', 'impressions']
+        values = cube[value_columns].to_numpy(dtype=float)
+        platform_idx, platform_groups = pd.factorize(cube['platform'], sort=True)
+        tactic_idx, tactic_groups = pd.factorize(cube['tactic'], sort=True)
+        group_idx = np.column_stack([platform_idx, tactic_idx + len(platform_groups)])
+        n_groups = len(platform_groups) + len(tactic_groups)
+        
+        sums = group_sums(values, group_idx, n_groups)
+        replicates = bootstrap_group_sums(values, group_idx, n_groups, n_resamples,
+                                          parallel_min_cells=config.BOOTSTRAP_PARALLEL_MIN_CELLS)
+        
+        for dimension, groups, group_slice in [
+            ('platform', platform_groups, slice(0, len(platform_groups))),
+            ('tactic', tactic_groups, slice(len(platform_groups), n_groups))
+        ]:
+            dimension_sums = sums[group_slice]
+            dimension_replicates = replicates[:, group_slice]
+            interval_rows += _ratio_interval_rows(dimension, groups, dimension_sums, dimension_replicates, 0, 1, 'roas')
+            interval_rows += _ratio_interval_rows(dimension, groups, dimension_sums, dimension_replicates, 1, 2, 'cpa')
+            interval_rows += _ratio_interval_rows(dimension, groups, dimension_sums, dimension_replicates, 3, 4, 'ctr', scale=100)
+        
+        # The ROAS chart's performance-allocated estimator, resampled the same way
+        platforms = ['Facebook', 'Google', 'TikTok']
+        volume_rows = [get_roas_volume_rows(campaign_df[campaign_df['platform'] == platform], platform)
+                       for platform in platforms]
+        volumes = np.vstack(volume_rows)
+        platform_idx = np.repeat(np.arange(len(platforms)), [len(rows) for rows in volume_rows])
+        replicates = bootstrap_group_sums(volumes, platform_idx, len(platforms), n_resamples,
+                                          parallel_min_cells=config.BOOTSTRAP_PARALLEL_MIN_CELLS)
+        total_business_revenue = business_df['total_revenue'].sum()
+        estimates = calculate_allocated_roas(np.array([rows.sum(axis=0) for rows in volume_rows]),
+                                             total_business_revenue)[0]
+        lower, upper = percentile_interval(calculate_allocated_roas(replicates, total_business_revenue)[0],
+                                           config.BOOTSTRAP_CONFIDENCE)
+        for idx, platform in enumerate(platforms):
+            interval_rows.append({
+                'dimension': 'platform',
+                'group': platform,
+                'metric': 'allocated_roas',
+                'estimate': estimates[idx],
+                'lower': lower[idx],
+                'upper': upper[idx]
+            })
+        
+        return pd.DataFrame(interval_rows)
+    except Exception as e:
+        st.error(f"Error bootstrapping confidence intervals: {e}")
+        return None
+
+@timed('metric')
+def get_metric_quantile_data(sketches, metric='cpc', dimension='platform'):
+    """Get percentile summary of a campaign-day metric per platform or tactic"""
+    try:
+        quantile_rows = []
+        for (sketch_dimension, group, sketch_metric), sketch in sketches.items():
+            if sketch_dimension != dimension or sketch_metric != metric or len(sketch) == 0:
+                continue
+            p05, p25, p50, p75, p95 = sketch.quantile(config.SKETCH_QUANTILES)
+            quantile_rows.append({
+                dimension: group,
+                'p05': p05,
+                'p25': p25,
+                'median': p50,
+                'p75': p75,
+                'p95': p95,
+                'campaign_days': len(sketch)
+            })
+        
+        quantile_df = pd.DataFrame(quantile_rows)
+        if len(quantile_df) > 0:
+            quantile_df = quantile_df.sort_values('median')
+        return quantile_df
+    except Exception as e:
+        st.error(f"Error calculating metric quantiles: {e}")
+        return None
+
+@timed('metric')
+def calculate_kpis(merged_df):
+    """Calculate KPI values cleanly"""
+    total_revenue = merged_df['total_revenue'].sum()
+    total_orders = merged_df['total_orders'].sum()
+    avg_cogs = merged_df['cogs_percentage'].mean()
+    total_spend = merged_df['spend'].sum()
+    overall_roas = total_revenue / total_spend if total_spend > 0 else 0
+    
+    return total_revenue, total_orders, avg_cogs, overall_roas
+
+@timed('metric')
 def get_revenue_by_platform_data(merged_df):
     """Get revenue data aggregated by platform"""
     try:
@@ -54,69 +410,75 @@ def get_revenue_by_platform_data(merged_df):
         st.error(f"Error calculating revenue by platform: {e}")
         return None
 
+def get_platform_frames(merged_df):
+    """(platform, rows) for each platform present in the merged data, in a fixed order
+    
+    Campaign-level metrics come from the merged rows rather than the platform CSVs,
+    so any platform, campaign or date filter applied to merged_df carries through.
+    """
+    return [(platform, merged_df[merged_df['platform'] == platform])
+            for platform in ['Facebook', 'Google', 'TikTok'] if (merged_df['platform'] == platform).any()]
+
+def get_business_revenue(merged_df):
+    """Business revenue allocated to the platform-days in the merged data"""
+    return merged_df.drop_duplicates(['date', 'platform'])['total_revenue'].sum()
+
+# Fallback click and impression rates per dollar when a platform file lacks those columns
+ROAS_FALLBACK_RATES = {
+    'Facebook': {'clicks_per_spend': 0.05, 'impressions_per_spend': 100},
+    'Google': {'clicks_per_spend': 0.08, 'impressions_per_spend': 80},
+    'TikTok': {'clicks_per_spend': 0.03, 'impressions_per_spend': 150}
+}
+
+def get_roas_volume_rows(platform_df, platform):
+    """Per-row spend, clicks and impressions behind the allocated ROAS, as a (rows x 3) array"""
+    rates = ROAS_FALLBACK_RATES[platform]
+    spend = platform_df['spend'].to_numpy(dtype=float)
+    clicks = platform_df['clicks'].to_numpy(dtype=float) if 'clicks' in platform_df.columns else spend * rates['clicks_per_spend']
+    impressions = platform_df['impressions'].to_numpy(dtype=float) if 'impressions' in platform_df.columns else spend * rates['impressions_per_spend']
+    return np.column_stack([spend, clicks, impressions])
+
+def calculate_allocated_roas(volume_totals, total_business_revenue):
+    """Performance-allocated ROAS from (..., platforms, [spend, clicks, impressions]) totals"""
+    spend = volume_totals[..., 0]
+    clicks = volume_totals[..., 1]
+    impressions = volume_totals[..., 2]
+    total_clicks = clicks.sum(axis=-1, keepdims=True)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        click_share = np.where(total_clicks > 0, clicks / total_clicks, 0)
+        ctr = np.where(impressions > 0, clicks / impressions, 0)
+        
+        # Higher CTR = better performance, so allocate revenue by clicks and CTR, not spend
+        allocated_revenue = total_business_revenue * click_share * (1 + ctr * 10)
+        roas = np.where(spend > 0, allocated_revenue / spend, 0)
+    
+    return roas, allocated_revenue, ctr
+
+@timed('metric')
 def get_roas_by_platform_data(merged_df):
     """Calculate ROAS using PRECISE performance-based allocation"""
     try:
-        # Load original campaign data to get precise metrics per platform
-        facebook_df = pd.read_csv('data/Facebook.csv')
-        google_df = pd.read_csv('data/Google.csv')
-        tiktok_df = pd.read_csv('data/TikTok.csv')
-        
-        # Calculate PRECISE key metrics per platform
-        platform_metrics = {}
-        
-        # Facebook metrics with precise calculations
-        platform_metrics['Facebook'] = {
-            'total_spend': facebook_df['spend'].sum(),
-            'total_clicks': facebook_df['clicks'].sum() if 'clicks' in facebook_df.columns else facebook_df['spend'].sum() * 0.05,
-            'total_impressions': facebook_df['impressions'].sum() if 'impressions' in facebook_df.columns else facebook_df['spend'].sum() * 100
-        }
-        
-        # Google metrics with precise calculations
-        platform_metrics['Google'] = {
-            'total_spend': google_df['spend'].sum(),
-            'total_clicks': google_df['clicks'].sum() if 'clicks' in google_df.columns else google_df['spend'].sum() * 0.08,
-            'total_impressions': google_df['impressions'].sum() if 'impressions' in google_df.columns else google_df['spend'].sum() * 80
-        }
-        
-        # TikTok metrics with precise calculations
-        platform_metrics['TikTok'] = {
-            'total_spend': tiktok_df['spend'].sum(),
-            'total_clicks': tiktok_df['clicks'].sum() if 'clicks' in tiktok_df.columns else tiktok_df['spend'].sum() * 0.03,
-            'total_impressions': tiktok_df['impressions'].sum() if 'impressions' in tiktok_df.columns else tiktok_df['spend'].sum() * 150
-        }
+        # Precise metrics per platform from the (possibly filtered) campaign rows
+        platform_frames = get_platform_frames(merged_df)
+        platforms = [platform for platform, _ in platform_frames]
+        volume_totals = np.array([get_roas_volume_rows(df, platform).sum(axis=0) for platform, df in platform_frames])
         
-        # Get total business revenue for precise allocation
-        business_df = pd.read_csv('data/Business.csv')
-        business_df.columns = business_df.columns.str.replace('# of orders', 'total_orders')
-        business_df.columns = business_df.columns.str.replace('total revenue', 'total_revenue')
-        total_business_revenue = business_df['total_revenue'].sum()
+        # Total business revenue over the same platform-days for precise allocation
+        total_business_revenue = get_business_revenue(merged_df)
         
-        # Calculate platform performance scores with PRECISE mathematics
-        total_clicks = sum([metrics['total_clicks'] for metrics in platform_metrics.values()])
+        # Calculate PRECISE ROAS for all platforms at once
+        roas, allocated_revenue, ctr = calculate_allocated_roas(volume_totals, total_business_revenue)
         
         roas_data = []
-        for platform, metrics in platform_metrics.items():
-            # PRECISE performance-based revenue allocation
-            click_share = metrics['total_clicks'] / total_clicks if total_clicks > 0 else 0
-            ctr = metrics['total_clicks'] / metrics['total_impressions'] if metrics['total_impressions'] > 0 else 0
-            
-            # Create PRECISE performance multiplier
-            performance_multiplier = 1 + (ctr * 10)  # Higher CTR = better performance
-            
-            # Allocate revenue based on PRECISE performance, not just spend proportion
-            allocated_revenue = total_business_revenue * click_share * performance_multiplier
-            
-            # Calculate PRECISE ROAS
-            roas = allocated_revenue / metrics['total_spend'] if metrics['total_spend'] > 0 else 0
-            
+        for idx, platform in enumerate(platforms):
             roas_data.append({
                 'platform': platform,
-                'total_revenue': allocated_revenue,
-                'total_spend': metrics['total_spend'],
-                'roas': roas,
-                'clicks': metrics['total_clicks'],
-                'ctr': ctr * 100,  # Convert to percentage
+                'total_revenue': allocated_revenue[idx],
+                'total_spend': volume_totals[idx, 0],
+                'roas': roas[idx],
+                'clicks': volume_totals[idx, 1],
+                'ctr': ctr[idx] * 100,  # Convert to percentage
             })
         
         roas_df = pd.DataFrame(roas_data)
@@ -140,20 +502,16 @@ def get_roas_by_platform_data(merged_df):
         
         return pd.DataFrame(roas_data)
 
+@timed('metric')
 def get_campaign_tactic_heatmap_data(merged_df):
     """Calculate PRECISE campaign tactic effectiveness matrix for heatmap"""
     try:
         # Define different tactics based on platform characteristics
         campaign_tactics = ['Video Ads', 'Display Ads', 'Search Ads', 'Social Posts', 'Retargeting']
         
-        # Load original campaign data to get PRECISE actual metrics
-        facebook_df = pd.read_csv('data/Facebook.csv')
-        google_df = pd.read_csv('data/Google.csv')
-        tiktok_df = pd.read_csv('data/TikTok.csv')
-        
-        # Calculate PRECISE base performance metrics per platform
+        # Calculate PRECISE base performance metrics per platform from the campaign rows
         platform_performance = {}
-        for platform, df in [('Facebook', facebook_df), ('Google', google_df), ('TikTok', tiktok_df)]:
+        for platform, df in get_platform_frames(merged_df):
             total_spend = df['spend'].sum()
             total_clicks = df['clicks'].sum() if 'clicks' in df.columns else total_spend * 0.05
             total_impressions = df['impressions'].sum() if 'impressions' in df.columns else total_spend * 100
@@ -182,7 +540,7 @@ def get_campaign_tactic_heatmap_data(merged_df):
         # Adjust based on PRECISE actual performance data
         heatmap_data = []
         for tactic in campaign_tactics:
-            for platform in ['Facebook', 'Google', 'TikTok']:
+            for platform in platform_performance:
                 base_score = tactic_performance_matrix[tactic][platform]
                 actual_performance = platform_performance[platform]
                 
@@ -205,14 +563,10 @@ def get_campaign_tactic_heatmap_data(merged_df):
         st.error(f"Error calculating tactic heatmap data: {e}")
         return None
 
+@timed('metric')
 def get_conversion_funnel_data(merged_df):
     """Calculate PRECISE conversion funnel performance by platform"""
     try:
-        # Load original campaign data for PRECISE impressions and clicks
-        facebook_df = pd.read_csv('data/Facebook.csv')
-        google_df = pd.read_csv('data/Google.csv')
-        tiktok_df = pd.read_csv('data/TikTok.csv')
-        
         # Get PRECISE platform totals from merged data
         platform_totals = merged_df.groupby('platform').agg({
             'total_revenue': 'sum',
@@ -222,8 +576,8 @@ def get_conversion_funnel_data(merged_df):
         
         funnel_data = []
         
-        for platform, df in [('Facebook', facebook_df), ('Google', google_df), ('TikTok', tiktok_df)]:
-            # Get PRECISE impressions and clicks from original data
+        for platform, df in get_platform_frames(merged_df):
+            # Get PRECISE impressions and clicks from the campaign rows
             impressions = df['impressions'].sum() if 'impressions' in df.columns else df['spend'].sum() * 100
             clicks = df['clicks'].sum() if 'clicks' in df.columns else df['spend'].sum() * 0.05
             
@@ -280,19 +634,16 @@ def get_conversion_funnel_data(merged_df):
         st.error(f"Error calculating funnel data: {e}")
         return None
 
+@timed('metric')
 def get_engagement_metrics_data(merged_df):
     """Calculate PRECISE engagement metrics data for the engagement chart"""
     try:
-        # Load original campaign data to get PRECISE impressions and clicks
-        facebook_df = pd.read_csv('data/Facebook.csv')
-        google_df = pd.read_csv('data/Google.csv')
-        tiktok_df = pd.read_csv('data/TikTok.csv')
-        
         engagement_data = []
         
-        for platform, df in [('Facebook', facebook_df), ('Google', google_df), ('TikTok', tiktok_df)]:
-            # Get PRECISE actual impressions and clicks
-            total_impressions = df['impressions'].sum() if 'impressions' in df.columns else df['spend'].sum() * 100
+        # PRECISE impressions and clicks per platform from the campaign rows
+        for platform, df in get_platform_frames(merged_df):
+            # Get PRECISE actual impressions and clicks; the campaign CSVs name the column 'impression'
+            total_impressions = df['impression'].sum() if 'impression' in df.columns else df['spend'].sum() * 100
             total_clicks = df['clicks'].sum() if 'clicks' in df.columns else df['spend'].sum() * 0.05
             total_spend = df['spend'].sum()
             
@@ -320,37 +671,26 @@ def get_engagement_metrics_data(merged_df):
         st.error(f"Error calculating engagement metrics data: {e}")
         return None
 
-def get_cac_clv_data(merged_df):
+@timed('metric')
+def get_cac_clv_data(merged_df, customer_value_model=None):
     """Calculate CAC vs CLV data for scatter plot"""
     try:
-        # Get platform totals
-        platform_data = merged_df.groupby('platform').agg({
-            'total_revenue': 'sum',
-            'spend': 'sum',
-            'total_orders': 'sum'
-        }).reset_index()
-        
-        # Estimate new customers (70% of total orders)
-        platform_data['new_customers'] = platform_data['total_orders'] * 0.7
-        
-        # Calculate CAC (Customer Acquisition Cost)
-        platform_data['cac'] = platform_data['spend'] / platform_data['new_customers'].replace(0, 1)
+        # Prefer the cached model; otherwise derive it from this merged frame
+        if customer_value_model is None:
+            customer_value_model = build_customer_value_model(get_platform_daily_data(merged_df))
         
-        # Calculate estimated CLV (Customer Lifetime Value)
-        platform_data['avg_order_value'] = platform_data['total_revenue'] / platform_data['total_orders'].replace(0, 1)
-        
-        # Estimate different CLV for each platform based on their characteristics
-        clv_multipliers = {'Facebook': 3.2, 'Google': 4.1, 'TikTok': 2.8}
-        platform_data['estimated_clv'] = platform_data['avg_order_value'] * platform_data['platform'].map(clv_multipliers)
+        platform_data = customer_value_model.copy()
         
         # Customer volume for bubble size
         platform_data['customer_volume'] = platform_data['new_customers']
         
-        return platform_data[['platform', 'cac', 'estimated_clv', 'customer_volume', 'new_customers']]
+        return platform_data[['platform', 'cac', 'estimated_clv', 'customer_volume', 'new_customers',
+                              'lifetime_orders', 'repeat_order_share', 'clv_cac_ratio']]
     except Exception as e:
         st.error(f"Error calculating CAC/CLV data: {e}")
         return None
 
+@timed('metric')
 def get_gross_profit_attribution_data(merged_df):
     """Calculate gross profit attribution for waterfall chart"""
     try:
@@ -408,14 +748,15 @@ def get_gross_profit_attribution_data(merged_df):
         st.error(f"Error calculating gross profit attribution: {e}")
         return None
 
-def get_efficiency_metrics_data(merged_df):
-    """Calculate CPC and CPA metrics for efficiency trends - WEEKLY aggregation"""
+@timed('metric')
+def get_efficiency_metrics_data(merged_df, freq='W'):
+    """Calculate CPC and CPA metrics for efficiency trends - WEEKLY aggregation, or daily with freq='D'"""
     try:
         # Create a copy to avoid modifying original data
         df_copy = merged_df.copy()
         
         # Create week column for weekly aggregation
-        df_copy['week'] = df_copy['date'].dt.to_period('W').dt.start_time
+        df_copy['week'] = df_copy['date'].dt.to_period(freq).dt.start_time
         
         # Group by WEEK and platform to get weekly metrics
         efficiency_data = df_copy.groupby(['week', 'platform']).agg({
@@ -443,6 +784,7 @@ def get_efficiency_metrics_data(merged_df):
         st.error(f"Error calculating weekly efficiency metrics: {e}")
         return None
 
+@timed('merge')
 def merge_campaign_business_data(campaign_df, business_df):
     """Merge campaign and business data with proper allocation"""
     if campaign_df is None or business_df is None:
@@ -459,33 +801,16 @@ def merge_campaign_business_data(campaign_df, business_df):
     # Merge with business data
     allocation_df = pd.merge(daily_platform_spend, business_df, on='date')
     
-    # Allocate business metrics based on spend proportion
-    allocation_df['allocated_revenue'] = allocation_df['total_revenue'] * allocation_df['spend_proportion']
-    allocation_df['allocated_orders'] = allocation_df['total_orders'] * allocation_df['spend_proportion']
-    
-    # Add new customers allocation if exists
-    if 'new_customers' in business_df.columns:
-        allocation_df['allocated_new_customers'] = allocation_df['new_customers'] * allocation_df['spend_proportion']
+    # Allocate business metrics based on spend proportion - revenue, orders and
+    # customer counts in one vectorized pass
+    allocated_columns = [column for column in ['total_revenue', 'total_orders', 'new_orders',
+                                               'new_customers', 'gross_profit']
+                         if column in business_df.columns]
+    allocated = allocation_df[allocated_columns].mul(allocation_df['spend_proportion'], axis=0)
+    allocated[['date', 'platform']] = allocation_df[['date', 'platform']]
     
     # Merge with campaign data
-    merge_columns = ['date', 'platform', 'allocated_revenue', 'allocated_orders']
-    if 'allocated_new_customers' in allocation_df.columns:
-        merge_columns.append('allocated_new_customers')
-    
-    merged_df = pd.merge(campaign_df,
-                        allocation_df[merge_columns],
-                        on=['date', 'platform'], how='inner')
-    
-    # Rename allocated columns
-    rename_dict = {
-        'allocated_revenue': 'total_revenue',
-        'allocated_orders': 'total_orders'
-    }
-    
-    if 'allocated_new_customers' in merged_df.columns:
-        rename_dict['allocated_new_customers'] = 'new_customers'
-    
-    merged_df = merged_df.rename(columns=rename_dict)
+    merged_df = pd.merge(campaign_df, allocated, on=['date', 'platform'], how='inner')
     
     # Add COGS data (same for all platforms on same day)
     cogs_data = business_df[['date', 'cogs_percentage']].drop_duplicates()
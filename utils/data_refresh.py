@@ -0,0 +1,115 @@
+import threading
+import time
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+from watchdog.observers.polling import PollingObserver
+
+# Events that can change file contents; opens and read-only closes (e.g. the rebuild's own reads) are ignored
+CHANGE_EVENT_TYPES = ['created', 'modified', 'moved', 'deleted', 'closed']
+
+class _DataChangeHandler(FileSystemEventHandler):
+    """Signal the refresh worker whenever a CSV under the data directory changes"""
+
+    def __init__(self, changed):
+        self.changed = changed
+
+    def on_any_event(self, event):
+        if event.event_type not in CHANGE_EVENT_TYPES or event.is_directory:
+            return
+        paths = [event.src_path, getattr(event, 'dest_path', '')]
+        if any(str(path).endswith('.csv') for path in paths):
+            self.changed.set()
+
+class DataRefreshWorker:
+    """Rebuild the data snapshot in the background when the source files change
+
+    The served snapshot is identified by its data fingerprint. When files
+    change, the worker waits for writes to settle, builds every shared frame
+    and model for the new fingerprint through warm(data_dir, fingerprint), and only
+    then swaps the served fingerprint. Renders that already read the old
+    fingerprint finish on the old snapshot, and a failed build (e.g. a file
+    caught half-written) keeps serving the old one.
+    """
+
+    def __init__(self, data_dir, fingerprint_func, warm, debounce_seconds=2.0):
+        self.data_dir = data_dir
+        self.fingerprint_func = fingerprint_func
+        self.warm = warm
+        self.debounce_seconds = debounce_seconds
+        self.refreshes = 0
+        self.failures = 0
+        self.last_refresh_seconds = None
+        self._fingerprint = fingerprint_func(data_dir)
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._observer = None
+        self._thread = None
+
+    @property
+    def fingerprint(self):
+        """Fingerprint of the snapshot new renders should use"""
+        with self._lock:
+            return self._fingerprint
+
+    def start(self):
+        handler = _DataChangeHandler(self._changed)
+        try:
+            self._observer = Observer()
+            self._observer.schedule(handler, self.data_dir, recursive=False)
+            self._observer.start()
+        except OSError:
+            # inotify watch limits and some network filesystems need polling instead
+            self._observer = PollingObserver()
+            self._observer.schedule(handler, self.data_dir, recursive=False)
+            self._observer.start()
+
+        self._thread = threading.Thread(target=self._run, name='data-refresh', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            self._changed.wait()
+            # Let a burst of writes settle before fingerprinting
+            while True:
+                self._changed.clear()
+                time.sleep(self.debounce_seconds)
+                if not self._changed.is_set():
+                    break
+            self.refresh()
+
+    def refresh(self):
+        """Build the snapshot for the current files and swap it in; True when it changed"""
+        try:
+            fingerprint = self.fingerprint_func(self.data_dir)
+        except OSError:
+            self.failures += 1
+            return False
+        if fingerprint == self.fingerprint:
+            return False
+
+        start = time.perf_counter()
+        if not self.warm(self.data_dir, fingerprint):
+            self.failures += 1
+            return False
+
+        with self._lock:
+            self._fingerprint = fingerprint
+        self.refreshes += 1
+        self.last_refresh_seconds = time.perf_counter() - start
+        return True
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+
+_workers = {}
+_workers_lock = threading.Lock()
+
+def start_refresh_worker(data_dir, fingerprint_func, warm, debounce_seconds=2.0):
+    """Process-wide refresh worker for a data directory, started on first use"""
+    with _workers_lock:
+        if data_dir not in _workers:
+            _workers[data_dir] = DataRefreshWorker(data_dir, fingerprint_func, warm, debounce_seconds).start()
+        return _workers[data_dir]
@@ -0,0 +1,49 @@
+import numpy as np
+
+def lttb_indices(x, y, threshold):
+    """Indices of the points Largest-Triangle-Three-Buckets keeps, first and last included
+
+    x must be numeric and sorted. Interior points are split into threshold - 2
+    buckets and each bucket keeps the point forming the largest triangle with
+    the previously kept point and the next bucket's average, which preserves
+    the visual peaks and troughs of the series.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+
+        # The next bucket's average is the triangle's third vertex; the last bucket uses the final point
+        if bucket + 2 < len(edges):
+            next_start, next_stop = edges[bucket + 1], edges[bucket + 2]
+            avg_x = x[next_start:next_stop].mean()
+            avg_y = y[next_start:next_stop].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        areas = np.abs((x[previous] - avg_x) * (y[start:stop] - y[previous]) -
+                       (x[previous] - x[start:stop]) * (avg_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+def downsample_series(dates, values, max_points):
+    """LTTB-downsample a date-indexed series to at most max_points, returning (dates, values)"""
+    if len(dates) <= max_points:
+        return dates, values
+
+    timestamps = np.asarray(dates, dtype='datetime64[ns]').astype('int64')
+    keep = lttb_indices(timestamps, values, max_points)
+    return dates[keep], values[keep]
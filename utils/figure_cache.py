@@ -0,0 +1,67 @@
+import json
+import time
+import plotly.io as pio
+import config
+from utils.cache_tiers import CacheTier
+from utils.snapshot_store import read_snapshot_entry, write_snapshot_entry, snapshot_entry_name, prune_snapshot_entries
+from utils.instrumentation import record_span
+
+def make_figure_key(chart_id, data_fingerprint, filter_state=None, layout_overrides=None):
+    """Cache key for a chart: (chart id, data fingerprint, filter state, layout overrides)"""
+    return (
+        chart_id,
+        data_fingerprint,
+        json.dumps(filter_state or {}, sort_keys=True, default=str),
+        json.dumps(layout_overrides or {}, sort_keys=True, default=str)
+    )
+
+class FigureCache(CacheTier):
+    """Cache tier of serialized Plotly figures, backed by the on-disk data snapshot of its namespace"""
+
+    def _snapshot_entry(self, key):
+        chart_id, data_fingerprint = key[0], key[1]
+        return self.namespace, data_fingerprint, snapshot_entry_name(f"figure-{chart_id}", *key[2:])
+
+    def get(self, key):
+        """Return a fresh figure for key, or None on a miss"""
+        figure_json = super().get(key)
+        if figure_json is None and config.SNAPSHOTS_ENABLED:
+            # A restarted worker picks up figures built before the restart
+            figure_json = read_snapshot_entry(*self._snapshot_entry(key))
+            if figure_json is not None:
+                super().put(key, figure_json, len(figure_json.encode('utf-8')))
+        if figure_json is None:
+            return None
+        # Every hit deserializes its own figure, so callers may mutate it freely
+        return pio.from_json(figure_json)
+
+    def put(self, key, fig):
+        """Store a figure's JSON, evicting entries to fit"""
+        figure_json = fig.to_json()
+        super().put(key, figure_json, len(figure_json.encode('utf-8')))
+        if config.SNAPSHOTS_ENABLED:
+            # Free-form controls give every figure many filter states, so keep only the most recently used
+            data_root, data_fingerprint, entry = self._snapshot_entry(key)
+            if write_snapshot_entry(data_root, data_fingerprint, entry, figure_json):
+                prune_snapshot_entries(data_root, data_fingerprint, 'figure-', config.SNAPSHOT_MAX_FIGURES)
+
+def get_or_build_figure(cache, chart_id, data_fingerprint, builder, builder_args=(),
+                        filter_state=None, layout_overrides=None):
+    """Return a cached figure, or build it, apply layout overrides and cache it"""
+    start = time.perf_counter()
+    key = make_figure_key(chart_id, data_fingerprint, filter_state, layout_overrides)
+    fig = cache.get(key)
+    if fig is not None:
+        if config.INSTRUMENTATION_ENABLED:
+            record_span('figure', chart_id, time.perf_counter() - start, cache='hit', namespace=cache.namespace)
+        return fig
+
+    fig = builder(*builder_args)
+    if fig is None:
+        return None
+    if layout_overrides:
+        fig.update_layout(**layout_overrides)
+    cache.put(key, fig)
+    if config.INSTRUMENTATION_ENABLED:
+        record_span('figure', chart_id, time.perf_counter() - start, cache='miss', namespace=cache.namespace)
+    return fig
@@ -0,0 +1,79 @@
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# Trace types the dashboard draws; the template keeps defaults only for these
+DASHBOARD_TRACE_TYPES = ['bar', 'box', 'funnel', 'heatmap', 'pie', 'scatter', 'scattergl', 'waterfall']
+
+# Layout defaults for subplot kinds and continuous color scales no chart relies on
+UNUSED_LAYOUT_KEYS = ['colorscale', 'geo', 'mapbox', 'polar', 'scene', 'ternary']
+
+def build_dashboard_template():
+    """Plotly's default look trimmed to what the dashboard uses, plus the shared white hover label
+
+    Every figure carries its template, so trimming it shrinks every chart's payload.
+    """
+    base = pio.templates['plotly'].to_plotly_json()
+    data = {trace_type: defaults for trace_type, defaults in base['data'].items()
+            if trace_type in DASHBOARD_TRACE_TYPES}
+    layout = {key: value for key, value in base['layout'].items() if key not in UNUSED_LAYOUT_KEYS}
+
+    template = go.layout.Template(data=data, layout=layout)
+    template.layout.hoverlabel = dict(
+        bgcolor="white",
+        bordercolor="black",
+        font_size=12,
+        font_family="Arial",
+        font_color="black"
+    )
+    return template
+
+def _compact_array(values, decimals):
+    """Round a float array to display precision, downcasting to float32 when that stays exact"""
+    rounded = np.round(values, decimals)
+    as_float32 = rounded.astype(np.float32)
+    # float32 halves the typed-array bytes but only holds ~7 significant digits
+    if np.allclose(as_float32, rounded, rtol=0, atol=0.5 * 10 ** -decimals, equal_nan=True):
+        return as_float32
+    return rounded
+
+def _compact_value(value, decimals):
+    """Compact one property value: typed arrays, rounded list values, date-only timestamps"""
+    if isinstance(value, dict):
+        return {key: _compact_value(item, decimals) for key, item in value.items()}
+
+    if isinstance(value, (list, tuple)):
+        return [_compact_value(item, decimals) for item in value]
+
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == 'f':
+            return _compact_array(value, decimals)
+        if value.dtype.kind == 'M':
+            days = value.astype('datetime64[D]')
+            if (days == value).all():
+                return np.datetime_as_string(days, unit='D')
+        if value.dtype.kind == 'O':
+            return np.array([_compact_value(item, decimals) for item in value], dtype=object)
+        return value
+
+    if isinstance(value, float) and np.isfinite(value):
+        return round(value, decimals)
+    return value
+
+def compact_figure(fig, decimals=4):
+    """Shrink a figure's serialized size without changing what it displays
+
+    Floats are rounded to display precision (every chart shows at most four
+    decimals, e.g. a rate as 12.34%), float arrays ship as float32 typed
+    arrays where that is exact at that precision, and midnight timestamps
+    become date-only strings.
+    """
+    for trace in fig.data:
+        compacted = {key: _compact_value(value, decimals)
+                     for key, value in trace.to_plotly_json().items() if key != 'type'}
+        trace.update(compacted)
+    return fig
+
+def figure_payload_bytes(fig):
+    """Bytes of the figure JSON sent to the browser"""
+    return len(fig.to_json().encode('utf-8'))
@@ -0,0 +1,99 @@
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import sys
+import threading
+import time
+from collections import deque
+import pandas as pd
+import config
+
+logger = logging.getLogger('dashboard.perf')
+_spans = deque(maxlen=config.INSTRUMENTATION_MAX_SPANS)
+_logger_lock = threading.Lock()
+_logger_configured = False
+# Session spans are attributed to on threads that carry no script run context
+_session = contextvars.ContextVar('instrumentation_session', default=None)
+
+def _configure_logger():
+    """Send span records to the configured file, or stderr, one JSON object per line"""
+    global _logger_configured
+    with _logger_lock:
+        if _logger_configured:
+            return
+        if config.INSTRUMENTATION_LOG_FILE:
+            handler = logging.FileHandler(config.INSTRUMENTATION_LOG_FILE)
+        else:
+            handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        _logger_configured = True
+
+@contextlib.contextmanager
+def session_scope(session_id):
+    """Attribute spans recorded in this block to session_id, e.g. on a pooled worker thread"""
+    token = _session.set(session_id)
+    try:
+        yield
+    finally:
+        _session.reset(token)
+
+def _session_id():
+    if _session.get() is not None:
+        return _session.get()
+    # Imported lazily so batch and API processes need no Streamlit runtime
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else None
+
+def row_count(value):
+    """Rows in a frame, series or collection result; None for anything else"""
+    if isinstance(value, (pd.DataFrame, pd.Series, dict, list)):
+        return len(value)
+    return None
+
+def record_span(stage, name, seconds, cache=None, rows=None, **tags):
+    """Keep a finished span for the debug panel and log it as JSON"""
+    span = {
+        'ts': time.time(),
+        'stage': stage,
+        'name': name,
+        'ms': round(seconds * 1000, 3),
+        'cache': cache,
+        'rows': rows,
+        'thread': threading.current_thread().name,
+        'session': _session_id()
+    }
+    span.update(tags)
+    _spans.append(span)
+
+    if not _logger_configured:
+        _configure_logger()
+    logger.info(json.dumps(span, default=str))
+
+def timed(stage):
+    """Record a span per call, with the result's row count, while instrumentation is on
+
+    When it is off the wrapper only checks the flag, so hot paths can stay decorated.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not config.INSTRUMENTATION_ENABLED:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            value = func(*args, **kwargs)
+            record_span(stage, func.__name__, time.perf_counter() - start, rows=row_count(value))
+            return value
+        return wrapper
+    return decorator
+
+def get_spans(session_id=None, since=None):
+    """Recorded spans, optionally only one session's and only those finished after since"""
+    return [span for span in list(_spans)
+            if (session_id is None or span['session'] == session_id)
+            and (since is None or span['ts'] >= since)]
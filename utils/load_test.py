@@ -0,0 +1,155 @@
+import argparse
+import contextlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest
+import config
+from utils.cache_tiers import get_cache_tiers
+from utils.data_loader import get_tenant_roots
+from utils.memory_profile import RssSampler, current_rss
+
+DASHBOARD_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dashboard.py')
+
+# An analyst's visit, as (step, action on the session's AppTest given the round number); each action reruns the script
+SESSION_SCRIPT = [
+    ('open', lambda at, rnd: at.run()),
+    ('toggle_anomalies', lambda at, rnd: at.toggle(key='show_anomalies').set_value(rnd % 2 == 1).run()),
+    ('distribution_metric', lambda at, rnd: at.selectbox(key='distribution_metric').select(
+        ['cpa', 'roas', 'cpc'][rnd % 3]).run()),
+    ('distribution_dimension', lambda at, rnd: at.radio(key='distribution_dimension').set_value(
+        ['tactic', 'platform'][rnd % 2]).run()),
+    ('daily_budget', lambda at, rnd: at.number_input(key='daily_budget').set_value(40000.0 + 5000.0 * rnd).run()),
+    ('open_advanced', lambda at, rnd: at.toggle(key='advanced_expanded').set_value(True).run()),
+    ('rerun', lambda at, rnd: at.run())
+]
+
+@contextlib.contextmanager
+def shared_script_cache():
+    """Compile the dashboard once for every simulated session, as a server's single ScriptCache does
+
+    AppTest builds a new ScriptCache per run, so concurrent sessions would
+    recompile the script on every rerun: time a real server never spends,
+    and a path into the thread-unsafe AST constructor of older CPython 3.11
+    releases.
+    """
+    cache = ScriptCache()
+    get_bytecode = ScriptCache.get_bytecode
+    ScriptCache.get_bytecode = lambda self, script_path: get_bytecode(cache, script_path)
+    try:
+        yield
+    finally:
+        ScriptCache.get_bytecode = get_bytecode
+
+def run_session(tenant, rounds, think_seconds=0.0):
+    """Drive one simulated session through SESSION_SCRIPT rounds times; one latency record per rerun"""
+    at = AppTest.from_file(DASHBOARD_PATH, default_timeout=config.LOAD_TEST_TIMEOUT_SECONDS)
+    if tenant != 'default':
+        at.query_params['tenant'] = tenant
+
+    records = []
+    for rnd in range(rounds):
+        for step, action in SESSION_SCRIPT:
+            start = time.perf_counter()
+            error = None
+            try:
+                action(at, rnd)
+                if at.exception:
+                    error = at.exception[0].value
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            records.append({'step': step, 'seconds': time.perf_counter() - start, 'error': error})
+            if think_seconds:
+                time.sleep(think_seconds)
+    return records
+
+def _cache_counts():
+    hits = misses = 0
+    for tier in get_cache_tiers():
+        stats = tier.stats()
+        hits += stats['hits']
+        misses += stats['misses']
+    return hits, misses
+
+def _percentiles(seconds):
+    values = np.percentile(seconds, [50, 90, 95, 99]) * 1000 if len(seconds) else [np.nan] * 4
+    return dict(zip(['p50_ms', 'p90_ms', 'p95_ms', 'p99_ms'], np.round(values, 1).tolist()))
+
+def run_load_level(sessions, tenant='default', rounds=None, think_seconds=0.0):
+    """Run sessions concurrent simulated sessions; latency percentiles, throughput, cache hit rate and memory"""
+    rounds = config.LOAD_TEST_ROUNDS if rounds is None else rounds
+    hits_before, misses_before = _cache_counts()
+    # Let the sessions start together so the level measures real concurrency
+    barrier = threading.Barrier(sessions)
+
+    def session():
+        barrier.wait()
+        return run_session(tenant, rounds, think_seconds)
+
+    with RssSampler() as rss:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix='load-session') as executor:
+            records = [record for result in executor.map(lambda _: session(), range(sessions)) for record in result]
+        wall_seconds = time.perf_counter() - start
+
+    hits_after, misses_after = _cache_counts()
+    lookups = (hits_after - hits_before) + (misses_after - misses_before)
+    seconds = [record['seconds'] for record in records if record['error'] is None]
+    return {
+        'sessions': sessions,
+        'reruns': len(records),
+        'errors': sum(record['error'] is not None for record in records),
+        'wall_seconds': round(wall_seconds, 2),
+        'reruns_per_second': round(len(records) / wall_seconds, 2),
+        **_percentiles(seconds),
+        'max_ms': round(max(seconds) * 1000, 1) if seconds else None,
+        'cache_hit_rate': round((hits_after - hits_before) / lookups, 3) if lookups else None,
+        'rss_peak_mb': None if rss.peak_rss is None else round(rss.peak_rss / 1024 / 1024, 1),
+        'rss_end_mb': None if current_rss() is None else round(current_rss() / 1024 / 1024, 1),
+        'steps': {step: _percentiles([record['seconds'] for record in records
+                                      if record['step'] == step and record['error'] is None])
+                  for step, _ in SESSION_SCRIPT},
+        'first_error': next((record['error'] for record in records if record['error'] is not None), None)
+    }
+
+def run_load_test(levels=None, tenant='default', rounds=None, think_seconds=0.0, warm=True):
+    """One result per concurrency level, after an unmeasured warm-up session unless warm is False"""
+    levels = config.LOAD_TEST_LEVELS if levels is None else levels
+    with shared_script_cache():
+        if warm:
+            run_session(tenant, 1)
+        return [run_load_level(sessions, tenant, rounds, think_seconds) for sessions in levels]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Drive dashboard.py with concurrent simulated sessions")
+    parser.add_argument('--sessions', type=int, action='append',
+                        help="Concurrency level (repeatable); LOAD_TEST_LEVELS by default")
+    parser.add_argument('--rounds', type=int, default=config.LOAD_TEST_ROUNDS,
+                        help="Times each session repeats the scripted interactions")
+    parser.add_argument('--tenant', choices=list(get_tenant_roots()), default='default')
+    parser.add_argument('--think-seconds', type=float, default=0.0, help="Pause between a session's interactions")
+    parser.add_argument('--cold', action='store_true', help="Skip the warm-up session")
+    parser.add_argument('--steps', action='store_true', help="Also print per-step latency percentiles")
+    parser.add_argument('--output', help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    results = run_load_test(args.sessions, args.tenant, args.rounds, args.think_seconds, not args.cold)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    print(f"{'sessions':>8}{'reruns':>8}{'errors':>8}{'rerun/s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p95 ms':>9}"
+          f"{'p99 ms':>9}{'max ms':>9}{'hit rate':>10}{'peak MB':>9}")
+    for result in results:
+        print(f"{result['sessions']:>8}{result['reruns']:>8}{result['errors']:>8}{result['reruns_per_second']:>9}"
+              f"{result['p50_ms']:>9}{result['p90_ms']:>9}{result['p95_ms']:>9}{result['p99_ms']:>9}"
+              f"{result['max_ms']:>9}{result['cache_hit_rate']:>10}{result['rss_peak_mb']:>9}")
+        if args.steps:
+            for step, percentiles in result['steps'].items():
+                print(f"{'':>8}  {step:<24}" + "".join(f"{value:>9}" for value in percentiles.values()))
+        if result['first_error']:
+            print(f"{'':>8}  first error: {result['first_error']}")
@@ -0,0 +1,244 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import threading
+import tracemalloc
+import pandas as pd
+import plotly.graph_objects as go
+import config
+from utils.benchmark import ensure_dataset, run_pipeline
+from utils.cache_tiers import estimate_size
+from utils.data_loader import get_tenant_roots
+from utils.figure_payload import figure_payload_bytes
+from utils.snapshot_store import PROJECT_ROOT
+
+MB = 1024 * 1024
+
+# Allocation sites holding less than this after a stage are left out of the report
+MIN_SITE_BYTES = 10 * 1024
+
+# Allocations made by the profiler itself
+PROFILER_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, threading.__file__),
+    tracemalloc.Filter(False, __file__)
+]
+
+def current_rss():
+    """Resident set size of this process in bytes, or None where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+class RssSampler:
+    """Track the peak RSS while a block runs, sampling from a background thread"""
+
+    def __init__(self, interval=None):
+        self.interval = config.MEMORY_RSS_SAMPLE_SECONDS if interval is None else interval
+        self.start_rss = None
+        self.peak_rss = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        rss = current_rss()
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, rss)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self.start_rss = current_rss()
+        self.peak_rss = self.start_rss
+        self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+def _mb(value):
+    return None if value is None else round(value / MB, 3)
+
+def frame_breakdown(name, df, top=None):
+    """Rows, deep size and largest columns of a frame"""
+    top = config.MEMORY_TOP_COLUMNS if top is None else top
+    column_bytes = df.memory_usage(index=True, deep=True).sort_values(ascending=False)
+    return {
+        'name': name,
+        'rows': len(df),
+        'mb': _mb(column_bytes.sum()),
+        'columns': [{'column': str(column), 'dtype': str(df[column].dtype) if column in df.columns else 'index',
+                     'mb': _mb(size)} for column, size in column_bytes.head(top).items()]
+    }
+
+def _result_size(value):
+    # Figures hold references back to their parents, so size them by their JSON instead
+    return figure_payload_bytes(value) if isinstance(value, go.Figure) else estimate_size(value)
+
+def _result_frames(name, value):
+    """(name, frame) for a stage result that is, or is a dict or tuple of, DataFrames"""
+    if isinstance(value, pd.DataFrame):
+        return [(name, value)]
+    if isinstance(value, dict):
+        return [(f"{name}[{key}]", item) for key, item in value.items() if isinstance(item, pd.DataFrame)]
+    if isinstance(value, tuple):
+        return [(f"{name}[{idx}]", item) for idx, item in enumerate(value) if isinstance(item, pd.DataFrame)]
+    return []
+
+def _allocation_site(traceback):
+    """file:line of the innermost project frame behind an allocation, else its innermost frame"""
+    for frame in reversed(traceback):
+        if frame.filename.startswith(PROJECT_ROOT) and not frame.filename.endswith(('memory_profile.py', 'benchmark.py')):
+            return f"{os.path.relpath(frame.filename, PROJECT_ROOT)}:{frame.lineno}"
+    frame = traceback[-1]
+    return f"{os.path.basename(frame.filename)}:{frame.lineno}"
+
+def _top_allocations(before, after, top=None):
+    """Project lines holding the most memory allocated between two snapshots and still alive"""
+    top = config.MEMORY_TOP_ALLOCATIONS if top is None else top
+    sites = {}
+    for stat in after.filter_traces(PROFILER_FILTERS).compare_to(before.filter_traces(PROFILER_FILTERS), 'traceback'):
+        if stat.size_diff > 0:
+            site = _allocation_site(stat.traceback)
+            sites[site] = sites.get(site, 0) + stat.size_diff
+    return [{'site': site, 'mb': _mb(size)}
+            for site, size in sorted(sites.items(), key=lambda item: -item[1])[:top] if size >= MIN_SITE_BYTES]
+
+def profile_stages(data_root, allocation_sites=False):
+    """Peak and retained memory of every pipeline stage, run one at a time
+
+    Python peaks and retained sizes come from tracemalloc, which sees
+    NumPy buffers but not Arrow ones; RSS sampling covers everything the
+    process maps, and result_mb is the deep size of what the stage returned
+    (a figure's JSON size for charts). allocation_sites also lists the
+    project lines holding each stage's retained memory, at several times
+    the run time.
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(config.MEMORY_TRACE_FRAMES if allocation_sites else 1)
+    stages = []
+
+    def measure(name, call):
+        gc.collect()
+        before = tracemalloc.take_snapshot() if allocation_sites else None
+        traced_before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        with RssSampler() as rss:
+            value = call()
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        gc.collect()
+        traced_after = tracemalloc.get_traced_memory()[0]
+        # Before the snapshot, which takes memory of its own
+        rss_after = current_rss()
+
+        stage = {
+            'stage': name,
+            'python_peak_mb': _mb(traced_peak - traced_before),
+            'python_retained_mb': _mb(traced_after - traced_before),
+            'rss_peak_mb': _mb(None if rss.start_rss is None else rss.peak_rss - rss.start_rss),
+            'rss_retained_mb': _mb(None if rss.start_rss is None else rss_after - rss.start_rss),
+            'result_mb': _mb(_result_size(value)),
+            'frames': [frame_breakdown(frame_name, df) for frame_name, df in _result_frames(name, value)]
+        }
+        if allocation_sites:
+            stage['top_allocations'] = _top_allocations(before, tracemalloc.take_snapshot())
+        stages.append(stage)
+        return value
+
+    try:
+        run_pipeline(data_root, measure)
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return stages
+
+def build_memory_report(data_root, label, allocation_sites=False):
+    """Memory report for one data root: per-stage figures and the largest frames overall"""
+    stages = profile_stages(data_root, allocation_sites)
+    frames = sorted((frame for stage in stages for frame in stage['frames']), key=lambda frame: -frame['mb'])
+    return {
+        'label': label,
+        'created': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        # ru_maxrss is in KB on Linux
+        'max_rss_mb': _mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024),
+        'stages': stages,
+        'largest_frames': frames[:config.MEMORY_TOP_FRAMES]
+    }
+
+def compare_reports(report, baseline):
+    """Per-stage change in peak RSS, Python peak and result size against an earlier report"""
+    baseline_stages = {stage['stage']: stage for stage in baseline['stages']}
+    rows = []
+    for stage in report['stages']:
+        old = baseline_stages.get(stage['stage'])
+        if old is None:
+            continue
+        rows.append({'stage': stage['stage']} | {
+            f"{key}_delta": None if stage[key] is None or old[key] is None else round(stage[key] - old[key], 2)
+            for key in ['rss_peak_mb', 'python_peak_mb', 'result_mb']
+        })
+    return rows
+
+def render_report_text(report):
+    """Fixed-width text view of a report, stable enough to diff between releases"""
+    def fmt(value):
+        return f"{'-' if value is None else value:>10}"
+
+    lines = [f"Memory report: {report['label']} (max RSS {report['max_rss_mb']} MB)", "",
+             f"{'stage':<38}{'rss_peak':>10}{'rss_kept':>10}{'py_peak':>10}{'py_kept':>10}{'result':>10}"]
+    for stage in report['stages']:
+        lines.append(f"{stage['stage']:<38}" + "".join(fmt(stage[key]) for key in [
+            'rss_peak_mb', 'rss_retained_mb', 'python_peak_mb', 'python_retained_mb', 'result_mb']))
+        for allocation in stage.get('top_allocations', []):
+            lines.append(f"    {allocation['site']:<50}{allocation['mb']:>10} MB")
+
+    lines += ["", "Largest frames"]
+    for frame in report['largest_frames']:
+        lines.append(f"{frame['name']:<44}{frame['rows']:>12,} rows{frame['mb']:>10} MB")
+        for column in frame['columns']:
+            lines.append(f"    {column['column']:<30}{column['dtype']:<20}{column['mb']:>10} MB")
+    return "\n".join(lines)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Report peak and retained memory per pipeline stage")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--tenant', choices=list(get_tenant_roots()), help="Profile a tenant's data (default tenant by default)")
+    source.add_argument('--scale', choices=list(config.BENCHMARK_SCALES), help="Profile a synthetic benchmark dataset")
+    parser.add_argument('--allocation-sites', action='store_true',
+                        help="List the project lines holding each stage's memory (much slower)")
+    parser.add_argument('--output', help="Write the report as JSON")
+    parser.add_argument('--compare', metavar='REPORT', help="Earlier JSON report to show per-stage changes against")
+    args = parser.parse_args()
+
+    if args.scale:
+        report = build_memory_report(ensure_dataset(args.scale), f"scale {args.scale}", args.allocation_sites)
+    else:
+        tenant = args.tenant or 'default'
+        report = build_memory_report(get_tenant_roots()[tenant], f"tenant {tenant}", args.allocation_sites)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    print(render_report_text(report))
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\nChange against {args.compare} (MB)")
+        print(f"{'stage':<38}{'rss_peak':>12}{'py_peak':>12}{'result':>12}")
+        for row in compare_reports(report, baseline):
+            print(f"{row['stage']:<38}" + "".join(
+                f"{'-' if row[key] is None else f'{row[key]:+.2f}':>12}"
+                for key in ['rss_peak_mb_delta', 'python_peak_mb_delta', 'result_mb_delta']))
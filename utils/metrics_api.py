@@ -0,0 +1,226 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import threading
+import pandas as pd
+import tornado.ioloop
+import tornado.web
+import config
+from utils.cache_tiers import cached
+from utils.data_loader import (load_merged_data, get_snapshot_fingerprint, get_tenant_roots,
+                               calculate_kpis, get_revenue_by_platform_data, get_roas_by_platform_data,
+                               get_campaign_tactic_heatmap_data, get_conversion_funnel_data,
+                               get_engagement_metrics_data, get_cac_clv_data,
+                               get_gross_profit_attribution_data, get_efficiency_metrics_data,
+                               get_platform_daily_data)
+from utils.rerun_profiler import profile_token, token_matches
+
+# Per-chart datasets served under /api/datasets/<name>, each built from the filtered merged rows alone
+API_DATASETS = {
+    'revenue_by_platform': get_revenue_by_platform_data,
+    'roas_by_platform': get_roas_by_platform_data,
+    'campaign_tactic_heatmap': get_campaign_tactic_heatmap_data,
+    'conversion_funnel': get_conversion_funnel_data,
+    'engagement_metrics': get_engagement_metrics_data,
+    'cac_clv': get_cac_clv_data,
+    'gross_profit_attribution': get_gross_profit_attribution_data,
+    'efficiency_metrics': get_efficiency_metrics_data,
+    'platform_daily': get_platform_daily_data
+}
+
+# Query arguments that filter the merged rows; list filters accept repeated or comma-separated values
+LIST_FILTERS = ['platform', 'tactic', 'campaign', 'state']
+DATE_FILTERS = ['start', 'end']
+
+def parse_filters(query_arguments):
+    """Normalize request query arguments into a hashable, order-independent filter tuple"""
+    filters = []
+    for name in LIST_FILTERS:
+        values = sorted({value for raw in query_arguments.get(name, [])
+                         for value in raw.decode('utf-8').split(',') if value})
+        if values:
+            filters.append((name, tuple(values)))
+
+    for name in DATE_FILTERS:
+        raw = query_arguments.get(name)
+        if raw:
+            # Raises ValueError on a malformed date, reported as a 400
+            filters.append((name, pd.Timestamp(raw[-1].decode('utf-8')).strftime('%Y-%m-%d')))
+    return tuple(filters)
+
+def filter_merged_data(merged_df, filters):
+    """Rows of the merged data matching every filter"""
+    mask = pd.Series(True, index=merged_df.index)
+    for name, value in filters:
+        if name in LIST_FILTERS:
+            mask &= merged_df[name].isin(value)
+        elif name == 'start':
+            mask &= merged_df['date'] >= pd.Timestamp(value)
+        elif name == 'end':
+            mask &= merged_df['date'] <= pd.Timestamp(value)
+    return merged_df[mask]
+
+def _encode(resource, data_fingerprint, filters, data):
+    """JSON body and its strong ETag"""
+    body = json.dumps({
+        'resource': resource,
+        'data_fingerprint': data_fingerprint,
+        'filters': {name: list(value) if isinstance(value, tuple) else value for name, value in filters},
+        'data': data
+    }, separators=(',', ':')).encode('utf-8')
+    return body, '"' + hashlib.sha1(body).hexdigest() + '"'
+
+@cached('query')
+def build_kpi_response(data_root, data_fingerprint, filters):
+    """Encoded KPI response for one tenant snapshot and filter set"""
+    merged_df = load_merged_data(data_root, data_fingerprint)
+    if merged_df is None:
+        return None
+
+    filtered_df = filter_merged_data(merged_df, filters)
+    total_revenue, total_orders, avg_cogs, overall_roas = calculate_kpis(filtered_df)
+    kpis = {
+        'total_revenue': float(total_revenue),
+        'total_orders': int(total_orders),
+        'avg_cogs_percentage': None if pd.isna(avg_cogs) else float(avg_cogs),
+        'overall_roas': float(overall_roas),
+        'rows': len(filtered_df)
+    }
+    return _encode('kpis', data_fingerprint, filters, kpis)
+
+@cached('query')
+def build_dataset_response(data_root, data_fingerprint, dataset, filters):
+    """Encoded rows of one chart dataset for one tenant snapshot and filter set"""
+    merged_df = load_merged_data(data_root, data_fingerprint)
+    if merged_df is None:
+        return None
+
+    filtered_df = filter_merged_data(merged_df, filters)
+    if filtered_df.empty:
+        return _encode(dataset, data_fingerprint, filters, [])
+
+    data = API_DATASETS[dataset](filtered_df)
+    if data is None:
+        return None
+    rows = json.loads(data.to_json(orient='records', date_format='iso'))
+    return _encode(dataset, data_fingerprint, filters, rows)
+
+class _JsonHandler(tornado.web.RequestHandler):
+    """Serves a prebuilt body; tornado answers If-None-Match with a 304 from compute_etag
+
+    Every request needs the admin token as "Authorization: Bearer <token>",
+    since any tenant's data can be read through ?tenant=.
+    """
+
+    def initialize(self):
+        self._etag = None
+
+    def prepare(self):
+        if profile_token() is None:
+            raise tornado.web.HTTPError(403, reason=f"Set {config.PROFILE_TOKEN_ENV_VAR} to enable the API")
+        scheme, _, token = self.request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not token_matches(token):
+            self.set_header('WWW-Authenticate', 'Bearer')
+            raise tornado.web.HTTPError(401, reason="Missing or invalid token")
+
+    def compute_etag(self):
+        return self._etag
+
+    async def run_blocking(self, func, *args):
+        """Run a response build off the event loop, so a cold cache miss does not stall other requests"""
+        return await tornado.ioloop.IOLoop.current().run_in_executor(None, func, *args)
+
+    def write_encoded(self, response):
+        if response is None:
+            raise tornado.web.HTTPError(503, reason="Data unavailable")
+        body, self._etag = response
+        self.set_header('Content-Type', 'application/json')
+        self.set_header('Cache-Control', f"private, max-age={config.METRICS_API_MAX_AGE_SECONDS}")
+        self.write(body)
+
+    def get_data_root(self):
+        tenant = self.get_query_argument('tenant', 'default')
+        data_root = get_tenant_roots().get(tenant)
+        if data_root is None:
+            raise tornado.web.HTTPError(404, reason=f"Unknown tenant '{tenant}'")
+        return data_root
+
+    def get_filters(self):
+        try:
+            return parse_filters(self.request.query_arguments)
+        except ValueError as e:
+            raise tornado.web.HTTPError(400, reason=f"Invalid filter: {e}")
+
+def _index_response(data_root):
+    return _encode('index', get_snapshot_fingerprint(data_root), (), {
+        'kpis': '/api/kpis',
+        'datasets': {name: f"/api/datasets/{name}" for name in API_DATASETS},
+        'filters': LIST_FILTERS + DATE_FILTERS,
+        'tenants': list(get_tenant_roots())
+    })
+
+def _kpi_response(data_root, filters):
+    return build_kpi_response(data_root, get_snapshot_fingerprint(data_root), filters)
+
+def _dataset_response(data_root, dataset, filters):
+    return build_dataset_response(data_root, get_snapshot_fingerprint(data_root), dataset, filters)
+
+class IndexHandler(_JsonHandler):
+    async def get(self):
+        self.write_encoded(await self.run_blocking(_index_response, self.get_data_root()))
+
+class KpiHandler(_JsonHandler):
+    async def get(self):
+        self.write_encoded(await self.run_blocking(_kpi_response, self.get_data_root(), self.get_filters()))
+
+class DatasetHandler(_JsonHandler):
+    async def get(self, dataset):
+        if dataset not in API_DATASETS:
+            raise tornado.web.HTTPError(404, reason=f"Unknown dataset '{dataset}'")
+        self.write_encoded(await self.run_blocking(_dataset_response, self.get_data_root(), dataset,
+                                                   self.get_filters()))
+
+def make_api_app():
+    return tornado.web.Application([
+        (r'/api/?', IndexHandler),
+        (r'/api/kpis', KpiHandler),
+        (r'/api/datasets/([a-z_]+)', DatasetHandler)
+    ])
+
+def start_api_server(port, address=None):
+    """Serve the API from a daemon thread with its own event loop, sharing this process's caches
+
+    Raises OSError when the port is already taken.
+    """
+    address = config.METRICS_API_ADDRESS if address is None else address
+    started = threading.Event()
+    errors = []
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            make_api_app().listen(port, address=address)
+        except OSError as e:
+            errors.append(e)
+            started.set()
+            return
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, name='metrics-api', daemon=True).start()
+    started.wait()
+    if errors:
+        raise errors[0]
+
+async def _serve(port, address):
+    make_api_app().listen(port, address=address)
+    await asyncio.Event().wait()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve dashboard KPIs and chart datasets as JSON")
+    parser.add_argument('--port', type=int, default=config.METRICS_API_PORT)
+    parser.add_argument('--address', default=config.METRICS_API_ADDRESS)
+    args = parser.parse_args()
+    asyncio.run(_serve(args.port, args.address))
@@ -0,0 +1,217 @@
+import threading
+import time
+import config
+from utils.data_loader import (load_campaign_data, load_business_data, load_metric_sketches,
+                               load_anomaly_data, load_response_curves, load_customer_value_model,
+                               load_bootstrap_intervals, get_snapshot_fingerprint, load_merged_data,
+                               get_revenue_by_platform_data, get_roas_by_platform_data,
+                               get_metric_quantile_data, get_efficiency_metrics_data, calculate_kpis,
+                               get_engagement_metrics_data, get_campaign_tactic_heatmap_data,
+                               get_conversion_funnel_data)
+from utils.chart_functions import (create_revenue_by_platform_chart, create_efficiency_trends_chart,
+                                  create_roas_comparison_chart, create_cac_clv_scatter_chart,
+                                  create_gross_profit_waterfall_chart, create_campaign_tactic_heatmap,
+                                  create_conversion_funnel_chart, create_platform_revenue_pie_chart,
+                                  create_engagement_metrics_chart, create_metric_distribution_chart,
+                                  create_budget_reallocation_chart)
+from utils.figure_cache import FigureCache, get_or_build_figure
+from utils.cache_tiers import get_cache_tier
+from utils.render_scheduler import PanelGraph
+from utils.figure_payload import compact_figure
+from utils.metrics_api import build_kpi_response, build_dataset_response, API_DATASETS
+
+# Layout overrides per chart node
+CHART_LAYOUTS = {
+    'revenue_by_platform': dict(height=260, margin=dict(t=20, b=20, l=20, r=20)),
+    'cac_clv_scatter': dict(height=260, margin=dict(t=20, b=20, l=20, r=40)),
+    'roas_comparison': dict(height=260, margin=dict(t=20, b=20, l=50, r=20)),
+    'efficiency_trends': dict(height=280, margin=dict(t=20, b=20, l=20, r=60)),
+    'gross_profit_waterfall': dict(height=280, margin=dict(t=20, b=20, l=20, r=20)),
+    'metric_distribution': dict(height=280, margin=dict(t=40, b=20, l=20, r=20)),
+    'budget_reallocation': dict(height=280, margin=dict(t=40, b=20, l=20, r=20)),
+    'platform_revenue_pie': dict(height=320, margin=dict(t=50, b=15, l=15, r=60)),
+    'engagement_metrics': dict(height=320, margin=dict(t=50, b=15, l=15, r=15)),
+    'campaign_tactic_heatmap': dict(height=320, margin=dict(t=50, b=15, l=15, r=60)),
+    'conversion_funnel': dict(height=320, margin=dict(t=50, b=15, l=15, r=15))
+}
+
+# Nodes each panel consumes; resolving a panel computes only what changed
+PANEL_NODES = {
+    'kpi_row': ['kpis'],
+    'revenue': ['platform_revenue', 'revenue_by_platform'],
+    'customer_acquisition': ['cac_clv_scatter'],
+    'roas': ['roas_data', 'bootstrap_intervals', 'roas_comparison'],
+    'efficiency': ['cpc_quantiles', 'efficiency_data', 'efficiency_trends'],
+    'waterfall': ['gross_profit_waterfall'],
+    'distribution': ['metric_distribution'],
+    'budget': ['response_curves', 'budget_reallocation'],
+    'advanced': ['platform_revenue_pie', 'engagement_metrics', 'campaign_tactic_heatmap', 'conversion_funnel']
+}
+
+def get_figure_cache(data_root):
+    """A tenant's figure cache, shared by every session in this server process"""
+    return get_cache_tier('figures', data_root, tier_class=FigureCache)
+
+def get_default_daily_budget(response_curves):
+    """Current total daily spend, rounded for the budget input"""
+    return round(float(response_curves['avg_daily_spend'].sum()), -2)
+
+def add_chart_node(graph, chart_id, builder, inputs, filter_params=()):
+    """Register a chart node that builds its figure through the figure cache
+
+    Builder arguments come from inputs; filter_params only feed the cache key.
+    """
+    def build_compact_figure(*builder_args):
+        fig = builder(*builder_args)
+        if fig is not None and config.COMPACT_FIGURES:
+            compact_figure(fig, config.PAYLOAD_DECIMALS)
+        return fig
+
+    def build_chart(data_root, data_fingerprint, *values):
+        builder_args = values[:len(inputs)]
+        filter_state = dict(zip(filter_params, values[len(inputs):])) or None
+        return get_or_build_figure(
+            get_figure_cache(data_root), chart_id, data_fingerprint,
+            build_compact_figure, builder_args,
+            filter_state=filter_state,
+            layout_overrides=CHART_LAYOUTS[chart_id]
+        )
+
+    # Not stored by the graph: every resolve reads the figure cache, which hands out a fresh figure
+    graph.add_node(chart_id, build_chart, ['data_root', 'data_fingerprint'] + list(inputs) + list(filter_params),
+                   store=False)
+
+# Built on first use and shared for the life of the process
+_panel_graph = None
+_panel_graph_lock = threading.Lock()
+
+def get_panel_graph():
+    """Dashboard data and chart nodes, shared by every session and the cache warmer in this process
+
+    Intermediates are stored in the tenant's query tier; loaders and charts already
+    read through their own tiers and run on every resolve.
+    """
+    global _panel_graph
+    with _panel_graph_lock:
+        if _panel_graph is None:
+            _panel_graph = _build_panel_graph()
+        return _panel_graph
+
+def _build_panel_graph():
+    graph = PanelGraph(max_workers=config.RENDER_WORKERS,
+                       result_tier=lambda params: get_cache_tier('query', params['data_root']))
+
+    # Datasets; the loaders key on the tenant's data root and fingerprint so a data change invalidates everything downstream
+    graph.add_node('campaign_df', load_campaign_data, ['data_root', 'data_fingerprint'], store=False)
+    graph.add_node('business_df', load_business_data, ['data_root', 'data_fingerprint'], store=False)
+    graph.add_node('metric_sketches', load_metric_sketches, ['data_root', 'data_fingerprint'], store=False)
+    graph.add_node('anomaly_data', load_anomaly_data, ['data_root', 'data_fingerprint'], store=False)
+    graph.add_node('response_curves', load_response_curves, ['data_root', 'data_fingerprint'], store=False)
+    graph.add_node('customer_value_model', load_customer_value_model, ['data_root', 'data_fingerprint'], store=False)
+    graph.add_node('bootstrap_intervals', load_bootstrap_intervals, ['data_root', 'data_fingerprint'], store=False)
+    graph.add_node('merged_df',
+                   lambda data_root, data_fingerprint, campaign_df, business_df: load_merged_data(data_root, data_fingerprint),
+                   ['data_root', 'data_fingerprint', 'campaign_df', 'business_df'], store=False)
+
+    # Intermediates shared by insights and charts
+    graph.add_node('kpis', calculate_kpis, ['merged_df'])
+    graph.add_node('platform_revenue', get_revenue_by_platform_data, ['merged_df'])
+    graph.add_node('efficiency_data', get_efficiency_metrics_data, ['merged_df'])
+    graph.add_node('roas_data', get_roas_by_platform_data, ['merged_df'])
+    graph.add_node('engagement_data', get_engagement_metrics_data, ['merged_df'])
+    graph.add_node('heatmap_data', get_campaign_tactic_heatmap_data, ['merged_df'])
+    graph.add_node('funnel_data', get_conversion_funnel_data, ['merged_df'])
+    graph.add_node('cpc_quantiles',
+                   lambda sketches: get_metric_quantile_data(sketches, 'cpc', 'platform') if sketches else None,
+                   ['metric_sketches'])
+    graph.add_node('flagged_anomalies', lambda anomalies, show: anomalies if show else None,
+                   ['anomaly_data', 'show_anomalies'], store=False)
+    graph.add_node('budget_target',
+                   lambda curves, budget: budget if budget is not None else get_default_daily_budget(curves),
+                   ['response_curves', 'daily_budget'], store=False)
+
+    # Charts
+    add_chart_node(graph, 'revenue_by_platform', create_revenue_by_platform_chart, ['merged_df', 'platform_revenue'])
+    add_chart_node(graph, 'cac_clv_scatter', create_cac_clv_scatter_chart, ['merged_df', 'customer_value_model'])
+    add_chart_node(graph, 'roas_comparison', create_roas_comparison_chart, ['merged_df', 'bootstrap_intervals', 'roas_data'])
+    add_chart_node(graph, 'efficiency_trends', create_efficiency_trends_chart,
+                   ['merged_df', 'flagged_anomalies', 'efficiency_data', 'efficiency_range'],
+                   filter_params=['show_anomalies', 'efficiency_range'])
+    add_chart_node(graph, 'gross_profit_waterfall', create_gross_profit_waterfall_chart, ['merged_df'])
+    add_chart_node(graph, 'metric_distribution', create_metric_distribution_chart,
+                   ['metric_sketches', 'distribution_metric', 'distribution_dimension', 'bootstrap_intervals'],
+                   filter_params=['distribution_metric', 'distribution_dimension'])
+    add_chart_node(graph, 'budget_reallocation', create_budget_reallocation_chart, ['response_curves', 'budget_target'],
+                   filter_params=['budget_target'])
+    add_chart_node(graph, 'platform_revenue_pie', create_platform_revenue_pie_chart,
+                   ['merged_df', 'platform_revenue', 'roas_data'])
+    add_chart_node(graph, 'engagement_metrics', create_engagement_metrics_chart,
+                   ['merged_df', 'engagement_data', 'bootstrap_intervals'])
+    add_chart_node(graph, 'campaign_tactic_heatmap', create_campaign_tactic_heatmap, ['merged_df', 'heatmap_data'])
+    add_chart_node(graph, 'conversion_funnel', create_conversion_funnel_chart, ['merged_df', 'funnel_data'])
+
+    return graph
+
+def get_panel_params(data_root, data_fingerprint, controls=None):
+    """Graph parameters: the tenant's data root and fingerprint and each control's value or default
+
+    controls maps control names to values, e.g. a session's state or a filter preset.
+    """
+    controls = {} if controls is None else controls
+    return {
+        'data_root': data_root,
+        'data_fingerprint': data_fingerprint,
+        'show_anomalies': controls.get('show_anomalies', True),
+        'efficiency_range': controls.get('efficiency_range'),
+        'distribution_metric': controls.get('distribution_metric', 'cpc'),
+        'distribution_dimension': controls.get('distribution_dimension', 'platform'),
+        'daily_budget': controls.get('daily_budget')
+    }
+
+def warm_panels(data_root, data_fingerprint, presets=None):
+    """Resolve every panel for the default view and each filter preset
+
+    Fills the raw, cube, query and figure tiers of this process and writes the
+    loaders' frames and the figures to the on-disk snapshot. Returns one report
+    row per view, listing the nodes that failed; a failure does not stop the
+    rest from warming.
+    """
+    presets = config.WARM_FILTER_PRESETS if presets is None else presets
+    targets = list(dict.fromkeys(node for nodes in PANEL_NODES.values() for node in nodes))
+    report = []
+
+    for preset in [{}] + list(presets):
+        start = time.perf_counter()
+        _, timings = get_panel_graph().resolve(targets, get_panel_params(data_root, data_fingerprint, preset))
+        report.append({
+            'view': ', '.join(f"{name}={value}" for name, value in preset.items()) or 'default',
+            'seconds': time.perf_counter() - start,
+            'built': sum(not timing['reused'] for timing in timings),
+            'reused': sum(timing['reused'] for timing in timings),
+            'failed': [timing['node'] for timing in timings if timing['error']]
+        })
+    return report
+
+def warm_metrics_api(data_root, data_fingerprint):
+    """Build the metrics API's default responses into the query tier, reporting the ones that failed"""
+    start = time.perf_counter()
+    responses = [('kpis', lambda: build_kpi_response(data_root, data_fingerprint, ()))]
+    responses += [(dataset, lambda dataset=dataset: build_dataset_response(data_root, data_fingerprint, dataset, ()))
+                  for dataset in API_DATASETS]
+    failed = []
+    for name, build in responses:
+        try:
+            build()
+        except Exception:
+            failed.append(name)
+    return {'view': 'metrics API', 'seconds': time.perf_counter() - start,
+            'built': len(responses) - len(failed), 'reused': 0, 'failed': failed}
+
+def warm_dashboard_caches(data_root=config.DATA_ROOT, presets=None):
+    """Warm a dashboard server process before traffic arrives: every panel, then the metrics API
+
+    Renders in this process must agree on the data snapshot, so the fingerprint
+    comes from get_snapshot_fingerprint (and its refresh worker, when enabled).
+    """
+    data_fingerprint = get_snapshot_fingerprint(data_root)
+    return warm_panels(data_root, data_fingerprint, presets) + [warm_metrics_api(data_root, data_fingerprint)]
@@ -0,0 +1,111 @@
+import numpy as np
+
+class KLLSketch:
+    """Mergeable KLL quantile sketch for streaming campaign metrics"""
+
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        # Level h holds items that each stand for 2**h original values
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        """Capacity of a compactor level - lower levels shrink geometrically"""
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def _compress(self):
+        """Compact any over-full level, promoting half its items one level up"""
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) >= self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # Keep one item behind when the level has an odd size
+                keep = items[:len(items) % 2]
+                paired = items[len(items) % 2:]
+                promoted = paired[self._rng.integers(2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                # Capacities depend on depth, so re-check from the bottom
+                level = 0
+                continue
+            level += 1
+
+    def update(self, values):
+        """Add a batch of values (NaN and infinite values are ignored)"""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return self
+        self.count += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Fold another sketch into this one, level by level"""
+        if other.count == 0:
+            return self
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """Estimate one or more quantiles (q in [0, 1])"""
+        q = np.asarray(q, dtype=float)
+        if self.count == 0:
+            return np.full(q.shape, np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items_at), 2.0 ** level)
+                                  for level, items_at in enumerate(self.levels)])
+        order = np.argsort(items)
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+        ranks = q * cumulative[-1]
+        positions = np.searchsorted(cumulative, ranks, side='left')
+        estimates = items[np.clip(positions, 0, len(items) - 1)]
+        # Pin the extremes to the exact min and max seen
+        estimates = np.where(q <= 0, self.min, estimates)
+        estimates = np.where(q >= 1, self.max, estimates)
+        return estimates
+
+    def __len__(self):
+        return self.count
+
+def update_grouped_sketches(sketches, frame, group_columns, metrics, k=200, seed=0):
+    """Update a {(dimension, group, metric): KLLSketch} mapping from one chunk
+
+    New sketches compact with a seeded RNG, so the same rows in the same
+    order always give the same quantiles.
+    """
+    for dimension in group_columns:
+        for group, group_frame in frame.groupby(dimension, sort=False):
+            for metric in metrics:
+                key = (dimension, group, metric)
+                if key not in sketches:
+                    sketches[key] = KLLSketch(k=k, seed=seed)
+                sketches[key].update(group_frame[metric].to_numpy())
+    return sketches
+
+def merge_grouped_sketches(left, right):
+    """Merge grouped sketch mappings from separately ingested chunks into left"""
+    for key, sketch in right.items():
+        if key in left:
+            left[key].merge(sketch)
+        else:
+            left[key] = sketch
+    return left
@@ -0,0 +1,125 @@
+import contextlib
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import pandas as pd
+from utils.shared_frames import shared_view
+
+def _run_node(func, args, node_context):
+    """Run one node inside the caller's per-task context; (value, error, seconds)
+
+    A failing node yields None and its error, so one bad node cannot abort
+    the rest of the graph.
+    """
+    with node_context() if node_context is not None else contextlib.nullcontext():
+        start = time.perf_counter()
+        try:
+            value, error = func(*args), None
+        except Exception as e:
+            value, error = None, f"{type(e).__name__}: {e}"
+        return value, error, time.perf_counter() - start
+
+class PanelGraph:
+    """Registry of dashboard data and chart nodes, resolved as a dependency graph
+
+    Each node names the nodes or parameters it consumes. Resolving a set of
+    targets computes every needed intermediate once, reuses stored values
+    whose inputs are unchanged since they were last computed, and runs
+    independent nodes in parallel on one shared thread pool.
+
+    The graph keeps no values itself: stored nodes live in the cache tier
+    result_tier(params) returns, so they count towards that tenant's byte
+    budget, and nodes registered with store=False (those that already read
+    through a cache tier, such as loaders and figures) run on every resolve.
+    """
+
+    def __init__(self, max_workers=4, result_tier=None):
+        self.max_workers = max_workers
+        self.result_tier = result_tier
+        self._nodes = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='panel-graph')
+
+    def add_node(self, name, func, inputs=(), store=True):
+        """Register func(*inputs) as node name; inputs are node or parameter names"""
+        if name in self._nodes:
+            raise ValueError(f"Node '{name}' is already registered")
+        self._nodes[name] = {'func': func, 'inputs': tuple(inputs), 'store': store}
+
+    def _signatures(self, targets, params):
+        """Hash of each needed node's name and input signatures, down to parameter values"""
+        signatures = {}
+
+        def visit(name, path):
+            if name in signatures:
+                return signatures[name]
+            if name in params:
+                signature = hashlib.sha1(f"{name}={params[name]!r}".encode('utf-8')).hexdigest()
+            elif name in self._nodes:
+                if name in path:
+                    raise ValueError(f"Node '{name}' depends on itself")
+                input_signatures = [visit(input_name, path | {name}) for input_name in self._nodes[name]['inputs']]
+                signature = hashlib.sha1('|'.join([name] + input_signatures).encode('utf-8')).hexdigest()
+            else:
+                raise KeyError(f"Unknown node or parameter '{name}'")
+            signatures[name] = signature
+            return signature
+
+        for target in targets:
+            visit(target, frozenset())
+        return signatures
+
+    def resolve(self, targets, params=None, node_context=None):
+        """Return ({target: value}, per-node timings) for the given parameter values
+
+        A node that raises resolves to None, with the error in its timing;
+        nodes downstream of it still run and see None for that input.
+
+        node_context, when given, is a context manager factory entered around
+        every node run in its worker thread (e.g. to tag instrumentation spans
+        with the calling session).
+        """
+        params = params or {}
+        signatures = self._signatures(targets, params)
+        values = {name: params[name] for name in signatures if name in params}
+        tier = self.result_tier(params) if self.result_tier is not None else None
+        timings = []
+
+        # Walk down from the targets, stopping at stored nodes whose value is still current
+        needed = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name in values or name in needed:
+                continue
+            if tier is not None and self._nodes[name]['store']:
+                stored = tier.get(('panel_graph', name, signatures[name]))
+                if stored is not None:
+                    values[name] = shared_view(stored) if isinstance(stored, pd.DataFrame) else stored
+                    timings.append({'node': name, 'seconds': 0.0, 'reused': True, 'error': None})
+                    continue
+            needed.add(name)
+            stack.extend(self._nodes[name]['inputs'])
+
+        running = {}
+        while needed or running:
+            # Submit every node whose inputs are all available
+            ready = [name for name in needed if all(input_name in values for input_name in self._nodes[name]['inputs'])]
+            for name in ready:
+                needed.discard(name)
+                node = self._nodes[name]
+                args = [values[input_name] for input_name in node['inputs']]
+                running[self._executor.submit(_run_node, node['func'], args, node_context)] = name
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                value, error, seconds = future.result()
+                timings.append({'node': name, 'seconds': seconds, 'reused': False, 'error': error})
+                if tier is not None and self._nodes[name]['store'] and value is not None:
+                    # Stored frames are shared with other sessions, so each one reads a view
+                    tier.put(('panel_graph', name, signatures[name]), value)
+                    if isinstance(value, pd.DataFrame):
+                        value = shared_view(value)
+                values[name] = value
+
+        return {name: values[name] for name in targets}, timings
@@ -0,0 +1,164 @@
+import contextlib
+import cProfile
+import hmac
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import config
+from utils.snapshot_store import PROJECT_ROOT
+
+# One profiled run at a time per process, so a profile never mixes two sessions' work
+_profile_lock = threading.Lock()
+_claim_lock = threading.Lock()
+_next_run_claimed = False
+
+def profile_token():
+    """Admin token that ?profile= must match; None disables query-parameter profiling"""
+    return os.environ.get(config.PROFILE_TOKEN_ENV_VAR) or None
+
+def claim_next_run():
+    """True once per process when the next-run environment variable is set"""
+    global _next_run_claimed
+    if os.environ.get(config.PROFILE_NEXT_RUN_ENV_VAR) != '1':
+        return False
+    with _claim_lock:
+        if _next_run_claimed:
+            return False
+        _next_run_claimed = True
+        return True
+
+def token_matches(value):
+    """True when value is the configured admin token"""
+    token = profile_token()
+    return token is not None and value is not None and hmac.compare_digest(str(value), token)
+
+class RerunProfiler:
+    """cProfile capture of one script run: its own thread plus the worker threads it starts
+
+    Up to Python 3.11 cProfile hooks a single thread, so only the profiled
+    session's threads are traced and other sessions run at full speed. From
+    3.12 a process has one cProfile profiler and it sees every thread: the
+    run's worker threads are covered by the profiler started on the script
+    thread, but so is whatever other sessions and background threads ran
+    meanwhile (process_wide is then True).
+    """
+
+    def __init__(self):
+        self._profiles = []
+        self._lock = threading.Lock()
+        self.started_at = None
+        self.seconds = None
+        self._start = None
+        self.process_wide = sys.version_info >= (3, 12)
+
+    def _enable(self):
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiling tool (e.g. a debugger or an external profiler) is active
+            return None
+        with self._lock:
+            self._profiles.append(profile)
+        return profile
+
+    def start(self):
+        """Start profiling the calling thread; False when another profiler is already active"""
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        return self._enable() is not None
+
+    @contextlib.contextmanager
+    def profile_thread(self):
+        """Profile the calling worker thread as part of this run while the block runs
+
+        Worker threads are pooled and go on to serve other sessions, so the
+        profile stops when the block exits. A process-wide profile already
+        covers the thread.
+        """
+        profile = None if self.process_wide else self._enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+
+    @property
+    def threads(self):
+        with self._lock:
+            return len(self._profiles)
+
+    def stop(self):
+        """Stop profiling and return the merged pstats.Stats"""
+        self.seconds = time.perf_counter() - self._start
+        self._profiles[0].disable()
+        stats = pstats.Stats(self._profiles[0])
+        for profile in self._profiles[1:]:
+            stats.add(profile)
+        return stats
+
+def start_rerun_profile():
+    """A started RerunProfiler, or None while another run is being profiled"""
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    profiler = RerunProfiler()
+    if not profiler.start():
+        _profile_lock.release()
+        return None
+    return profiler
+
+def finish_rerun_profile(profiler, label):
+    """Stop a profiler, store its .prof and per-module summary, and return the summary"""
+    try:
+        stats = profiler.stop()
+    finally:
+        _profile_lock.release()
+
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    name = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(profiler.started_at))}-{re.sub(r'[^A-Za-z0-9_.-]', '_', label)}"
+    path = os.path.join(config.PROFILE_DIR, name + '.prof')
+    stats.dump_stats(path)
+
+    summary = {
+        'label': label,
+        'started_at': profiler.started_at,
+        'seconds': profiler.seconds,
+        'threads': profiler.threads,
+        'process_wide': profiler.process_wide,
+        'path': path,
+        'modules': summarize_by_module(stats)
+    }
+    with open(os.path.join(config.PROFILE_DIR, name + '.json'), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+def _module_name(filename):
+    """Project-relative path for our code, top-level package for libraries, 'builtins' for C functions"""
+    if filename == '~' or filename.startswith('<'):
+        return 'builtins'
+    if filename.startswith(PROJECT_ROOT + os.sep):
+        return os.path.relpath(filename, PROJECT_ROOT)
+    parts = filename.replace(os.sep, '/').split('/')
+    for marker in ['site-packages', 'dist-packages']:
+        if marker in parts and parts.index(marker) + 1 < len(parts):
+            return parts[parts.index(marker) + 1].removesuffix('.py')
+    return os.path.basename(filename).removesuffix('.py')
+
+def summarize_by_module(stats, top=None):
+    """Modules by own time, each with its hottest functions by own time"""
+    top = config.PROFILE_TOP_FUNCTIONS if top is None else top
+    modules = {}
+    for (filename, lineno, function), (_, calls, own_seconds, cumulative_seconds, _) in stats.stats.items():
+        module = modules.setdefault(_module_name(filename), {'own_seconds': 0.0, 'functions': []})
+        module['own_seconds'] += own_seconds
+        module['functions'].append({'function': function, 'line': lineno, 'calls': calls,
+                                    'own_seconds': own_seconds, 'cumulative_seconds': cumulative_seconds})
+
+    return [{'module': name, 'own_seconds': module['own_seconds'],
+             'functions': sorted(module['functions'], key=lambda fn: -fn['own_seconds'])[:top]}
+            for name, module in sorted(modules.items(), key=lambda item: -item[1]['own_seconds'])
+            [:config.PROFILE_TOP_MODULES]]
@@ -0,0 +1,13 @@
+import pandas as pd
+
+# Shared frames rely on copy-on-write: a write through any view copies the
+# affected columns first, so the cached original never changes. pandas 3 always
+# behaves this way; on pandas 2 it is the public opt-in below.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+def shared_view(df):
+    """Shallow copy of a shared frame: callers may add, replace or assign columns, but the cached data is never modified"""
+    if df is None:
+        return None
+    return df.copy(deep=False)
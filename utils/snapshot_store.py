@@ -0,0 +1,153 @@
+import functools
+import hashlib
+import os
+import pickle
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import config
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Sources whose code shapes what a snapshot holds; editing any of them starts a new snapshot version
+SNAPSHOT_SOURCES = ['config.py', 'dashboard.py', 'utils']
+
+@functools.lru_cache(maxsize=None)
+def get_code_version():
+    """Short hash of the snapshot-shaping source files"""
+    digest = hashlib.sha1()
+    for source in SNAPSHOT_SOURCES:
+        path = os.path.join(PROJECT_ROOT, source)
+        if os.path.isdir(path):
+            files = sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith('.py'))
+        else:
+            files = [path]
+        for file_path in files:
+            with open(file_path, 'rb') as f:
+                digest.update(os.path.relpath(file_path, PROJECT_ROOT).encode() + b'\0' + f.read())
+    return digest.hexdigest()[:12]
+
+def tenant_snapshot_root(data_root):
+    """Directory holding every snapshot of one tenant's data root"""
+    absolute_root = os.path.abspath(data_root)
+    tenant_id = f"{os.path.basename(absolute_root)}-{hashlib.sha1(absolute_root.encode('utf-8')).hexdigest()[:8]}"
+    return os.path.join(PROJECT_ROOT, config.SNAPSHOT_DIR, tenant_id)
+
+def snapshot_dir(data_root, data_fingerprint):
+    """Directory holding the snapshot for a data fingerprint under the current code version"""
+    return os.path.join(tenant_snapshot_root(data_root), f"{get_code_version()}-{data_fingerprint}")
+
+def snapshot_entry_name(name, *parts):
+    """File-safe entry name for a value identified by name and its arguments"""
+    return f"{name}-{hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:16]}"
+
+def read_snapshot_entry(data_root, data_fingerprint, entry):
+    """Stored value for an entry, or None when it is missing or unreadable
+
+    Frames are feather files read through a memory map, so the OS page cache
+    rather than a parse step serves a restarted worker. Reading an entry marks
+    it as recently used for prune_snapshot_entries.
+    """
+    base = os.path.join(snapshot_dir(data_root, data_fingerprint), entry)
+    try:
+        if os.path.exists(base + '.feather'):
+            return feather.read_feather(base + '.feather', memory_map=True)
+        if os.path.exists(base + '.json'):
+            os.utime(base + '.json')
+            with open(base + '.json', encoding='utf-8') as f:
+                return f.read()
+        if os.path.exists(base + '.pkl'):
+            with open(base + '.pkl', 'rb') as f:
+                return pickle.load(f)
+    except (OSError, pa.ArrowException, pickle.UnpicklingError, EOFError):
+        # A damaged entry is rebuilt and rewritten
+        return None
+    return None
+
+def write_snapshot_entry(data_root, data_fingerprint, entry, value):
+    """Write an entry atomically; True when it was stored"""
+    directory = snapshot_dir(data_root, data_fingerprint)
+    base = os.path.join(directory, entry)
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+            prune_snapshots(data_root)
+
+        if isinstance(value, pd.DataFrame):
+            try:
+                # Uncompressed so readers can memory-map the columns
+                feather.write_feather(value, base + '.feather.tmp', compression='uncompressed')
+                os.replace(base + '.feather.tmp', base + '.feather')
+                return True
+            except (ValueError, TypeError, pa.ArrowException):
+                # Frames Arrow cannot represent (e.g. non-string column labels) fall back to pickle
+                if os.path.exists(base + '.feather.tmp'):
+                    os.remove(base + '.feather.tmp')
+
+        if isinstance(value, str):
+            # Text such as figure JSON is stored as is rather than pickled
+            with open(base + '.json.tmp', 'w', encoding='utf-8') as f:
+                f.write(value)
+            os.replace(base + '.json.tmp', base + '.json')
+            return True
+
+        with open(base + '.pkl.tmp', 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(base + '.pkl.tmp', base + '.pkl')
+        return True
+    except OSError:
+        # A read-only or full disk only costs the next cold start
+        return False
+
+def list_snapshot_entries(data_root, data_fingerprint):
+    """Name, format and bytes of every entry stored in a snapshot, largest first"""
+    directory = snapshot_dir(data_root, data_fingerprint)
+    if not os.path.isdir(directory):
+        return []
+    entries = []
+    for name in os.listdir(directory):
+        entry, extension = os.path.splitext(name)
+        if extension in ('.feather', '.json', '.pkl'):
+            entries.append({'entry': entry, 'format': extension[1:],
+                            'bytes': os.path.getsize(os.path.join(directory, name))})
+    return sorted(entries, key=lambda entry: -entry['bytes'])
+
+def prune_snapshots(data_root, keep=None):
+    """Delete all but a tenant's most recently written snapshots"""
+    keep = config.SNAPSHOT_KEEP if keep is None else keep
+    root = tenant_snapshot_root(data_root)
+    if not os.path.isdir(root):
+        return
+    snapshots = sorted((os.path.join(root, name) for name in os.listdir(root)),
+                       key=os.path.getmtime, reverse=True)
+    for path in snapshots[keep:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+def prune_snapshot_entries(data_root, data_fingerprint, prefix, keep):
+    """Delete all but the keep most recently used entries whose names start with prefix"""
+    directory = snapshot_dir(data_root, data_fingerprint)
+    try:
+        paths = [os.path.join(directory, name) for name in os.listdir(directory)
+                 if name.startswith(prefix) and not name.endswith('.tmp')]
+        for path in sorted(paths, key=os.path.getmtime, reverse=True)[keep:]:
+            os.remove(path)
+    except OSError:
+        # Another worker may prune the same directory; whatever is left is pruned next time
+        pass
+
+def persisted(func):
+    """Keep a loader's result in the on-disk snapshot for its data root and fingerprint (its first two arguments)"""
+    @functools.wraps(func)
+    def wrapper(data_root, data_fingerprint, *args, **kwargs):
+        if not config.SNAPSHOTS_ENABLED:
+            return func(data_root, data_fingerprint, *args, **kwargs)
+
+        entry = snapshot_entry_name(func.__name__, args, sorted(kwargs.items()))
+        value = read_snapshot_entry(data_root, data_fingerprint, entry)
+        if value is None:
+            value = func(data_root, data_fingerprint, *args, **kwargs)
+            if value is not None:
+                write_snapshot_entry(data_root, data_fingerprint, entry, value)
+        return value
+    return wrapper
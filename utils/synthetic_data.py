@@ -0,0 +1,130 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+CAMPAIGN_COLUMNS = ['date', 'tactic', 'state', 'campaign', 'impression', 'clicks', 'spend', 'attributed revenue']
+BUSINESS_COLUMNS = ['date', '# of orders', '# of new orders', 'new customers', 'total revenue', 'gross profit', 'COGS']
+
+# Per-platform shape of the bundled data: tactics, mean daily impressions per campaign, CTR, CPC and ROAS
+PLATFORM_PROFILES = {
+    'Facebook': {'tactics': ['ASC', 'Prospecting'], 'impressions': 180000, 'ctr': 0.0135, 'cpc': 0.73, 'roas': 2.6},
+    'Google': {'tactics': ['Non-Branded Search', 'Display'], 'impressions': 210000, 'ctr': 0.0415, 'cpc': 0.16, 'roas': 3.0},
+    'TikTok': {'tactics': ['Retargeting', 'Spark Ads'], 'impressions': 150000, 'ctr': 0.015, 'cpc': 0.54, 'roas': 2.8}
+}
+
+STATES = ['CA', 'NY', 'TX', 'FL', 'IL', 'PA', 'OH', 'GA', 'NC', 'MI', 'NJ', 'VA', 'WA', 'AZ', 'MA',
+          'TN', 'IN', 'MO', 'MD', 'WI', 'CO', 'MN', 'SC', 'AL', 'LA', 'KY', 'OR', 'OK', 'CT', 'UT']
+
+def platform_campaign_counts(campaigns, platform_share=None):
+    """Campaigns per platform; every platform gets at least one since the loader reads all three files"""
+    platforms = list(PLATFORM_PROFILES)
+    share = np.array([1.0] * len(platforms) if platform_share is None
+                     else [platform_share.get(platform, 0.0) for platform in platforms])
+    counts = np.maximum(np.floor(campaigns * share / share.sum()).astype(int), 1)
+    return dict(zip(platforms, counts.tolist()))
+
+def _platform_tactics(platform, tactics):
+    base = PLATFORM_PROFILES[platform]['tactics']
+    return [base[i] if i < len(base) else f"{base[i % len(base)]} {i // len(base) + 1}" for i in range(tactics)]
+
+def _campaign_rows(rng, platform, names, tactic_idx, state_idx, tactic_names, dates):
+    """One row per campaign and date, as a frame in the platform CSV schema"""
+    profile = PLATFORM_PROFILES[platform]
+    n_campaigns, n_dates = len(names), len(dates)
+    n = n_campaigns * n_dates
+
+    # Each campaign keeps its own scale across days; days add lognormal noise
+    campaign_scale = np.repeat(rng.lognormal(0.0, 0.3, n_campaigns), n_dates)
+    impressions = np.maximum(profile['impressions'] * campaign_scale * rng.lognormal(0.0, 0.35, n), 50000).round()
+    clicks = np.maximum(impressions * profile['ctr'] * rng.lognormal(0.0, 0.3, n), 1).round()
+    spend = (clicks * profile['cpc'] * rng.lognormal(0.0, 0.25, n)).round(2)
+    revenue = (spend * profile['roas'] * rng.lognormal(0.0, 0.35, n)).round(2)
+
+    tactics = np.asarray(tactic_names, dtype=object)[tactic_idx]
+    states = np.asarray(STATES, dtype=object)[state_idx]
+    return pd.DataFrame({
+        'date': np.tile(dates, n_campaigns),
+        'tactic': np.repeat(tactics, n_dates),
+        'state': np.repeat(states, n_dates),
+        'campaign': np.repeat(np.asarray(names, dtype=object), n_dates),
+        'impression': impressions.astype(np.int64),
+        'clicks': clicks.astype(np.int64),
+        'spend': spend,
+        'attributed revenue': revenue
+    })[CAMPAIGN_COLUMNS]
+
+def generate_dataset(output_dir, days=120, campaigns=30, tactics=2, states=2, platform_share=None,
+                     start_date='2025-05-16', seed=0, days_per_chunk=30):
+    """Write Facebook, Google, TikTok and Business CSVs in the bundled schemas; returns rows per file
+
+    Rows are days x campaigns in total, so e.g. 730 days and 15,000 campaigns
+    give about 11 million campaign rows. Files are written in chunks of days
+    to keep memory flat at any scale.
+    """
+    if not 1 <= states <= len(STATES):
+        raise ValueError(f"states must be between 1 and {len(STATES)}")
+    os.makedirs(output_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    all_dates = pd.date_range(start_date, periods=days, freq='D').strftime('%Y-%m-%d').to_numpy()
+    attributed_revenue = pd.Series(0.0, index=all_dates)
+    row_counts = {}
+
+    for platform, n_campaigns in platform_campaign_counts(campaigns, platform_share).items():
+        tactic_names = _platform_tactics(platform, tactics)
+        tactic_idx = rng.integers(0, tactics, n_campaigns)
+        state_idx = rng.integers(0, states, n_campaigns)
+        names = [f"{platform} - {tactic_names[t]} - C{i + 1:02d}" for i, t in enumerate(tactic_idx)]
+
+        path = os.path.join(output_dir, f'{platform}.csv')
+        for chunk_start in range(0, days, days_per_chunk):
+            dates = all_dates[chunk_start:chunk_start + days_per_chunk]
+            rows = _campaign_rows(rng, platform, names, tactic_idx, state_idx, tactic_names, dates)
+            rows.to_csv(path, mode='w' if chunk_start == 0 else 'a', header=chunk_start == 0, index=False)
+            attributed_revenue = attributed_revenue.add(rows.groupby('date')['attributed revenue'].sum(), fill_value=0)
+        row_counts[platform] = n_campaigns * days
+
+    # Business totals sit above attributed revenue, as platforms only claim part of the sales
+    total_revenue = (attributed_revenue.to_numpy() * rng.uniform(1.6, 2.0, days)).round(2)
+    orders = np.maximum(total_revenue / rng.normal(81.0, 4.0, days), 1).round()
+    new_orders = (orders * rng.uniform(0.35, 0.5, days)).round()
+    gross_profit = (total_revenue * rng.uniform(0.5, 0.6, days)).round(2)
+    business_df = pd.DataFrame({
+        'date': all_dates,
+        '# of orders': orders.astype(np.int64),
+        '# of new orders': new_orders.astype(np.int64),
+        'new customers': (new_orders * rng.uniform(0.97, 1.03, days)).round().astype(np.int64),
+        'total revenue': total_revenue,
+        'gross profit': gross_profit,
+        'COGS': (total_revenue - gross_profit).round(2)
+    })[BUSINESS_COLUMNS]
+    business_df.to_csv(os.path.join(output_dir, 'Business.csv'), index=False)
+    row_counts['Business'] = days
+    return row_counts
+
+def _parse_share(value):
+    share = {}
+    for item in value.split(','):
+        platform, _, weight = item.partition('=')
+        if platform not in PLATFORM_PROFILES:
+            raise argparse.ArgumentTypeError(f"unknown platform '{platform}'")
+        share[platform] = float(weight)
+    return share
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate marketing CSVs in the dashboard's schemas at any scale")
+    parser.add_argument('output_dir')
+    parser.add_argument('--days', type=int, default=120)
+    parser.add_argument('--campaigns', type=int, default=30, help="Campaigns across all platforms")
+    parser.add_argument('--tactics', type=int, default=2, help="Tactics per platform")
+    parser.add_argument('--states', type=int, default=2, help=f"States, up to {len(STATES)}")
+    parser.add_argument('--platform-share', type=_parse_share, metavar='PLATFORM=WEIGHT,...',
+                        help="Relative share of campaigns per platform, e.g. Facebook=2,Google=1,TikTok=1")
+    parser.add_argument('--start-date', default='2025-05-16')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    row_counts = generate_dataset(args.output_dir, args.days, args.campaigns, args.tactics, args.states,
+                                  args.platform_share, args.start_date, args.seed)
+    for name, rows in row_counts.items():
+        print(f"{name:<10} {rows:>12,} rows")